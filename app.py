@@ -1,22 +1,87 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 import pandas as pd
 import os
+import threading
+import time
+from datetime import datetime
 from data_fetcher import SerieADataFetcher
 from injury_scraper import InjuryDataScraper
 from transfer_scraper import TransferDataScraper
 from prediction_engine import SerieAPredictionEngine
 from fixtures_fetcher import SerieAFixturesFetcher
+from season_simulator import MAX_SIMULATIONS, SeasonSimulator
+from http_client import get_http_client
+from metrics import get_metrics
 
 app = Flask(__name__)
-data_fetcher = SerieADataFetcher()
-injury_scraper = InjuryDataScraper()
-transfer_scraper = TransferDataScraper()
-fixtures_fetcher = SerieAFixturesFetcher()
-
-# Initialize prediction engine (will load historical data)
-print("Initializing prediction engine...")
-prediction_engine = SerieAPredictionEngine(data_fetcher, injury_scraper, transfer_scraper)
-print("Prediction engine ready!")
+metrics = get_metrics()
+
+# Built by create_app() (on the first request at the latest), so importing this module
+# loads no data and starts no threads
+data_fetcher = None
+injury_scraper = None
+transfer_scraper = None
+fixtures_fetcher = None
+prediction_engine = None
+season_simulator = None
+_components_lock = threading.Lock()
+
+def create_app(**components):
+    """Build the app's components and return the Flask app.
+
+    Any of data_fetcher, injury_scraper, transfer_scraper, fixtures_fetcher and
+    prediction_engine can be passed in and is used as is. Only components built here start
+    the injury background refresh and ingest the current season's results.
+    """
+    global data_fetcher, injury_scraper, transfer_scraper, fixtures_fetcher, prediction_engine, season_simulator
+
+    with _components_lock:
+        if prediction_engine is not None and not components:
+            return app
+
+        data_fetcher = components.get('data_fetcher') or SerieADataFetcher()
+        injury_scraper = components.get('injury_scraper')
+        if injury_scraper is None:
+            injury_scraper = InjuryDataScraper()
+            injury_scraper.start_background_refresh()
+        transfer_scraper = components.get('transfer_scraper') or TransferDataScraper()
+        fixtures_fetcher = components.get('fixtures_fetcher') or SerieAFixturesFetcher()
+
+        engine = components.get('prediction_engine')
+        if engine is None:
+            # Initialize prediction engine (will load historical data)
+            print("Initializing prediction engine...")
+            engine = SerieAPredictionEngine(data_fetcher, injury_scraper, transfer_scraper)
+            try:
+                # Current-season results played so far also feed the model
+                engine.refresh_current_season()
+            except Exception as e:
+                print(f"Error ingesting current season results: {e}")
+            print("Prediction engine ready!")
+
+        season_simulator = SeasonSimulator(engine, fixtures_fetcher, data_fetcher=data_fetcher)
+        prediction_engine = engine
+    return app
+
+@app.before_request
+def ensure_components():
+    if prediction_engine is None:
+        create_app()
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_timing(response):
+    # Per-route latency (by endpoint name, not raw path) and response counts by status class
+    started = g.get('request_started')
+    if started is not None:
+        route = f"route.{request.endpoint or 'unmatched'}"
+        metrics.observe(route, time.perf_counter() - started)
+        metrics.increment(f"{route}.{response.status_code // 100}xx")
+    return response
 
 @app.route('/')
 def home():
@@ -26,6 +91,8 @@ def home():
         "version": "0.1.0",
         "endpoints": {
             "/health": "Health check",
+            "/api/http/stats": "Upstream HTTP request counters",
+            "/api/metrics": "Latency histograms and counters (Prometheus text, ?format=json for JSON)",
             "/api/matches": "Get Serie A matches (single season)",
             "/api/teams": "Get Serie A teams (single season)",
             "/api/matches/recent": "Get recent matches",
@@ -37,8 +104,12 @@ def home():
             "/api/transfers/team/<team>": "Get transfers for specific team",
             "/api/fixtures": "Get upcoming Serie A fixtures",
             "/api/fixtures/next-round": "Get next matchday fixtures",
-            "/api/predict/<home>/<away>": "Predict specific match",
-            "/api/predictions": "Get predictions for upcoming matches"
+            "/api/predict/<home>/<away>": "Predict specific match (optional ?date=YYYY-MM-DD)",
+            "/api/predictions": "Get predictions for upcoming matches",
+            "/api/predictions/cache": "Prediction cache statistics",
+            "/api/engine/refresh": "Ingest newly played current-season results and reload injuries and transfers (POST)",
+            "/api/simulation": "Monte Carlo final-table odds for the current season",
+            "/api/ratings": "Elo team ratings"
         },
         "supported_seasons": {
             "2023-24": "Historical data (Football-CSV)",
@@ -51,6 +122,22 @@ def home():
 def health():
     return jsonify({"status": "healthy"})
 
+@app.route('/api/http/stats')
+def get_http_stats():
+    try:
+        return jsonify(get_http_client().get_stats())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/metrics')
+def get_metrics_endpoint():
+    try:
+        if request.args.get('format') == 'json':
+            return jsonify(metrics.snapshot())
+        return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/matches')
 def get_matches():
     try:
@@ -304,8 +391,15 @@ def get_next_round():
 @app.route('/api/predict/<home>/<away>')
 def predict_match(home, away):
     try:
-        # Generate prediction for specific match
-        prediction = prediction_engine.predict_match(home, away)
+        match_date = request.args.get('date')
+        if match_date:
+            try:
+                match_date = datetime.strptime(match_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({"error": f"Invalid date '{match_date}', expected YYYY-MM-DD"}), 400
+
+        # Generate prediction for specific match (injuries as of ?date= when given)
+        prediction = prediction_engine.predict_match(home, away, match_date or None)
 
         return jsonify(prediction)
     except Exception as e:
@@ -317,8 +411,6 @@ def get_predictions():
         days_ahead = int(request.args.get('days', 7))
         prediction_type = request.args.get('type', 'all')  # all, big_matches, next_round
 
-        predictions = []
-
         if prediction_type == 'next_round':
             fixtures = fixtures_fetcher.get_next_round_fixtures()
         elif prediction_type == 'big_matches':
@@ -326,65 +418,93 @@ def get_predictions():
         else:  # all
             fixtures = fixtures_fetcher.get_upcoming_fixtures(days_ahead)
 
-        # Generate predictions for each fixture
-        for fixture in fixtures[:10]:  # Limit to 10 to avoid timeouts
-            try:
-                prediction = prediction_engine.predict_match(
-                    fixture['home_team'],
-                    fixture['away_team']
-                )
-
-                # Add fixture info to prediction
-                prediction['fixture_info'] = {
-                    'date': fixture['date'],
-                    'time': fixture.get('time', ''),
-                    'round': fixture.get('round', ''),
-                    'days_from_now': fixture['days_from_now']
-                }
-
-                predictions.append(prediction)
+        # Generate predictions for the whole window in one batch; a failed fixture gets an error entry
+        predictions = prediction_engine.predict_matches(fixtures)
 
-            except Exception as pred_error:
-                print(f"Error predicting {fixture['home_team']} vs {fixture['away_team']}: {pred_error}")
-                continue
+        # Add fixture info to each prediction
+        for fixture, prediction in zip(fixtures, predictions):
+            prediction['fixture_info'] = {
+                'date': fixture.get('date'),
+                'time': fixture.get('time', ''),
+                'round': fixture.get('round', ''),
+                'days_from_now': fixture.get('days_from_now')
+            }
 
         return jsonify({
             "prediction_type": prediction_type,
             "days_ahead": days_ahead,
-            "total_predictions": len(predictions),
+            "total_predictions": sum(1 for prediction in predictions if 'error' not in prediction),
             "predictions": predictions,
             "generated_at": prediction_engine.historical_data.iloc[0]['Season'] if not prediction_engine.historical_data.empty else "No data"
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/predictions/cache')
+def get_prediction_cache_stats():
+    try:
+        return jsonify(prediction_engine.get_cache_stats())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/engine/refresh', methods=['POST'])
+def refresh_engine():
+    try:
+        ingested = prediction_engine.refresh_current_season()
+        injuries = injury_scraper.refresh()
+        transfers = transfer_scraper.refresh()
+        return jsonify({
+            "ingested_matches": ingested,
+            "injury_data_version": injuries.version,
+            "transfer_data_version": transfers['version'],
+            "goal_model_version": prediction_engine.goal_model.version,
+            "total_matches": len(prediction_engine.historical_data),
+            "cache": prediction_engine.get_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/ratings')
+def get_ratings():
+    try:
+        ratings = prediction_engine.get_ratings()
+        return jsonify({
+            "ratings": ratings,
+            "total_teams": len(ratings)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/simulation')
+def get_season_simulation():
+    try:
+        simulations = min(request.args.get('simulations', 100000, type=int), MAX_SIMULATIONS)
+        seed = request.args.get('seed', 42, type=int)
+
+        result = season_simulator.run(simulations, seed=seed)
+        if 'error' in result:
+            return jsonify(result), 503
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/predictions/big-matches')
 def get_big_match_predictions():
     try:
         big_matches = fixtures_fetcher.get_big_matches(14)
-        predictions = []
-
-        for match in big_matches[:5]:  # Limit big matches
-            try:
-                prediction = prediction_engine.predict_match(
-                    match['home_team'],
-                    match['away_team']
-                )
-
-                prediction['fixture_info'] = match
-                predictions.append(prediction)
+        predictions = prediction_engine.predict_matches(big_matches)
 
-            except Exception as pred_error:
-                print(f"Error predicting big match: {pred_error}")
-                continue
+        for match, prediction in zip(big_matches, predictions):
+            prediction['fixture_info'] = match
 
         return jsonify({
             "big_match_predictions": predictions,
-            "total_predictions": len(predictions)
+            "total_predictions": sum(1 for prediction in predictions if 'error' not in prediction)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    create_app()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,236 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from elo_ratings import EloRatings
+from match_table import build_match_table
+from prediction_cache import PredictionCache
+from prediction_engine import SerieAPredictionEngine
+
+CALIBRATION_BINS = 10
+
+
+class NullInjuryScraper:
+    """Injury source for replays: nobody is out, since past injury lists are not recorded"""
+
+    def get_data_version(self):
+        return 'none'
+
+    def get_team_impact(self, team_name, as_of=None):
+        return {'team': team_name, 'total_injuries': 0, 'players_out': 0, 'players_doubtful': 0,
+                'impact_score': 0.0, 'key_players_out': []}
+
+
+class NullTransferScraper:
+    """Transfer source for replays: no strength changes, since past windows are not recorded"""
+
+    def get_data_version(self):
+        return 'none'
+
+    def get_team_strength(self, team_name):
+        return {'transfers_in': 0, 'transfers_out': 0, 'impact_in': 0, 'impact_out': 0,
+                'net_impact': 0, 'strength_change': 'Stable'}
+
+
+class WalkForwardBacktest:
+    """Replay seasons in date order, predicting each matchday before ingesting its results.
+
+    Every prediction uses only matches dated strictly before it: the engine starts from a
+    warm-up slice and then grows through its incremental ingest path, one date at a time,
+    so nothing is rebuilt per match. Injuries and transfers are left out because there is
+    no record of what they looked like on past dates.
+    """
+
+    def __init__(self, matches, warmup_matches=100, params=None):
+        self.matches = build_match_table(matches)
+        self.warmup_matches = min(warmup_matches, len(self.matches))
+        self.params = params
+
+    def _warm_engine(self):
+        """Engine built from the warm-up slice, and the index of the first replayed match"""
+        # Warm-up boundary moves to a date change so no date is split between history and replay
+        dates = self.matches['Date']
+        boundary = self.warmup_matches
+        while 0 < boundary < len(self.matches) and dates.iloc[boundary] == dates.iloc[boundary - 1]:
+            boundary += 1
+
+        # No data fetcher: the history is passed in and the engine never refreshes during a replay
+        engine = SerieAPredictionEngine(
+            None, NullInjuryScraper(), NullTransferScraper(),
+            prediction_cache=PredictionCache(max_entries=0),
+            elo_ratings=EloRatings(persist=False),
+            historical_data=self.matches.iloc[:boundary],
+            params=self.params
+        )
+        return engine, boundary
+
+    def _replay(self, boundary):
+        """Matches after the warm-up that can be replayed: undated rows have no place in the
+        date order, so they are left out of both the predictions and the outcomes"""
+        replay = self.matches.iloc[boundary:]
+        return replay[replay['Date'].notna()].reset_index(drop=True)
+
+    def run(self):
+        """Predict and score every match after the warm-up; returns the metrics report"""
+        started = time.perf_counter()
+        engine, boundary = self._warm_engine()
+
+        predictions = []
+        predict_seconds = 0.0
+        ingest_seconds = 0.0
+        replay = self._replay(boundary)
+
+        for _, matchday in replay.groupby('Date', sort=True):
+            fixtures = list(zip(matchday['HomeTeam'].astype(str), matchday['AwayTeam'].astype(str)))
+
+            tick = time.perf_counter()
+            predictions.extend(engine.predict_matches(fixtures))
+            predict_seconds += time.perf_counter() - tick
+
+            tick = time.perf_counter()
+            engine.ingest_results(matchday)
+            ingest_seconds += time.perf_counter() - tick
+
+        total_seconds = time.perf_counter() - started
+
+        # A fixture the engine could not predict has an error entry in its slot; score the rest
+        predicted = np.array(['error' not in prediction for prediction in predictions], dtype=bool)
+        predictions = [prediction for prediction, ok in zip(predictions, predicted) if ok]
+        scored = len(predictions)
+        report = {
+            'warmup_matches': boundary,
+            'matches_scored': scored,
+            'failed_predictions': int((~predicted).sum()),
+            'markets': self._score(replay[predicted].reset_index(drop=True), predictions) if scored else {},
+            'throughput': {
+                'total_seconds': round(total_seconds, 3),
+                'predict_seconds': round(predict_seconds, 3),
+                'ingest_seconds': round(ingest_seconds, 3),
+                'matches_per_second': round(scored / total_seconds, 1) if total_seconds > 0 else None
+            }
+        }
+        return report
+
+    def collect_features(self):
+        """Numeric model inputs of every replayed match, as the engine saw them before kick-off.
+
+        Returns (features, replay): one array per numeric feature in replay order, and the
+        replayed matches themselves for their outcomes. The arrays only depend on the match
+        history, so predictor weights can be re-scored on them without replaying again.
+        """
+        engine, boundary = self._warm_engine()
+        replay = self._replay(boundary)
+
+        batches = []
+        for _, matchday in replay.groupby('Date', sort=True):
+            fixtures = list(zip(matchday['HomeTeam'].astype(str), matchday['AwayTeam'].astype(str)))
+            features = engine._gather_features(fixtures)
+            batches.append({key: value for key, value in features.items() if isinstance(value, np.ndarray)})
+            engine.ingest_results(matchday)
+
+        if not batches:
+            return {}, replay
+        return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}, replay
+
+    def _score(self, replay, predictions):
+        """Brier score, log-loss, accuracy and calibration per market"""
+        home_goals = replay['FTHG'].to_numpy().astype(np.int64)
+        away_goals = replay['FTAG'].to_numpy().astype(np.int64)
+        outcomes = np.column_stack([home_goals > away_goals, home_goals == away_goals, home_goals < away_goals])
+
+        markets = {
+            '1x2': multiclass_metrics(
+                _probabilities(predictions, lambda p: p['result_prediction']['probabilities']), outcomes),
+            '1x2_score_model': multiclass_metrics(
+                _probabilities(predictions, lambda p: p['score_model']['probabilities']), outcomes),
+            'over_2_5': binary_metrics(
+                _percentages(predictions, lambda p: p['goals_prediction']['over_under']['over_2_5']),
+                home_goals + away_goals > 2.5),
+            'over_2_5_score_model': binary_metrics(
+                _percentages(predictions, lambda p: p['score_model']['over_under']['over_2_5']),
+                home_goals + away_goals > 2.5),
+            'btts': binary_metrics(
+                _percentages(predictions, lambda p: p['goals_prediction']['both_teams_score']),
+                (home_goals > 0) & (away_goals > 0)),
+            'btts_score_model': binary_metrics(
+                _percentages(predictions, lambda p: p['score_model']['both_teams_score']['yes']),
+                (home_goals > 0) & (away_goals > 0))
+        }
+
+        # Corners only where the source recorded them
+        if 'HC' in replay.columns and 'AC' in replay.columns:
+            corners = (pd.to_numeric(replay['HC'], errors='coerce') + pd.to_numeric(replay['AC'], errors='coerce')).to_numpy(dtype=np.float64)
+            known = ~np.isnan(corners)
+            if known.any():
+                over_9_5 = _percentages(predictions, lambda p: p['advanced_prediction']['corners']['over_9_5'])
+                markets['corners_over_9_5'] = binary_metrics(over_9_5[known], corners[known] > 9.5)
+
+        return markets
+
+
+def _probabilities(predictions, select):
+    """(n, 3) home/draw/away probabilities, renormalized after rounding"""
+    probabilities = np.array([[select(p)[key] for key in ('1', 'X', '2')] for p in predictions], dtype=np.float64)
+    return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+def _percentages(predictions, select):
+    """Probabilities from percentages that may be numbers or strings like '57.5%'"""
+    return np.array([float(str(select(p)).rstrip('%')) / 100 for p in predictions], dtype=np.float64)
+
+
+def binary_metrics(probabilities, outcomes):
+    """Brier score, log-loss, accuracy and calibration for a yes/no market"""
+    outcomes = np.asarray(outcomes, dtype=np.float64)
+    clipped = np.clip(probabilities, 1e-6, 1 - 1e-6)
+    return {
+        'matches': len(outcomes),
+        'brier': round(float(np.mean((probabilities - outcomes) ** 2)), 4),
+        'log_loss': round(float(-np.mean(outcomes * np.log(clipped) + (1 - outcomes) * np.log(1 - clipped))), 4),
+        'accuracy': round(float(np.mean((probabilities >= 0.5) == (outcomes == 1))), 4),
+        'base_rate': round(float(np.mean(outcomes)), 4),
+        'calibration': calibration_table(probabilities, outcomes)
+    }
+
+
+def multiclass_metrics(probabilities, outcomes):
+    """Brier score (summed over outcomes), log-loss, accuracy and pooled calibration for 1X2"""
+    outcomes = np.asarray(outcomes, dtype=np.float64)
+    chosen = np.clip(np.sum(probabilities * outcomes, axis=1), 1e-6, 1)
+    return {
+        'matches': len(outcomes),
+        'brier': round(float(np.mean(np.sum((probabilities - outcomes) ** 2, axis=1))), 4),
+        'log_loss': round(float(-np.mean(np.log(chosen))), 4),
+        'accuracy': round(float(np.mean(np.argmax(probabilities, axis=1) == np.argmax(outcomes, axis=1))), 4),
+        'calibration': calibration_table(probabilities.ravel(), outcomes.ravel())
+    }
+
+
+def calibration_table(probabilities, outcomes):
+    """Mean predicted probability vs observed frequency in equal-width probability bins"""
+    bins = np.minimum((probabilities * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1)
+    counts = np.bincount(bins, minlength=CALIBRATION_BINS)
+    predicted = np.bincount(bins, probabilities, CALIBRATION_BINS)
+    observed = np.bincount(bins, outcomes, CALIBRATION_BINS)
+
+    return [{
+        'bin': f"{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}",
+        'count': int(counts[b]),
+        'predicted': round(float(predicted[b] / counts[b]), 4),
+        'observed': round(float(observed[b] / counts[b]), 4)
+    } for b in range(CALIBRATION_BINS) if counts[b] > 0]
+
+
+if __name__ == "__main__":
+    from data_fetcher import SerieADataFetcher
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the prediction engine")
+    parser.add_argument('--seasons', nargs='+', default=['2023-24', '2024-25'])
+    parser.add_argument('--warmup', type=int, default=100, help="Matches used as history before scoring starts")
+    args = parser.parse_args()
+
+    matches = SerieADataFetcher().get_multiple_seasons_data(args.seasons)
+    report = WalkForwardBacktest(matches, warmup_matches=args.warmup).run()
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,125 @@
+"""Compare the vectorized match normalization with the previous row-wise path.
+
+Run from the repository root: python -m benchmarks.bench_standardize
+"""
+import time
+import numpy as np
+import pandas as pd
+from match_schema import normalize_matches, normalize_openfootball
+
+
+def legacy_standardize_footballcsv(df):
+    """Pre-vectorization SerieADataFetcher.standardize_data"""
+    standardized_df = pd.DataFrame()
+    standardized_df['Date'] = df['Date']
+    standardized_df['HomeTeam'] = df['Team 1']
+    standardized_df['AwayTeam'] = df['Team 2']
+    ft_scores = df['FT'].str.split('-', expand=True)
+    standardized_df['FTHG'] = pd.to_numeric(ft_scores[0], errors='coerce')
+    standardized_df['FTAG'] = pd.to_numeric(ft_scores[1], errors='coerce')
+    standardized_df['FTR'] = standardized_df.apply(
+        lambda row: 'H' if row['FTHG'] > row['FTAG']
+                   else 'A' if row['FTHG'] < row['FTAG']
+                   else 'D', axis=1
+    )
+    ht_scores = df['HT'].str.split('-', expand=True)
+    standardized_df['HTHG'] = pd.to_numeric(ht_scores[0], errors='coerce')
+    standardized_df['HTAG'] = pd.to_numeric(ht_scores[1], errors='coerce')
+    return standardized_df
+
+
+def legacy_standardize_datahub(df):
+    """Pre-vectorization SerieADataFetcher._standardize_datahub_format (FTR missing)"""
+    df = df.copy()
+    df['FTR'] = df.apply(
+        lambda row: 'H' if row['FTHG'] > row['FTAG']
+                   else 'A' if row['FTHG'] < row['FTAG']
+                   else 'D', axis=1
+    )
+    return df
+
+
+def legacy_openfootball(matches):
+    """Pre-vectorization list-of-dicts loop from _fetch_current_season"""
+    def calculate_result(score1, score2):
+        if score1 is None or score2 is None:
+            return None
+        return 'H' if score1 > score2 else 'A' if score1 < score2 else 'D'
+
+    rows = []
+    for match in matches:
+        rows.append({
+            'Date': match.get('date', ''),
+            'HomeTeam': match.get('team1', ''),
+            'AwayTeam': match.get('team2', ''),
+            'FTHG': match.get('score1', 0) if match.get('score1') is not None else None,
+            'FTAG': match.get('score2', 0) if match.get('score2') is not None else None,
+            'FTR': calculate_result(match.get('score1'), match.get('score2'))
+        })
+    return pd.DataFrame(rows)
+
+
+def make_inputs(n_matches, seed=0):
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"Team {i}" for i in range(20)])
+    home = teams[rng.integers(0, 20, n_matches)]
+    away = teams[rng.integers(0, 20, n_matches)]
+    fthg = rng.poisson(1.5, n_matches)
+    ftag = rng.poisson(1.2, n_matches)
+    dates = pd.Timestamp('2000-08-01') + pd.to_timedelta(rng.integers(0, 9000, n_matches), unit='D')
+
+    footballcsv = pd.DataFrame({
+        'Date': dates.strftime('%a %b %d %Y'),
+        'Team 1': home,
+        'FT': [f"{h}-{a}" for h, a in zip(fthg, ftag)],
+        'HT': [f"{h // 2}-{a // 2}" for h, a in zip(fthg, ftag)],
+        'Team 2': away
+    })
+    datahub = pd.DataFrame({
+        'Date': dates.strftime('%d/%m/%Y'),
+        'HomeTeam': home,
+        'AwayTeam': away,
+        'FTHG': fthg,
+        'FTAG': ftag
+    })
+    openfootball = [
+        {'date': d, 'team1': h, 'team2': a, 'score1': int(g1), 'score2': int(g2)}
+        for d, h, a, g1, g2 in zip(dates.strftime('%Y-%m-%d'), home, away, fthg, ftag)
+    ]
+    return footballcsv, datahub, openfootball
+
+
+def best_of(func, arg, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes=(1000, 10000, 100000)):
+    results = []
+    for n_matches in sizes:
+        footballcsv, datahub, openfootball = make_inputs(n_matches)
+        for name, legacy, vectorized, data in [
+            ('footballcsv', legacy_standardize_footballcsv, normalize_matches, footballcsv),
+            ('datahub', legacy_standardize_datahub, normalize_matches, datahub),
+            ('openfootball', legacy_openfootball, normalize_openfootball, openfootball)
+        ]:
+            legacy_time = best_of(legacy, data)
+            vectorized_time = best_of(vectorized, data)
+            results.append({
+                'source': name,
+                'matches': n_matches,
+                'legacy_s': legacy_time,
+                'vectorized_s': vectorized_time,
+                'speedup': legacy_time / vectorized_time if vectorized_time > 0 else float('inf')
+            })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'source':<14}{'matches':>9}{'legacy (s)':>13}{'vectorized (s)':>16}{'speedup':>9}")
+    for row in run():
+        print(f"{row['source']:<14}{row['matches']:>9}{row['legacy_s']:>13.4f}{row['vectorized_s']:>16.4f}{row['speedup']:>8.1f}x")
@@ -0,0 +1,84 @@
+"""Scaling of the grouped team statistics build against the previous per-team loop.
+
+Run from the repository root: python -m benchmarks.bench_team_stats
+"""
+import time
+from match_table import build_match_table
+from synthetic_data import SyntheticLeague
+from team_stats import build_team_table
+
+
+def legacy_team_statistics(historical_data):
+    """Pre-vectorization SerieAPredictionEngine._calculate_team_statistics"""
+    team_stats = {}
+    all_teams = set(historical_data['HomeTeam'].unique()).union(set(historical_data['AwayTeam'].unique()))
+
+    for team in all_teams:
+        home_matches = historical_data[historical_data['HomeTeam'] == team]
+        away_matches = historical_data[historical_data['AwayTeam'] == team]
+        total_matches = len(home_matches) + len(away_matches)
+        if total_matches == 0:
+            continue
+
+        home_wins = len(home_matches[home_matches['FTR'] == 'H'])
+        away_wins = len(away_matches[away_matches['FTR'] == 'A'])
+        draws = len(home_matches[home_matches['FTR'] == 'D']) + len(away_matches[away_matches['FTR'] == 'D'])
+        total_goals_for = home_matches['FTHG'].sum() + away_matches['FTAG'].sum()
+        total_goals_against = home_matches['FTAG'].sum() + away_matches['FTHG'].sum()
+        corners_for = home_matches['HC'].sum() + away_matches['AC'].sum()
+        cards = home_matches['HY'].sum() + home_matches['HR'].sum() + away_matches['AY'].sum() + away_matches['AR'].sum()
+
+        team_stats[team] = {
+            'total_matches': total_matches,
+            'wins': home_wins + away_wins,
+            'draws': draws,
+            'losses': total_matches - (home_wins + away_wins + draws),
+            'goals_for': total_goals_for,
+            'goals_against': total_goals_against,
+            'goals_per_match': total_goals_for / total_matches,
+            'win_rate': (home_wins + away_wins) / total_matches,
+            'home_win_rate': home_wins / len(home_matches) if len(home_matches) > 0 else 0,
+            'away_win_rate': away_wins / len(away_matches) if len(away_matches) > 0 else 0,
+            'corners_per_match': corners_for / total_matches,
+            'cards_per_match': cards / total_matches
+        }
+
+    return team_stats
+
+
+def make_matches(n_teams, n_matches, seed=0):
+    """First n_matches of a seeded synthetic league with n_teams teams, as a compact match table"""
+    n_seasons = -(-n_matches // (n_teams * (n_teams - 1)))
+    raw = SyntheticLeague(n_teams=n_teams, n_seasons=n_seasons, seed=seed).matches()
+    return build_match_table(raw.iloc[:n_matches])
+
+
+def timed(func, arg, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(cases=((20, 760), (20, 7600), (60, 7600), (100, 76000))):
+    results = []
+    for n_teams, n_matches in cases:
+        table = make_matches(n_teams, n_matches)
+        legacy_time = timed(legacy_team_statistics, table)
+        grouped_time = timed(build_team_table, table)
+        results.append({
+            'teams': n_teams,
+            'matches': n_matches,
+            'legacy_s': legacy_time,
+            'grouped_s': grouped_time,
+            'speedup': legacy_time / grouped_time if grouped_time > 0 else float('inf')
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'teams':>6}{'matches':>9}{'legacy (s)':>13}{'grouped (s)':>13}{'speedup':>9}")
+    for row in run():
+        print(f"{row['teams']:>6}{row['matches']:>9}{row['legacy_s']:>13.4f}{row['grouped_s']:>13.4f}{row['speedup']:>8.1f}x")
@@ -0,0 +1,233 @@
+"""Offline benchmark suite: engine, fetchers, scraper loads and API responses at several data sizes.
+
+Match histories, injuries and transfers come from the seeded synthetic league generator. Every
+component is built directly from that data and handed to the app through create_app(), so no
+season refresh or background thread runs; API responses go through Flask's test client.
+
+Results are written as JSON (one file per run, named after the commit) so runs can be compared
+between commits.
+
+Run from the repository root:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes small medium --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Everything runs offline against generated data, with caches in a scratch directory
+os.environ.setdefault('SERIE_A_OFFLINE', '1')
+_scratch = tempfile.mkdtemp(prefix='serie_a_bench_')
+os.environ.setdefault('SERIE_A_CACHE_DIR', os.path.join(_scratch, 'seasons'))
+os.environ.setdefault('SERIE_A_RATINGS_PATH', os.path.join(_scratch, 'elo_ratings.json'))
+
+import numpy as np
+import pandas as pd
+import app
+from benchmarks.bench_standardize import make_inputs
+from data_fetcher import SerieADataFetcher
+from elo_ratings import EloRatings
+from fixtures_fetcher import SerieAFixturesFetcher
+from injury_scraper import InjuryDataScraper
+from injury_snapshot import InjurySnapshot
+from prediction_cache import PredictionCache
+from prediction_engine import SerieAPredictionEngine
+from synthetic_data import SyntheticLeague
+from transfer_scraper import TransferDataScraper, parse_transfer_columns
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# name: (teams, seasons, injury records, transfer records); small is about today's real data
+SIZES = {
+    'small': (20, 2, 8, 8),
+    'medium': (20, 20, 80, 80),
+    'large': (40, 25, 800, 800)
+}
+
+
+class FrameInjuryScraper(InjuryDataScraper):
+    """Injury scraper serving a fixed frame instead of the built-in records"""
+
+    def __init__(self, injuries):
+        super().__init__()
+        self.injuries = injuries
+
+    def scrape_injury_data(self, fetch=False):
+        return self.injuries.copy()
+
+
+class FrameTransferScraper(TransferDataScraper):
+    """Transfer scraper serving a fixed frame instead of the built-in records"""
+
+    def __init__(self, transfers, teams):
+        super().__init__()
+        self.transfers = transfers
+        self.serie_a_teams = teams
+
+    def get_current_transfer_data(self):
+        return self.transfers.copy()
+
+
+class FixedFixturesFetcher(SerieAFixturesFetcher):
+    """Fixtures fetcher serving a fixed list of upcoming fixtures"""
+
+    def __init__(self, fixtures):
+        super().__init__()
+        self.fixtures = fixtures
+
+    def get_upcoming_fixtures(self, days_ahead=14):
+        return [dict(fixture) for fixture in self.fixtures]
+
+
+def measure(func, repeat=5):
+    """Wall time over several runs, then peak traced memory of one more run.
+
+    One untimed run goes first, so lazy loads (injury and transfer snapshots, merged
+    match tables) are not charged to whichever case happens to touch them first.
+    """
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_memory_mb': peak / (1024 * 1024)
+    }
+
+
+def build_cases(n_teams, n_seasons, n_injuries, n_transfers):
+    """(name, callable) for every benchmarked path at one data size"""
+    league = SyntheticLeague(n_teams=n_teams, n_seasons=n_seasons, seed=0)
+    history = league.matches()
+    teams = league.all_teams()
+    injuries = league.injuries(n_injuries)
+    transfers = league.transfers(n_transfers)
+
+    # Raw source formats for the standardization paths, same number of matches
+    fetcher = SerieADataFetcher()
+    footballcsv, datahub, _ = make_inputs(len(history))
+
+    injury_scraper = FrameInjuryScraper(injuries)
+    transfer_scraper = FrameTransferScraper(transfers, teams)
+
+    def new_engine():
+        # No prediction cache and no persisted ratings, so every run does the full work
+        return SerieAPredictionEngine(None, injury_scraper, transfer_scraper,
+                                      prediction_cache=PredictionCache(max_entries=0),
+                                      elo_ratings=EloRatings(persist=False), historical_data=history)
+
+    engine = new_engine()
+    fixtures = [{'home_team': teams[i], 'away_team': teams[(i + 1) % len(teams)], 'date': '2025-09-01',
+                 'time': '20:45', 'round': 'Matchday 1', 'days_from_now': 1} for i in range(10)]
+    typed_transfers = parse_transfer_columns(transfers)
+
+    # The real /api/predictions route for those fixtures, on the same engine
+    client = app.create_app(data_fetcher=fetcher, injury_scraper=injury_scraper, transfer_scraper=transfer_scraper,
+                            fixtures_fetcher=FixedFixturesFetcher(fixtures), prediction_engine=engine).test_client()
+
+    def predictions_response():
+        response = client.get('/api/predictions')
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/predictions answered {response.status_code}: {response.get_data(as_text=True)}")
+        return response.get_data()
+
+    return [
+        ('engine_init', new_engine),
+        ('team_statistics', engine._calculate_team_statistics),
+        ('predict_match', lambda: engine.predict_match(teams[0], teams[1])),
+        ('predict_matches_10', lambda: engine.predict_matches(fixtures)),
+        ('standardize_footballcsv', lambda: fetcher.standardize_data(footballcsv)),
+        ('standardize_datahub', lambda: fetcher._standardize_datahub_format(datahub)),
+        # Per-refresh builds; lookups afterwards are dict reads and not worth timing
+        ('injury_snapshot_build', lambda: InjurySnapshot(injuries)),
+        ('transfer_load', lambda: transfer_scraper._load(transfers)),
+        ('transfer_strength_table', lambda: transfer_scraper._build_strength_table(typed_transfers)),
+        ('transfer_summary', transfer_scraper.get_transfer_summary),
+        ('predictions_response', predictions_response)
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(sizes=('small', 'medium'), repeat=5):
+    results = []
+    for size in sizes:
+        n_teams, n_seasons, n_injuries, n_transfers = SIZES[size]
+        n_matches = n_teams * (n_teams - 1) * n_seasons
+        for name, func in build_cases(n_teams, n_seasons, n_injuries, n_transfers):
+            print(f"  {size:<8}{name}", file=sys.stderr)
+            results.append({'size': size, 'teams': n_teams, 'matches': n_matches, 'case': name, **measure(func, repeat)})
+
+    return {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare(report, baseline):
+    """Median-time ratio against a previous report, per (size, case)"""
+    previous = {(row['size'], row['case']): row for row in baseline['results']}
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('created_at')})")
+    print(f"{'size':<8}{'case':<30}{'before (s)':>12}{'after (s)':>12}{'ratio':>8}")
+    for row in report['results']:
+        before = previous.get((row['size'], row['case']))
+        if before is None:
+            continue
+        ratio = row['seconds_median'] / before['seconds_median'] if before['seconds_median'] > 0 else float('inf')
+        print(f"{row['size']:<8}{row['case']:<30}{before['seconds_median']:>12.5f}{row['seconds_median']:>12.5f}{ratio:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument('--sizes', nargs='+', default=['small', 'medium'], choices=sorted(SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument('--compare', help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{report['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'size':<8}{'case':<30}{'median (s)':>12}{'min (s)':>12}{'peak MB':>10}")
+    for row in report['results']:
+        print(f"{row['size']:<8}{row['case']:<30}{row['seconds_median']:>12.5f}{row['seconds_min']:>12.5f}{row['peak_memory_mb']:>10.2f}")
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
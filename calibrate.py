@@ -0,0 +1,280 @@
+"""Calibrate the prediction weights against historical outcomes with walk-forward evaluation.
+
+Feature arrays are collected once by replaying the history through the backtest (every
+match sees only earlier results). Each candidate weight set is then one vectorized pass over
+those arrays, and candidates are scored in parallel across a process pool.
+
+The replay is cut into consecutive date blocks. For every block after the first, the best
+candidate on all earlier blocks is scored on that block; the mean of those out-of-sample
+scores decides whether a calibrated group replaces the current weights. The result is
+written as a new version of prediction_params.json, which the engine loads at startup.
+
+    python calibrate.py --seasons 2023-24 2024-25 --candidates 4000
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from backtest import WalkForwardBacktest
+from prediction_engine import SerieAPredictionEngine
+from prediction_params import GROUPS, load_params, save_params
+
+# Sampling range of every tuned weight; line specs are addressed as '<line>.<field>'
+SEARCH_SPACE = {
+    'result': {
+        'base_home': (0.30, 0.60),
+        'base_draw': (0.15, 0.40),
+        'base_away': (0.15, 0.45),
+        'home_win_rate_center': (0.3, 0.7),
+        'away_win_rate_center': (0.1, 0.5),
+        'win_rate_weight': (0.0, 1.0),
+        'form_factor': (0.0, 0.15),
+        'h2h_factor': (0.0, 0.2),
+        'elo_factor': (0.0, 1.5),
+        'max_draw': (0.25, 0.5)
+    },
+    'goals': {
+        'form_weight': (0.0, 1.0),
+        'h2h_weight': (0.0, 1.0),
+        'over_1_5.base': (50, 85),
+        'over_1_5.slope': (5, 40),
+        'over_2_5.base': (35, 65),
+        'over_2_5.slope': (5, 40),
+        'btts.base': (35, 65),
+        'btts.slope': (5, 30)
+    },
+    'advanced': {
+        'corners_over_9_5.base': (30, 70),
+        'corners_over_9_5.slope': (2, 20),
+        'corners_over_10_5.base': (25, 65),
+        'corners_over_10_5.slope': (2, 20),
+        'cards_over_3_5.base': (35, 75),
+        'cards_over_3_5.slope': (2, 20),
+        'cards_over_4_5.base': (20, 60),
+        'cards_over_4_5.slope': (2, 20)
+    }
+}
+
+# Set once per worker process so candidates are the only thing sent per task
+_worker_state = {}
+
+
+def _init_worker(features, outcomes, blocks, n_blocks):
+    _worker_state.update(features=features, outcomes=outcomes, blocks=blocks, n_blocks=n_blocks)
+
+
+def outcome_arrays(replay):
+    """Observed market outcomes per replayed match; NaN where the source has no record"""
+    def stat(col):
+        if col not in replay.columns:
+            return np.full(len(replay), np.nan)
+        return pd.to_numeric(replay[col], errors='coerce').to_numpy(dtype=np.float64)
+
+    home_goals = stat('FTHG')
+    away_goals = stat('FTAG')
+    corners = stat('HC') + stat('AC')
+    cards = stat('HY') + stat('AY') + stat('HR') + stat('AR')
+
+    def over(values, line):
+        return np.where(np.isnan(values), np.nan, values > line)
+
+    return {
+        'result': np.column_stack([home_goals > away_goals, home_goals == away_goals,
+                                   home_goals < away_goals]).astype(np.float64),
+        'over_1_5': over(home_goals + away_goals, 1.5),
+        'over_2_5': over(home_goals + away_goals, 2.5),
+        'btts': ((home_goals > 0) & (away_goals > 0)).astype(np.float64),
+        'corners_over_9_5': over(corners, 9.5),
+        'corners_over_10_5': over(corners, 10.5),
+        'cards_over_3_5': over(cards, 3.5),
+        'cards_over_4_5': over(cards, 4.5)
+    }
+
+
+def match_losses(group, params, features, outcomes):
+    """Per-match Brier score of one weight group (summed over that group's markets); NaN if unknown"""
+    if group == 'result':
+        probabilities = np.column_stack(SerieAPredictionEngine.result_probabilities(features, params))
+        return np.sum((probabilities - outcomes['result']) ** 2, axis=1)
+
+    if group == 'goals':
+        total = SerieAPredictionEngine.expected_goals(features, params)[2]
+        markets = {'over_1_5': total, 'over_2_5': total, 'btts': total}
+    else:
+        corners = features['home_corners'] + features['away_corners']
+        cards = features['home_cards'] + features['away_cards']
+        markets = {'corners_over_9_5': corners, 'corners_over_10_5': corners,
+                   'cards_over_3_5': cards, 'cards_over_4_5': cards}
+
+    loss = np.zeros(len(features['home_elo']))
+    for market, values in markets.items():
+        spec = params[market]
+        probability = np.clip(spec['base'] + (values - spec['line']) * spec['slope'], spec['min'], spec['max']) / 100
+        loss += (probability - outcomes[market]) ** 2
+    return loss
+
+
+def evaluate_candidates(group, candidates):
+    """(candidates, blocks) summed loss; runs in a worker initialised by _init_worker"""
+    state = _worker_state
+    totals = np.empty((len(candidates), state['n_blocks']))
+    for i, params in enumerate(candidates):
+        loss = match_losses(group, params, state['features'], state['outcomes'])
+        known = ~np.isnan(loss)
+        totals[i] = np.bincount(state['blocks'][known], loss[known], state['n_blocks'])
+    return totals
+
+
+def sample_candidates(group, current, n_candidates, rng):
+    """Current weights first, then uniform random draws over the group's search space"""
+    space = SEARCH_SPACE[group]
+    candidates = [current]
+    for _ in range(n_candidates - 1):
+        candidate = copy.deepcopy(current)
+        for name, (low, high) in space.items():
+            value = float(rng.uniform(low, high))
+            if '.' in name:
+                line, field = name.split('.')
+                candidate[line][field] = value
+            else:
+                candidate[name] = value
+        candidates.append(candidate)
+    return candidates
+
+
+def walk_forward_selection(totals, counts):
+    """Out-of-sample loss of 'best on earlier blocks' vs the current weights (candidate 0)"""
+    calibrated, current = [], []
+    for block in range(1, totals.shape[1]):
+        if counts[block] == 0 or counts[:block].sum() == 0:
+            continue
+        chosen = np.argmin(totals[:, :block].sum(axis=1))
+        calibrated.append(totals[chosen, block] / counts[block])
+        current.append(totals[0, block] / counts[block])
+
+    if not calibrated:
+        return None, None
+    return float(np.mean(calibrated)), float(np.mean(current))
+
+
+class Calibrator:
+    """Random search of the predictor weights, one weight group at a time"""
+
+    def __init__(self, matches, warmup_matches=100, n_blocks=5, workers=None, params=None):
+        self.backtest = WalkForwardBacktest(matches, warmup_matches=warmup_matches, params=params)
+        self.n_blocks = n_blocks
+        self.workers = workers or int(os.environ.get('SERIE_A_CALIBRATION_WORKERS', os.cpu_count() or 1))
+        self.params = params or load_params()
+
+    def run(self, n_candidates=2000, seed=0, chunk_size=250):
+        """Calibrated parameter set (with its walk-forward report under 'calibration')"""
+        print("Collecting walk-forward features...")
+        features, replay = self.backtest.collect_features()
+        if replay.empty:
+            raise ValueError("No matches after the warm-up to calibrate on")
+        outcomes = outcome_arrays(replay)
+
+        # Consecutive date blocks of roughly equal size
+        n_blocks = max(2, min(self.n_blocks, len(replay)))
+        blocks = np.minimum((np.arange(len(replay)) * n_blocks) // len(replay), n_blocks - 1)
+
+        rng = np.random.default_rng(seed)
+        params = copy.deepcopy(self.params)
+        report = {}
+
+        _init_worker(features, outcomes, blocks, n_blocks)
+        pool = None
+        if self.workers > 1:
+            try:
+                pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                           initargs=(features, outcomes, blocks, n_blocks))
+            except Exception as e:
+                print(f"Process pool unavailable, evaluating inline: {e}")
+
+        try:
+            for group in GROUPS:
+                candidates = sample_candidates(group, self.params[group], n_candidates, rng)
+                chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+                print(f"Evaluating {len(candidates)} {group} candidates...")
+
+                totals = None
+                if pool is not None:
+                    try:
+                        totals = np.vstack(list(pool.map(evaluate_candidates, [group] * len(chunks), chunks)))
+                    except Exception as e:
+                        print(f"Process pool failed, evaluating inline: {e}")
+                if totals is None:
+                    totals = np.vstack([evaluate_candidates(group, chunk) for chunk in chunks])
+
+                # Matches with a known outcome per block (the same for every candidate)
+                loss = match_losses(group, candidates[0], features, outcomes)
+                counts = np.bincount(blocks[~np.isnan(loss)], minlength=n_blocks)
+                report[group] = self._select(group, candidates, totals, counts, params)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        fingerprint = hashlib.sha1(json.dumps({group: params[group] for group in GROUPS},
+                                              sort_keys=True).encode()).hexdigest()[:8]
+        params['version'] = f"calibrated-{datetime.now().strftime('%Y%m%d')}-{fingerprint}"
+        params['calibration'] = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'previous_version': self.params['version'],
+            'matches': len(replay),
+            'warmup_matches': len(self.backtest.matches) - len(replay),
+            'blocks': n_blocks,
+            'candidates': n_candidates,
+            'seed': seed,
+            'loss': 'brier',
+            'groups': report
+        }
+        return params
+
+    def _select(self, group, candidates, totals, counts, params):
+        """Adopt the best candidate when it beats the current weights out of sample"""
+        if counts.sum() == 0:
+            print(f"  {group}: no outcomes recorded, keeping current weights")
+            return {'accepted': False, 'matches': 0}
+
+        calibrated_loss, current_loss = walk_forward_selection(totals, counts)
+        best = int(np.argmin(totals.sum(axis=1)))
+        accepted = calibrated_loss is not None and calibrated_loss < current_loss and best != 0
+        if accepted:
+            params[group] = candidates[best]
+
+        print(f"  {group}: walk-forward Brier {calibrated_loss} vs current {current_loss} "
+              f"-> {'calibrated' if accepted else 'kept current'}")
+        return {
+            'accepted': accepted,
+            'matches': int(counts.sum()),
+            'walk_forward_loss': calibrated_loss,
+            'current_walk_forward_loss': current_loss,
+            'in_sample_loss': float(totals[best].sum() / counts.sum()),
+            'current_in_sample_loss': float(totals[0].sum() / counts.sum())
+        }
+
+
+if __name__ == "__main__":
+    from data_fetcher import SerieADataFetcher
+
+    parser = argparse.ArgumentParser(description="Calibrate the prediction weights with walk-forward evaluation")
+    parser.add_argument('--seasons', nargs='+', default=['2023-24', '2024-25'])
+    parser.add_argument('--warmup', type=int, default=100, help="Matches used as history before scoring starts")
+    parser.add_argument('--candidates', type=int, default=2000, help="Random candidates per weight group")
+    parser.add_argument('--blocks', type=int, default=5, help="Consecutive date blocks for walk-forward selection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', help="Parameter file to write (default: the one the engine loads)")
+    args = parser.parse_args()
+
+    matches = SerieADataFetcher().get_multiple_seasons_data(args.seasons)
+    calibrator = Calibrator(matches, warmup_matches=args.warmup, n_blocks=args.blocks, workers=args.workers)
+    params = calibrator.run(n_candidates=args.candidates, seed=args.seed)
+    save_params(params, args.output)
+    print(f"Saved prediction parameters {params['version']}")
@@ -1,9 +1,16 @@
+import io
+import os
 import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from http_client import get_http_client
+from metrics import timed
+from match_schema import normalize_matches, normalize_openfootball
+from season_cache import SeasonCache
+from team_stats import build_team_table
 
 class SerieADataFetcher:
-    def __init__(self):
+    def __init__(self, season_cache=None, live_ttl=None, max_workers=4, source_timeout=None, load_deadline=None, http_client=None):
         # Multiple data sources for different seasons
         self.data_sources = {
             "datahub": "https://r2.datahub.io/cm2t6nt7l0000ma0cqp9qgewa/main/raw/",
@@ -11,15 +18,81 @@ class SerieADataFetcher:
             "openfootball_json": "https://raw.githubusercontent.com/openfootball/football.json/master/"
         }
 
+        # Season still being played; every other season is complete and cached forever
+        self.current_season = "2025-26"
+
+        # Local season store and how long (seconds) the live season is served before revalidating
+        self.season_cache = season_cache or SeasonCache()
+        self.live_ttl = live_ttl if live_ttl is not None else int(os.environ.get('SERIE_A_LIVE_TTL', 900))
+
+        # Seasons are loaded concurrently on a bounded pool; each source request has its own
+        # timeout and a multi-season load gives up waiting after load_deadline seconds
+        self.max_workers = max_workers
+        self.source_timeout = source_timeout if source_timeout is not None else float(os.environ.get('SERIE_A_SOURCE_TIMEOUT', 10))
+        self.load_deadline = load_deadline if load_deadline is not None else float(os.environ.get('SERIE_A_LOAD_DEADLINE', 30))
+        self._executor = None
+
+        # Shared pooled HTTP client (keep-alive, retries, counters)
+        self.http = http_client or get_http_client()
+
+    @timed('fetcher.fetch_season_data')
     def fetch_season_data(self, season="2024-25"):
-        """Fetch Serie A data for specific season with multiple sources"""
+        """Fetch Serie A data for specific season, served from the local season cache when possible"""
+        cached = self.season_cache.get(season)
+        if cached is not None:
+            cached_df, meta = cached
+            if self.season_cache.is_fresh(meta, self.live_ttl):
+                print(f"Serving season {season} from local cache ({meta['rows']} matches)")
+                return cached_df
+        else:
+            cached_df, meta = None, None
+
         print(f"Fetching Serie A data for season {season}...")
+        df = self._fetch_from_sources(season, meta)
+
+        if df.attrs.get('not_modified'):
+            # Upstream confirmed the cached copy is still current
+            print(f"Season {season} not modified upstream, keeping cached copy")
+            self.season_cache.touch(season)
+            return cached_df
+
+        if df.attrs.get('source') == 'dummy':
+            # Every source failed: keep serving the last good copy if we have one
+            if cached_df is not None:
+                print(f"Upstream unavailable, serving stale cached season {season}")
+                return cached_df
+            return df
+
+        # A fallback source is cached but revalidated, so the primary copy replaces it later
+        degraded = df.attrs.get('source') != self._primary_source(season)
+        if degraded:
+            print(f"Season {season} served by fallback source {df.attrs.get('source')}, will revalidate")
+
+        self.season_cache.put(
+            season, df,
+            complete=season != self.current_season,
+            source=df.attrs.get('source'),
+            etag=df.attrs.get('etag'),
+            last_modified=df.attrs.get('last_modified'),
+            degraded=degraded
+        )
+        return df
+
+    def _primary_source(self, season):
+        """Source _fetch_from_sources tries first for a season"""
+        if season == "2024-25":
+            return 'datahub'
+        elif season == self.current_season:
+            return 'openfootball_json'
+        return 'footballcsv'
 
+    def _fetch_from_sources(self, season, cached_meta=None):
+        """Download a season from the upstream source that serves it"""
         # Try different sources based on season
         if season == "2024-25":
             return self._fetch_datahub_season(season)
-        elif season == "2025-26":
-            return self._fetch_current_season(season)
+        elif season == self.current_season:
+            return self._fetch_current_season(season, cached_meta)
         else:
             # Fallback to old Football-CSV for historical data
             return self._fetch_footballcsv_season(season)
@@ -32,40 +105,45 @@ class SerieADataFetcher:
             url = f"{self.data_sources['datahub']}season-{season_code}.csv"
             print(f"Fetching from DataHub: {url}")
 
-            df = pd.read_csv(url)
+            df = self._read_csv(url)
             print(f"Successfully loaded {len(df)} matches from DataHub")
-            return self._standardize_datahub_format(df)
+            df = self._standardize_datahub_format(df)
+            df.attrs['source'] = 'datahub'
+            return df
 
         except Exception as e:
             print(f"DataHub failed: {e}")
             return self._fetch_footballcsv_season(season)
 
-    def _fetch_current_season(self, season):
+    def _fetch_current_season(self, season, cached_meta=None):
         """Fetch current 2025-26 season from OpenFootball JSON"""
         try:
             # OpenFootball JSON format for current season
             url = f"{self.data_sources['openfootball_json']}{season}/it.1.json"
             print(f"Fetching current season from OpenFootball: {url}")
 
-            import requests
-            response = requests.get(url)
+            # Revalidate a cached copy instead of downloading it again
+            headers = {}
+            if cached_meta is not None:
+                if cached_meta.get('etag'):
+                    headers['If-None-Match'] = cached_meta['etag']
+                if cached_meta.get('last_modified'):
+                    headers['If-Modified-Since'] = cached_meta['last_modified']
+
+            response = self.http.get(url, headers=headers, timeout=self._timeout())
+            if response.status_code == 304:
+                df = pd.DataFrame()
+                df.attrs['not_modified'] = True
+                return df
+            response.raise_for_status()
             json_data = response.json()
 
-            # Convert JSON to DataFrame
-            matches = []
-            if 'matches' in json_data:
-                for match in json_data['matches']:
-                    matches.append({
-                        'Date': match.get('date', ''),
-                        'HomeTeam': match.get('team1', ''),
-                        'AwayTeam': match.get('team2', ''),
-                        'FTHG': match.get('score1', 0) if match.get('score1') is not None else None,
-                        'FTAG': match.get('score2', 0) if match.get('score2') is not None else None,
-                        'FTR': self._calculate_result(match.get('score1'), match.get('score2'))
-                    })
-
-            df = pd.DataFrame(matches)
+            # Convert JSON match list to the canonical schema in one vectorized pass
+            df = normalize_openfootball(json_data.get('matches', []))
             print(f"Successfully loaded {len(df)} matches from OpenFootball")
+            df.attrs['source'] = 'openfootball_json'
+            df.attrs['etag'] = response.headers.get('ETag')
+            df.attrs['last_modified'] = response.headers.get('Last-Modified')
             return df
 
         except Exception as e:
@@ -78,8 +156,9 @@ class SerieADataFetcher:
             url = f"{self.data_sources['openfootball_csv']}{season}/it.1.csv"
             print(f"Fetching from Football-CSV: {url}")
 
-            df = pd.read_csv(url)
+            df = self._read_csv(url)
             df = self.standardize_data(df)  # Use existing method
+            df.attrs['source'] = 'footballcsv'
 
             print(f"Successfully loaded {len(df)} matches from Football-CSV")
             return df
@@ -88,35 +167,53 @@ class SerieADataFetcher:
             print(f"All sources failed: {e}")
             return self.create_dummy_data()
 
+    def _timeout(self):
+        """Connect timeout from the shared client, read timeout per source"""
+        return (self.http.connect_timeout, self.source_timeout)
+
+    def _read_csv(self, url):
+        """Download a CSV through the pooled client (pd.read_csv(url) opens a fresh connection with no timeout)"""
+        response = self.http.get(url, timeout=self._timeout())
+        response.raise_for_status()
+        return pd.read_csv(io.StringIO(response.text))
+
     def _standardize_datahub_format(self, df):
         """Standardize DataHub CSV format"""
         # DataHub already has standard format: Date, HomeTeam, AwayTeam, FTHG, FTAG, FTR, etc.
-        if all(col in df.columns for col in ['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']):
-            # Calculate FTR if missing
-            if 'FTR' not in df.columns:
-                df['FTR'] = df.apply(
-                    lambda row: 'H' if row['FTHG'] > row['FTAG']
-                               else 'A' if row['FTHG'] < row['FTAG']
-                               else 'D', axis=1
-                )
-            return df
-        else:
-            # If format is different, use existing standardization
-            return self.standardize_data(df)
+        return normalize_matches(df)
 
-    def _calculate_result(self, score1, score2):
-        """Calculate match result from scores"""
-        if score1 is None or score2 is None:
-            return None  # Match not played yet
-        return 'H' if score1 > score2 else 'A' if score1 < score2 else 'D'
+    @timed('fetcher.get_multiple_seasons_data')
+    def get_multiple_seasons_data(self, seasons=["2023-24", "2024-25", "2025-26"], deadline=None):
+        """Get data from multiple seasons for better predictions, fetching seasons concurrently"""
+        deadline = self.load_deadline if deadline is None else deadline
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="season-fetch")
+
+        print(f"\n=== Fetching seasons {', '.join(seasons)} ===")
+        futures = {season: self._executor.submit(self.fetch_season_data, season) for season in seasons}
+        done, _ = wait(futures.values(), timeout=deadline)
 
-    def get_multiple_seasons_data(self, seasons=["2023-24", "2024-25", "2025-26"]):
-        """Get data from multiple seasons for better predictions"""
         all_data = []
 
+        # Merge in the requested season order, whatever order the fetches finished in
         for season in seasons:
-            print(f"\n=== Fetching season {season} ===")
-            season_data = self.fetch_season_data(season)
+            future = futures[season]
+            if future in done:
+                try:
+                    season_data = future.result()
+                except Exception as e:
+                    print(f"Season {season} failed: {e}")
+                    continue
+            else:
+                # Still running: the fetch keeps going and will populate the cache for next time
+                print(f"Season {season} missed the {deadline}s deadline")
+                cached = self.season_cache.get(season)
+                if cached is None:
+                    continue
+                print(f"Serving stale cached season {season}")
+                season_data = cached[0]
+
             if not season_data.empty:
                 season_data['Season'] = season
                 all_data.append(season_data)
@@ -131,33 +228,7 @@ class SerieADataFetcher:
     def standardize_data(self, df):
         """Convert Football-CSV format to standard format"""
         # Football-CSV format: Date, Team 1, FT, HT, Team 2
-        standardized_df = pd.DataFrame()
-
-        if 'Team 1' in df.columns and 'Team 2' in df.columns:
-            standardized_df['Date'] = df['Date']
-            standardized_df['HomeTeam'] = df['Team 1']
-            standardized_df['AwayTeam'] = df['Team 2']
-
-            # Parse FT scores (e.g., "2-1" -> FTHG=2, FTAG=1)
-            if 'FT' in df.columns:
-                ft_scores = df['FT'].str.split('-', expand=True)
-                standardized_df['FTHG'] = pd.to_numeric(ft_scores[0], errors='coerce')
-                standardized_df['FTAG'] = pd.to_numeric(ft_scores[1], errors='coerce')
-
-                # Calculate result (H/A/D)
-                standardized_df['FTR'] = standardized_df.apply(
-                    lambda row: 'H' if row['FTHG'] > row['FTAG']
-                               else 'A' if row['FTHG'] < row['FTAG']
-                               else 'D', axis=1
-                )
-
-            # Parse HT scores if available
-            if 'HT' in df.columns:
-                ht_scores = df['HT'].str.split('-', expand=True)
-                standardized_df['HTHG'] = pd.to_numeric(ht_scores[0], errors='coerce')
-                standardized_df['HTAG'] = pd.to_numeric(ht_scores[1], errors='coerce')
-
-        return standardized_df
+        return normalize_matches(df)
 
     def create_dummy_data(self):
         """Create dummy data for testing"""
@@ -170,7 +241,9 @@ class SerieADataFetcher:
             'FTAG': [1, 1, 2],  # Full Time Away Goals
             'FTR': ['H', 'D', 'A']  # Full Time Result
         }
-        return pd.DataFrame(dummy_data)
+        df = pd.DataFrame(dummy_data)
+        df.attrs['source'] = 'dummy'  # Never persisted in the season cache
+        return df
 
     def get_basic_stats(self, df):
         """Get basic statistics from the data"""
@@ -184,39 +257,17 @@ class SerieADataFetcher:
 
     def get_teams(self, df):
         """Extract unique teams from match data"""
+        table = build_team_table(df)
+
         teams = []
-        if 'HomeTeam' in df.columns and 'AwayTeam' in df.columns:
-            home_teams = set(df['HomeTeam'].unique())
-            away_teams = set(df['AwayTeam'].unique())
-            all_teams = home_teams.union(away_teams)
-
-            for team in sorted(all_teams):
-                # Get team stats
-                home_matches = df[df['HomeTeam'] == team]
-                away_matches = df[df['AwayTeam'] == team]
-
-                total_matches = len(home_matches) + len(away_matches)
-
-                if 'FTR' in df.columns:
-                    home_wins = len(home_matches[home_matches['FTR'] == 'H'])
-                    away_wins = len(away_matches[away_matches['FTR'] == 'A'])
-                    total_wins = home_wins + away_wins
-
-                    home_draws = len(home_matches[home_matches['FTR'] == 'D'])
-                    away_draws = len(away_matches[away_matches['FTR'] == 'D'])
-                    total_draws = home_draws + away_draws
-
-                    total_losses = total_matches - total_wins - total_draws
-                else:
-                    total_wins = total_draws = total_losses = 0
-
-                teams.append({
-                    'name': team,
-                    'matches_played': total_matches,
-                    'wins': total_wins,
-                    'draws': total_draws,
-                    'losses': total_losses
-                })
+        for team, stats in table.iterrows():
+            teams.append({
+                'name': team,
+                'matches_played': int(stats['total_matches']),
+                'wins': int(stats['wins']),
+                'draws': int(stats['draws']),
+                'losses': int(stats['losses'])
+            })
 
         return teams
 
@@ -0,0 +1,149 @@
+import os
+import json
+import tempfile
+import threading
+import numpy as np
+
+STATE_FORMAT = 1
+
+
+class EloRatings:
+    """Elo team ratings, replayed once from the match history and then updated per result.
+
+    State is persisted as JSON next to the season cache. It is tied to the version of the
+    history it was replayed from, and remembers which later results were applied, so a
+    restart neither replays history nor counts a re-ingested result twice.
+    """
+
+    def __init__(self, k_factor=20, home_advantage=60, initial_rating=1500, state_path=None, persist=True):
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.persist = persist
+        self.state_path = state_path or os.environ.get(
+            'SERIE_A_RATINGS_PATH',
+            os.path.join(tempfile.gettempdir(), 'serie_a_cache', 'elo_ratings.json')
+        )
+
+        self.ratings = {}
+        self.matches = {}
+        self.base_version = None
+        self._applied = set()
+        self._lock = threading.RLock()
+
+    def load(self, match_table, history_version):
+        """Restore persisted ratings for this history, or replay it in date order once"""
+        state = self._read_state() if self.persist else None
+        if state is not None and state.get('base_version') == history_version and state.get('params') == self._params():
+            with self._lock:
+                self.ratings = state['ratings']
+                self.matches = state['matches']
+                self.base_version = history_version
+                self._applied = {tuple(key) for key in state.get('applied', [])}
+            print(f"Loaded Elo ratings for {len(self.ratings)} teams from {self.state_path}")
+            return self
+
+        self._replay(match_table)
+        self.base_version = history_version
+        self.save()
+        return self
+
+    def _replay(self, match_table):
+        """Rebuild ratings from scratch; the table is already in date order"""
+        with self._lock:
+            self.ratings = {}
+            self.matches = {}
+            self._applied = set()
+            if match_table.empty:
+                return
+
+            home_teams = match_table['HomeTeam'].astype(str).to_numpy()
+            away_teams = match_table['AwayTeam'].astype(str).to_numpy()
+            home_goals = match_table['FTHG'].to_numpy().astype(np.int64)
+            away_goals = match_table['FTAG'].to_numpy().astype(np.int64)
+
+            for home_team, away_team, home_score, away_score in zip(home_teams, away_teams, home_goals, away_goals):
+                self._apply(home_team, away_team, int(home_score), int(away_score))
+
+    def update(self, date, home_team, away_team, home_goals, away_goals):
+        """Apply one new result in O(1); returns False if it was already applied"""
+        key = (str(date)[:10], home_team, away_team)
+        with self._lock:
+            if key in self._applied:
+                return False
+            self._applied.add(key)
+            self._apply(home_team, away_team, home_goals, away_goals)
+        return True
+
+    def _apply(self, home_team, away_team, home_goals, away_goals):
+        home_rating = self.ratings.get(home_team, self.initial_rating)
+        away_rating = self.ratings.get(away_team, self.initial_rating)
+
+        expected_home = 1 / (1 + 10 ** ((away_rating - home_rating - self.home_advantage) / 400))
+        actual_home = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+
+        # Wider margins move ratings more, as in the World Football Elo ratings
+        margin = abs(home_goals - away_goals)
+        multiplier = 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+
+        change = self.k_factor * multiplier * (actual_home - expected_home)
+        self.ratings[home_team] = home_rating + change
+        self.ratings[away_team] = away_rating - change
+        self.matches[home_team] = self.matches.get(home_team, 0) + 1
+        self.matches[away_team] = self.matches.get(away_team, 0) + 1
+
+    def rating(self, team):
+        return self.ratings.get(team, self.initial_rating)
+
+    def expected_score(self, home_team, away_team, with_home_advantage=True):
+        """Expected score (win = 1, draw = 0.5) of the home team"""
+        difference = self.rating(away_team) - self.rating(home_team)
+        if with_home_advantage:
+            difference -= self.home_advantage
+        return 1 / (1 + 10 ** (difference / 400))
+
+    def table(self):
+        """Teams ranked by rating"""
+        with self._lock:
+            ranked = sorted(self.ratings.items(), key=lambda item: item[1], reverse=True)
+            return [{
+                'rank': rank,
+                'team': team,
+                'rating': round(rating, 1),
+                'matches': self.matches.get(team, 0)
+            } for rank, (team, rating) in enumerate(ranked, start=1)]
+
+    def _params(self):
+        return {'k_factor': self.k_factor, 'home_advantage': self.home_advantage, 'initial_rating': self.initial_rating}
+
+    def _read_state(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            return state if state.get('format') == STATE_FORMAT else None
+        except (OSError, ValueError):
+            return None
+
+    def save(self):
+        """Persist the current state atomically"""
+        if not self.persist:
+            return
+
+        with self._lock:
+            state = {
+                'format': STATE_FORMAT,
+                'params': self._params(),
+                'base_version': self.base_version,
+                'ratings': self.ratings,
+                'matches': self.matches,
+                'applied': sorted(self._applied)
+            }
+
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            print(f"Elo ratings write failed: {e}")
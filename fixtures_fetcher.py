@@ -1,22 +1,27 @@
 import pandas as pd
-import requests
 import json
 from datetime import datetime, timedelta
+from http_client import get_http_client
+from match_schema import normalize_openfootball
+from metrics import timed
 
 class SerieAFixturesFetcher:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_http_client()
         self.current_season = "2025-26"
         self.fixture_sources = {
             "openfootball": f"https://raw.githubusercontent.com/openfootball/football.json/master/{self.current_season}/it.1.json"
         }
 
+    @timed('fixtures.get_upcoming_fixtures')
     def get_upcoming_fixtures(self, days_ahead=14):
         """Get upcoming Serie A fixtures in the next N days"""
         print(f"Fetching upcoming fixtures for next {days_ahead} days...")
 
         try:
             # Get current season fixtures
-            response = requests.get(self.fixture_sources["openfootball"], timeout=10)
+            response = self.http.get(self.fixture_sources["openfootball"])
+            response.raise_for_status()
             data = response.json()
 
             upcoming_matches = []
@@ -172,6 +177,31 @@ class SerieAFixturesFetcher:
 
         return big_matches
 
+    @timed('fixtures.get_season_matches')
+    def get_season_matches(self):
+        """Every match of the current season in the canonical schema (unplayed ones have no score)"""
+        try:
+            response = self.http.get(self.fixture_sources["openfootball"])
+            response.raise_for_status()
+            return normalize_openfootball(response.json().get('matches', []))
+        except Exception as e:
+            print(f"Error fetching season matches: {e}")
+            return normalize_openfootball([])
+
+    def get_remaining_fixtures(self, season_matches=None):
+        """All fixtures of the current season without a result, in date order"""
+        if season_matches is None:
+            season_matches = self.get_season_matches()
+
+        remaining = season_matches[season_matches['FTHG'].isna() | season_matches['FTAG'].isna()]
+        remaining = remaining.sort_values('Date', kind='mergesort')
+
+        return [{
+            'date': date,
+            'home_team': home_team,
+            'away_team': away_team
+        } for date, home_team, away_team in zip(remaining['Date'], remaining['HomeTeam'], remaining['AwayTeam'])]
+
     def get_fixtures_by_team(self, team_name, days_ahead=30):
         """Get upcoming fixtures for a specific team"""
         upcoming = self.get_upcoming_fixtures(days_ahead)
@@ -0,0 +1,127 @@
+import numpy as np
+
+FORM_FIELDS = ['wins', 'draws', 'losses', 'goals_for', 'goals_against']
+VENUES = ['all', 'home', 'away']
+
+
+class PrefixSequence:
+    """Date-ordered per-match values (one row per match) stored as prefix sums.
+
+    The sum over any run of consecutive matches is a difference of two prefix rows, so
+    "last N matches as of date D" costs one binary search plus one subtraction.
+    """
+
+    def __init__(self, dates, values):
+        self._reset(dates, values)
+
+    def _reset(self, dates, values):
+        values = np.asarray(values, dtype=np.int64)
+        self.size = len(dates)
+        capacity = max(8, self.size)
+        self.dates = np.empty(capacity, dtype='datetime64[ns]')
+        self.dates[:self.size] = dates
+        self.cum = np.zeros((capacity + 1, values.shape[1]), dtype=np.int64)
+        self.cum[1:self.size + 1] = np.cumsum(values, axis=0)
+
+    def window(self, matches, as_of=None):
+        """Totals over the last `matches` results strictly before as_of (or overall)"""
+        end = self.size if as_of is None else int(np.searchsorted(self.dates[:self.size], as_of, side='left'))
+        start = max(0, end - matches)
+        return self.cum[end] - self.cum[start], end - start
+
+    def append(self, date, values):
+        """Add one result; O(1) amortized when it is the latest, O(n) re-sort otherwise"""
+        if self.size > 0 and date < self.dates[self.size - 1]:
+            dates = np.append(self.dates[:self.size], date)
+            per_match = np.vstack([np.diff(self.cum[:self.size + 1], axis=0), values])
+            order = np.argsort(dates, kind='stable')
+            self._reset(dates[order], per_match[order])
+            return
+
+        if self.size == len(self.dates):
+            self.dates = np.concatenate([self.dates, np.empty(len(self.dates), dtype='datetime64[ns]')])
+            self.cum = np.vstack([self.cum, np.zeros((len(self.cum) - 1, self.cum.shape[1]), dtype=np.int64)])
+
+        self.dates[self.size] = date
+        self.cum[self.size + 1] = self.cum[self.size] + values
+        self.size += 1
+
+
+class FormTable:
+    """Rolling form for every team, overall and per venue, precomputed from the match table"""
+
+    def __init__(self, match_table):
+        self._sequences = {}
+
+        if match_table.empty:
+            return
+
+        n_matches = len(match_table)
+        teams = np.asarray(match_table['HomeTeam'].cat.categories).astype(str)
+        home_codes = match_table['HomeTeam'].cat.codes.to_numpy().astype(np.int64)
+        away_codes = match_table['AwayTeam'].cat.codes.to_numpy().astype(np.int64)
+        home_goals = match_table['FTHG'].to_numpy().astype(np.int64)
+        away_goals = match_table['FTAG'].to_numpy().astype(np.int64)
+        results = match_table['FTR'].to_numpy()
+        dates = match_table['Date'].to_numpy().astype('datetime64[ns]')
+
+        # Stack every match twice, once from each side's point of view
+        team_codes = np.concatenate([home_codes, away_codes])
+        is_away = np.concatenate([np.zeros(n_matches, dtype=bool), np.ones(n_matches, dtype=bool)])
+        positions = np.concatenate([np.arange(n_matches), np.arange(n_matches)])
+        values = np.column_stack([
+            np.concatenate([results == 'H', results == 'A']),
+            np.concatenate([results == 'D', results == 'D']),
+            np.concatenate([results == 'A', results == 'H']),
+            np.concatenate([home_goals, away_goals]),
+            np.concatenate([away_goals, home_goals])
+        ]).astype(np.int64)
+        stacked_dates = np.concatenate([dates, dates])
+
+        for venue in VENUES:
+            mask = np.ones(len(team_codes), dtype=bool) if venue == 'all' else (is_away == (venue == 'away'))
+
+            # The table is date-sorted, so ordering by (team, row position) is date order per team
+            order = np.flatnonzero(mask)[np.lexsort((positions[mask], team_codes[mask]))]
+            counts = np.bincount(team_codes[order], minlength=len(teams))
+            bounds = np.concatenate([[0], np.cumsum(counts)])
+
+            for code, team in enumerate(teams):
+                if counts[code] > 0:
+                    rows = order[bounds[code]:bounds[code + 1]]
+                    self._sequences[(team, venue)] = PrefixSequence(stacked_dates[rows], values[rows])
+
+    def add_match(self, date, home_team, away_team, home_goals, away_goals):
+        """Append one completed match to both teams' sequences"""
+        date = np.datetime64(date, 'ns')
+        home_values = np.array([home_goals > away_goals, home_goals == away_goals, home_goals < away_goals,
+                                home_goals, away_goals], dtype=np.int64)
+        away_values = np.array([away_goals > home_goals, home_goals == away_goals, away_goals < home_goals,
+                                away_goals, home_goals], dtype=np.int64)
+
+        for team, venue, values in [(home_team, 'all', home_values), (home_team, 'home', home_values),
+                                    (away_team, 'all', away_values), (away_team, 'away', away_values)]:
+            sequence = self._sequences.get((team, venue))
+            if sequence is None:
+                self._sequences[(team, venue)] = PrefixSequence(np.array([date]), values[np.newaxis, :])
+            else:
+                sequence.append(date, values)
+
+    def form(self, team, matches=5, venue='all', as_of=None):
+        """Form over a team's last N matches (optionally home/away only, optionally before a date)"""
+        sequence = self._sequences.get((team, venue))
+        if sequence is None:
+            totals, played = np.zeros(len(FORM_FIELDS), dtype=np.int64), 0
+        else:
+            totals, played = sequence.window(matches, None if as_of is None else np.datetime64(as_of, 'ns'))
+
+        wins, draws, losses, goals_for, goals_against = (int(value) for value in totals)
+        return {
+            'wins': wins,
+            'draws': draws,
+            'losses': losses,
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'form_points': wins * 3 + draws,  # Form in points
+            'matches_analyzed': played
+        }
@@ -0,0 +1,209 @@
+import numpy as np
+
+# Dixon-Coles correlation values tried when fitting rho
+RHO_GRID = np.linspace(-0.25, 0.25, 51)
+
+
+class GoalModel:
+    """Dixon-Coles Poisson goal model fitted on the compact match table.
+
+    Home goals ~ Poisson(home_advantage * attack[home] * defence[away]) and away goals
+    ~ Poisson(attack[away] * defence[home]), with the Dixon-Coles correction for the
+    0-0, 1-0, 0-1 and 1-1 scores. Every market is derived from one score-probability
+    matrix per fixture, computed for many fixtures at once.
+    """
+
+    def __init__(self, max_goals=10, half_life_days=365, iterations=100, tolerance=1e-8):
+        self.max_goals = max_goals
+        self.half_life_days = half_life_days
+        self.iterations = iterations
+        self.tolerance = tolerance
+
+        self.teams = {}
+        self.attack = np.ones(0)
+        self.defence = np.ones(0)
+        self.home_advantage = 1.0
+        self.rho = 0.0
+        self.version = 0
+
+        goals = np.arange(max_goals + 1)
+        self._home_goals = goals[:, np.newaxis]
+        self._away_goals = goals[np.newaxis, :]
+        totals = (self._home_goals + self._away_goals).ravel()
+        self._total_indicator = (totals[:, np.newaxis] == np.arange(2 * max_goals + 1)).astype(np.float64)
+
+    def fit(self, match_table):
+        """Fit attack, defence, home advantage and rho; returns self"""
+        self.version += 1
+        if match_table.empty:
+            self.teams, self.attack, self.defence = {}, np.ones(0), np.ones(0)
+            self.home_advantage, self.rho = 1.0, 0.0
+            return self
+
+        teams = [str(team) for team in match_table['HomeTeam'].cat.categories]
+        n_teams = len(teams)
+        home = match_table['HomeTeam'].cat.codes.to_numpy().astype(np.int64)
+        away = match_table['AwayTeam'].cat.codes.to_numpy().astype(np.int64)
+        home_goals = match_table['FTHG'].to_numpy().astype(np.float64)
+        away_goals = match_table['FTAG'].to_numpy().astype(np.float64)
+        weights = self._time_weights(match_table['Date'])
+
+        # Weighted goals scored and conceded per team are fixed across iterations
+        scored = np.bincount(home, weights * home_goals, n_teams) + np.bincount(away, weights * away_goals, n_teams)
+        conceded = np.bincount(home, weights * away_goals, n_teams) + np.bincount(away, weights * home_goals, n_teams)
+        home_total = np.sum(weights * home_goals)
+
+        # Maximum-likelihood fixed point of the multiplicative Poisson model; a refit after new
+        # results starts from the previous solution and converges in a few iterations
+        if list(self.teams) == teams:
+            attack, defence, home_advantage = self.attack.copy(), self.defence.copy(), self.home_advantage
+        else:
+            attack, defence, home_advantage = np.ones(n_teams), np.ones(n_teams), 1.0
+        for _ in range(self.iterations):
+            attack_exposure = (np.bincount(home, weights * home_advantage * defence[away], n_teams) +
+                               np.bincount(away, weights * defence[home], n_teams))
+            new_attack = scored / np.maximum(attack_exposure, 1e-12)
+            new_attack /= np.mean(new_attack[new_attack > 0]) if np.any(new_attack > 0) else 1.0
+
+            defence_exposure = (np.bincount(home, weights * new_attack[away], n_teams) +
+                                np.bincount(away, weights * home_advantage * new_attack[home], n_teams))
+            new_defence = conceded / np.maximum(defence_exposure, 1e-12)
+
+            new_home_advantage = home_total / max(np.sum(weights * new_attack[home] * new_defence[away]), 1e-12)
+
+            change = max(np.max(np.abs(new_attack - attack)), np.max(np.abs(new_defence - defence)),
+                         abs(new_home_advantage - home_advantage))
+            attack, defence, home_advantage = new_attack, new_defence, new_home_advantage
+            if change < self.tolerance:
+                break
+
+        # Teams that never scored (or conceded) would get a zero rate; keep them slightly positive,
+        # and treat teams without matches (e.g. unused categories) as league average
+        played = np.bincount(home, minlength=n_teams) + np.bincount(away, minlength=n_teams)
+        attack = np.where(played > 0, np.maximum(attack, 0.05), 1.0)
+        defence = np.where(played > 0, np.maximum(defence, 0.05), 1.0)
+
+        home_rate = home_advantage * attack[home] * defence[away]
+        away_rate = attack[away] * defence[home]
+        tau = self._tau(home_goals[np.newaxis, :], away_goals[np.newaxis, :],
+                        home_rate[np.newaxis, :], away_rate[np.newaxis, :], RHO_GRID[:, np.newaxis])
+        log_likelihood = np.sum(weights * np.log(np.maximum(tau, 1e-12)), axis=1)
+
+        self.teams = {team: code for code, team in enumerate(teams)}
+        self.attack = attack
+        self.defence = defence
+        self.home_advantage = float(home_advantage)
+        self.rho = float(RHO_GRID[np.argmax(log_likelihood)])
+        return self
+
+    def _time_weights(self, dates):
+        """Exponential decay by match age, so recent seasons count more"""
+        if not self.half_life_days or dates.isna().all():
+            return np.ones(len(dates))
+        age_days = (dates.max() - dates).dt.days.fillna(0).to_numpy().astype(np.float64)
+        return 0.5 ** (age_days / self.half_life_days)
+
+    @staticmethod
+    def _tau(home_goals, away_goals, home_rate, away_rate, rho):
+        """Dixon-Coles low-score adjustment factor"""
+        return np.where((home_goals == 0) & (away_goals == 0), 1 - home_rate * away_rate * rho,
+               np.where((home_goals == 0) & (away_goals == 1), 1 + home_rate * rho,
+               np.where((home_goals == 1) & (away_goals == 0), 1 + away_rate * rho,
+               np.where((home_goals == 1) & (away_goals == 1), 1 - rho, 1.0))))
+
+    def expected_goals(self, teams):
+        """Home and away scoring rates for a list of (home, away) pairs; unknown teams are league average"""
+        home_attack, home_defence, away_attack, away_defence = (np.ones(len(teams)) for _ in range(4))
+        for i, (home_team, away_team) in enumerate(teams):
+            if home_team in self.teams:
+                home_attack[i] = self.attack[self.teams[home_team]]
+                home_defence[i] = self.defence[self.teams[home_team]]
+            if away_team in self.teams:
+                away_attack[i] = self.attack[self.teams[away_team]]
+                away_defence[i] = self.defence[self.teams[away_team]]
+        return self.home_advantage * home_attack * away_defence, away_attack * home_defence
+
+    def score_matrices(self, home_rate, away_rate):
+        """(n, max_goals + 1, max_goals + 1) score probabilities; [i, h, a] is P(home h, away a)"""
+        home_rate = np.asarray(home_rate, dtype=np.float64)
+        away_rate = np.asarray(away_rate, dtype=np.float64)
+        home_pmf = self._poisson_pmf(home_rate)
+        away_pmf = self._poisson_pmf(away_rate)
+        matrices = home_pmf[:, :, np.newaxis] * away_pmf[:, np.newaxis, :]
+
+        low = slice(0, 2)
+        matrices[:, low, low] *= np.maximum(self._tau(
+            self._home_goals[low], self._away_goals[:, low],
+            home_rate[:, np.newaxis, np.newaxis], away_rate[:, np.newaxis, np.newaxis], self.rho
+        ), 0.0)
+
+        # Renormalize the mass lost to truncation at max_goals
+        return matrices / matrices.sum(axis=(1, 2), keepdims=True)
+
+    def _poisson_pmf(self, rate):
+        """P(0..max_goals) for each rate, by the recurrence p(k) = p(k-1) * rate / k"""
+        ratios = rate[:, np.newaxis] / np.arange(1, self.max_goals + 1)
+        pmf = np.ones((len(rate), self.max_goals + 1))
+        pmf[:, 1:] = np.cumprod(ratios, axis=1)
+        return pmf * np.exp(-rate)[:, np.newaxis]
+
+    def result_probabilities(self, matrices):
+        """(home win, draw, away win) per fixture"""
+        home_win = np.sum(np.tril(matrices, -1), axis=(1, 2))
+        draw = np.trace(matrices, axis1=1, axis2=2)
+        return home_win, draw, 1 - home_win - draw
+
+    def total_goals_distribution(self, matrices):
+        """P(total goals = t) per fixture for t = 0..2 * max_goals"""
+        return matrices.reshape(len(matrices), -1) @ self._total_indicator
+
+    def over_probabilities(self, matrices, lines):
+        """{line: P(total goals > line)} per fixture, for any goal lines"""
+        cumulative = np.cumsum(self.total_goals_distribution(matrices), axis=1)
+        return {line: 1 - cumulative[:, min(int(np.floor(line)), cumulative.shape[1] - 1)] for line in lines}
+
+    def btts_probability(self, matrices):
+        """P(both teams score) per fixture"""
+        return 1 - matrices[:, 0, :].sum(axis=1) - matrices[:, :, 0].sum(axis=1) + matrices[:, 0, 0]
+
+    def correct_scores(self, matrices, top=5):
+        """Most likely exact scores per fixture as [(home_goals, away_goals, probability)]"""
+        flat = matrices.reshape(len(matrices), -1)
+        best = np.argsort(-flat, axis=1, kind='stable')[:, :top]
+        size = self.max_goals + 1
+        return [[(int(cell // size), int(cell % size), float(flat[i, cell])) for cell in best[i]]
+                for i in range(len(matrices))]
+
+    def predict(self, teams, lines=(0.5, 1.5, 2.5, 3.5, 4.5), top_scores=5):
+        """Every score-based market for a list of (home, away) pairs, in percent"""
+        if not teams:
+            return []
+
+        home_rate, away_rate = self.expected_goals(teams)
+        matrices = self.score_matrices(home_rate, away_rate)
+        home_win, draw, away_win = self.result_probabilities(matrices)
+        overs = self.over_probabilities(matrices, lines)
+        btts = self.btts_probability(matrices)
+        scores = self.correct_scores(matrices, top_scores)
+
+        def percent(value):
+            return round(float(value) * 100, 1)
+
+        markets = []
+        for i in range(len(teams)):
+            over_under = {}
+            for line in lines:
+                label = str(line).replace('.', '_')
+                over_under[f'over_{label}'] = percent(overs[line][i])
+                over_under[f'under_{label}'] = percent(1 - overs[line][i])
+
+            markets.append({
+                'expected_goals': {'home': round(float(home_rate[i]), 2), 'away': round(float(away_rate[i]), 2)},
+                'probabilities': {'1': percent(home_win[i]), 'X': percent(draw[i]), '2': percent(away_win[i])},
+                'over_under': over_under,
+                'both_teams_score': {'yes': percent(btts[i]), 'no': percent(1 - btts[i])},
+                'correct_score': [{'score': f"{home_goals}-{away_goals}", 'probability': percent(probability)}
+                                  for home_goals, away_goals, probability in scores[i]]
+            })
+
+        return markets
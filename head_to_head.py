@@ -0,0 +1,69 @@
+import numpy as np
+from form_table import PrefixSequence
+from match_table import TeamMatchIndex
+
+# Per-match values stored for a pair (first, second) where first sorts before second
+PAIR_FIELDS = ['first_wins', 'second_wins', 'draws', 'total_goals']
+
+
+class HeadToHeadStore:
+    """Date-ordered results and prefix aggregates for every pair of teams that have met"""
+
+    def __init__(self, match_table, match_index):
+        self._pairs = {}
+
+        if match_table.empty:
+            return
+
+        home_teams = match_table['HomeTeam'].astype(str).to_numpy()
+        results = match_table['FTR'].to_numpy()
+        total_goals = match_table['FTHG'].to_numpy().astype(np.int64) + match_table['FTAG'].to_numpy().astype(np.int64)
+        dates = match_table['Date'].to_numpy().astype('datetime64[ns]')
+
+        # Index rows are already in date order for each pair
+        for (first, second), rows in match_index.pairs():
+            first_at_home = home_teams[rows] == first
+            pair_results = results[rows]
+            values = np.column_stack([
+                np.where(first_at_home, pair_results == 'H', pair_results == 'A'),
+                np.where(first_at_home, pair_results == 'A', pair_results == 'H'),
+                pair_results == 'D',
+                total_goals[rows]
+            ])
+            self._pairs[(first, second)] = PrefixSequence(dates[rows], values)
+
+    def add_match(self, date, home_team, away_team, home_goals, away_goals):
+        """Append one completed match to the pair's sequence"""
+        key = TeamMatchIndex.pair_key(home_team, away_team)
+        first_goals, second_goals = (home_goals, away_goals) if key[0] == home_team else (away_goals, home_goals)
+        values = np.array([first_goals > second_goals, second_goals > first_goals, first_goals == second_goals,
+                           home_goals + away_goals], dtype=np.int64)
+
+        date = np.datetime64(date, 'ns')
+        sequence = self._pairs.get(key)
+        if sequence is None:
+            self._pairs[key] = PrefixSequence(np.array([date]), values[np.newaxis, :])
+        else:
+            sequence.append(date, values)
+
+    def summary(self, home_team, away_team, matches=5, as_of=None):
+        """H2H over the last N meetings (before as_of if given), from home_team's point of view"""
+        key = TeamMatchIndex.pair_key(home_team, away_team)
+        sequence = self._pairs.get(key)
+        if sequence is None:
+            return {'home_wins': 0, 'away_wins': 0, 'draws': 0, 'total_goals': 0, 'matches': 0}
+
+        totals, played = sequence.window(matches, None if as_of is None else np.datetime64(as_of, 'ns'))
+        if played == 0:
+            return {'home_wins': 0, 'away_wins': 0, 'draws': 0, 'total_goals': 0, 'matches': 0}
+
+        first_wins, second_wins, draws, total_goals = (int(value) for value in totals)
+        home_is_first = key[0] == home_team
+        return {
+            'home_wins': first_wins if home_is_first else second_wins,
+            'away_wins': second_wins if home_is_first else first_wins,
+            'draws': draws,
+            'total_goals': total_goals,
+            'avg_goals': total_goals / played,
+            'matches': played
+        }
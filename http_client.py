@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import get_metrics
+
+
+class HttpClient:
+    def __init__(self, connect_timeout=3.05, read_timeout=10, retries=3, backoff_factor=0.5,
+                 backoff_jitter=0.5, pool_connections=10, pool_maxsize=10):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        # Offline mode (benchmarks, machines without network): fail fast so every caller takes its fallback
+        self.offline = os.environ.get('SERIE_A_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+        # Retry connection errors and transient server responses with jittered exponential backoff
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+
+        # One keep-alive pool per host, shared by every fetcher and Flask worker thread
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'requests': 0,
+            'errors': 0,
+            'bytes': 0,
+            'wire_bytes': 0,
+            'latency_total': 0.0,
+            'latency_max': 0.0
+        })
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        """GET a URL through the pooled session, recording per-host counters"""
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+
+        host = urlsplit(url).netloc
+        if self.offline:
+            self._record(host, 0.0, error=True)
+            raise requests.ConnectionError(f"Offline mode: not fetching {url}")
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            content_length = len(response.content)
+        except Exception:
+            self._record(host, time.perf_counter() - start, error=True)
+            raise
+
+        # Bytes read off the socket, before gzip decoding
+        try:
+            wire_bytes = response.raw.tell()
+        except Exception:
+            wire_bytes = content_length
+
+        self._record(host, time.perf_counter() - start, error=response.status_code >= 400,
+                     content_bytes=content_length, wire_bytes=wire_bytes)
+        return response
+
+    def _record(self, host, latency, error=False, content_bytes=0, wire_bytes=0):
+        metrics = get_metrics()
+        metrics.observe(f"http.{host}", latency)
+        if error:
+            metrics.increment(f"http.{host}.errors")
+        with self._lock:
+            stats = self._stats[host]
+            stats['requests'] += 1
+            stats['errors'] += 1 if error else 0
+            stats['bytes'] += content_bytes
+            stats['wire_bytes'] += wire_bytes
+            stats['latency_total'] += latency
+            stats['latency_max'] = max(stats['latency_max'], latency)
+
+    def get_stats(self):
+        """Counters per host plus totals: requests, errors, bytes and latency"""
+        with self._lock:
+            by_host = {host: dict(stats) for host, stats in self._stats.items()}
+
+        totals = {'requests': 0, 'errors': 0, 'bytes': 0, 'wire_bytes': 0, 'latency_total': 0.0}
+        for stats in by_host.values():
+            stats['latency_avg'] = stats['latency_total'] / stats['requests'] if stats['requests'] > 0 else 0
+            for key in totals:
+                totals[key] += stats[key]
+        totals['latency_avg'] = totals['latency_total'] / totals['requests'] if totals['requests'] > 0 else 0
+
+        return {'totals': totals, 'by_host': by_host}
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide client shared by all fetchers"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
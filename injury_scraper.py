@@ -1,10 +1,20 @@
-import requests
 import pandas as pd
-import json
-from datetime import datetime
+import os
+import threading
+import time
+from http_client import get_http_client
+from injury_snapshot import InjurySnapshot
+from injury_sources import InjurySourcePipeline
+from metrics import timed
 
 class InjuryDataScraper:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_http_client()
+
+        # Immutable view of the last load; swapped whole on refresh
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+
         self.base_urls = {
             "sportsgambler": "https://www.sportsgambler.com/injuries/football/italy-serie-a/",
             "transfermarkt": "https://www.transfermarkt.com/serie-a/verletztenspieler/wettbewerb/IT1"
@@ -38,6 +48,10 @@ class InjuryDataScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
+        # Live sources go through their own page cache; only refresh() touches the network
+        self.pipeline = InjurySourcePipeline(self.http, self.base_urls, self.team_mapping, self.headers)
+        self._refresh_thread = None
+
     def get_current_injury_data(self):
         """Get current Serie A injury data for September 2025"""
         print("Loading current Serie A injury data (September 2025)...")
@@ -151,57 +165,78 @@ class InjuryDataScraper:
 
         return pd.DataFrame(current_injuries)
 
-    def scrape_injury_data(self):
-        """Get injury data - now returns current September 2025 data"""
+    @timed('injuries.scrape_injury_data')
+    def scrape_injury_data(self, fetch=False):
+        """Injury records from the live sources, or the built-in September 2025 data if none.
+
+        Without fetch only cached source pages are read, so this is safe inside a request.
+        """
+        live = self.pipeline.collect(fetch=fetch)
+        if not live.empty:
+            return live
         return self.get_current_injury_data()
 
-    def get_team_injuries(self, team_name):
-        """Get injuries for specific team"""
-        all_injuries = self.scrape_injury_data()
-        team_injuries = all_injuries[all_injuries['team'].str.lower() == team_name.lower()]
-        return team_injuries.to_dict('records')
+    def get_snapshot(self):
+        """Current injury snapshot, loaded on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._snapshot_lock:
+                if self._snapshot is None:
+                    self._snapshot = InjurySnapshot(self.scrape_injury_data())
+                snapshot = self._snapshot
+        return snapshot
 
-    def get_injury_summary(self):
-        """Get summary of all injuries across Serie A"""
-        all_injuries = self.scrape_injury_data()
-
-        summary = {
-            'total_injuries': len(all_injuries),
-            'by_status': all_injuries['status'].value_counts().to_dict(),
-            'by_team': all_injuries['team'].value_counts().to_dict(),
-            'by_position': all_injuries['position'].value_counts().to_dict(),
-            'most_common_injuries': all_injuries['injury'].value_counts().head(5).to_dict(),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+    def refresh(self):
+        """Fetch the sources, reload the injury data and swap in a new snapshot.
 
-        return summary
+        Readers keep using the old snapshot until the new one is complete.
+        """
+        snapshot = InjurySnapshot(self.scrape_injury_data(fetch=True))
+        with self._snapshot_lock:
+            self._snapshot = snapshot
+        return snapshot
 
-    def get_availability_impact(self):
-        """Calculate impact of injuries on team availability"""
-        all_injuries = self.scrape_injury_data()
+    def start_background_refresh(self, interval=None):
+        """Refresh every interval seconds on a daemon thread (SERIE_A_INJURY_REFRESH_INTERVAL, off by default)"""
+        interval = interval if interval is not None else float(os.environ.get('SERIE_A_INJURY_REFRESH_INTERVAL', 0))
+        if interval <= 0 or self._refresh_thread is not None:
+            return False
 
-        impact = []
-        for team in all_injuries['team'].unique():
-            team_injuries = all_injuries[all_injuries['team'] == team]
+        def refresh_loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Background injury refresh failed: {e}")
+                time.sleep(interval)
 
-            out_players = len(team_injuries[team_injuries['status'] == 'Out'])
-            doubtful_players = len(team_injuries[team_injuries['status'] == 'Doubtful'])
+        self._refresh_thread = threading.Thread(target=refresh_loop, name="injury-refresh", daemon=True)
+        self._refresh_thread.start()
+        return True
 
-            impact_score = out_players * 1.0 + doubtful_players * 0.5
+    def get_data_version(self):
+        """Content hash of the current data; changes whenever any record changes"""
+        return self.get_snapshot().version
 
-            impact.append({
-                'team': team,
-                'total_injuries': len(team_injuries),
-                'players_out': out_players,
-                'players_doubtful': doubtful_players,
-                'impact_score': impact_score,
-                'key_players_out': team_injuries[team_injuries['position'].isin(['Forward', 'Midfielder'])]['player'].tolist()
-            })
+    def get_team_injuries(self, team_name):
+        """Get injuries for specific team"""
+        return self.get_snapshot().team_injuries(team_name)
 
-        # Sort by impact score
-        impact = sorted(impact, key=lambda x: x['impact_score'], reverse=True)
+    def get_team_impact(self, team_name, as_of=None):
+        """Players out/doubtful and impact score for one team, optionally on a given date"""
+        return self.get_snapshot().team_impact(team_name, as_of=as_of)
 
-        return impact
+    def get_unavailable_players(self, team_name, as_of):
+        """Players of a team still out on a given date (expected_return not reached yet)"""
+        return self.get_snapshot().unavailable_players(team_name, as_of)
+
+    def get_injury_summary(self):
+        """Get summary of all injuries across Serie A"""
+        return self.get_snapshot().summary()
+
+    def get_availability_impact(self):
+        """Calculate impact of injuries on team availability"""
+        return self.get_snapshot().availability_impact()
 
 if __name__ == "__main__":
     scraper = InjuryDataScraper()
@@ -0,0 +1,144 @@
+import copy
+from bisect import bisect_right
+from datetime import datetime
+from types import MappingProxyType
+
+import pandas as pd
+
+KEY_POSITIONS = ('Forward', 'Midfielder')
+
+
+class InjurySnapshot:
+    """Read-only view of one injury data load, with every per-team aggregate precomputed.
+
+    Built once per refresh; lookups by team are dict reads (case-insensitive) and the data
+    version is computed at build time, so predictions and /api/injuries* requests never
+    rebuild or scan the injury frame. Accessors hand out copies, never internal state.
+    """
+
+    __slots__ = ('version', 'loaded_at', '_records', '_by_team', '_team_impact', '_summary', '_availability_impact',
+                 '_timeline')
+
+    def __init__(self, injuries, loaded_at=None):
+        injuries = injuries.reset_index(drop=True)
+        set_attr = object.__setattr__
+
+        set_attr(self, 'version', str(pd.util.hash_pandas_object(injuries, index=False).sum())
+                 if not injuries.empty else 'empty')
+        set_attr(self, 'loaded_at', loaded_at or datetime.now())
+
+        records = tuple(MappingProxyType(record) for record in injuries.to_dict('records'))
+        by_team = {}
+        for record in records:
+            by_team.setdefault(str(record['team']).lower(), []).append(record)
+        set_attr(self, '_records', records)
+        set_attr(self, '_by_team', MappingProxyType({team: tuple(rows) for team, rows in by_team.items()}))
+
+        # Out/doubtful counts and impact score per team, in order of first appearance
+        exact_teams = {}
+        for record in records:
+            exact_teams.setdefault(record['team'], []).append(record)
+        impact = [self._impact_entry(team, rows) for team, rows in exact_teams.items()]
+        set_attr(self, '_availability_impact', tuple(sorted(impact, key=lambda x: x['impact_score'], reverse=True)))
+        set_attr(self, '_team_impact', MappingProxyType({team: self._impact_entry(rows[0]['team'], rows)
+                                                         for team, rows in by_team.items()}))
+
+        set_attr(self, '_timeline', MappingProxyType({team: self._build_timeline(rows)
+                                                       for team, rows in by_team.items()}))
+
+        set_attr(self, '_summary', MappingProxyType({
+            'total_injuries': len(injuries),
+            'by_status': injuries['status'].value_counts().to_dict() if not injuries.empty else {},
+            'by_team': injuries['team'].value_counts().to_dict() if not injuries.empty else {},
+            'by_position': injuries['position'].value_counts().to_dict() if not injuries.empty else {},
+            'most_common_injuries': injuries['injury'].value_counts().head(5).to_dict() if not injuries.empty else {},
+            'last_updated': self.loaded_at.strftime('%Y-%m-%d %H:%M:%S')
+        }))
+
+    @staticmethod
+    def _impact_entry(team, team_injuries):
+        out_players = sum(1 for record in team_injuries if record['status'] == 'Out')
+        doubtful_players = sum(1 for record in team_injuries if record['status'] == 'Doubtful')
+        return {
+            'team': team,
+            'total_injuries': len(team_injuries),
+            'players_out': out_players,
+            'players_doubtful': doubtful_players,
+            'impact_score': out_players * 1.0 + doubtful_players * 0.5,
+            'key_players_out': [record['player'] for record in team_injuries if record['position'] in KEY_POSITIONS]
+        }
+
+    @classmethod
+    def _build_timeline(cls, team_injuries):
+        """Breakpoint dates and, per segment starting at each, the impact entry and names of the
+        players unavailable then.
+
+        A player is unavailable from expected_return - days_out up to (not including)
+        expected_return; records without a parseable return date or with no days out are skipped.
+        """
+        intervals = []
+        for record in team_injuries:
+            expected_return = pd.to_datetime(record.get('expected_return'), errors='coerce')
+            days_out = pd.to_numeric(record.get('days_out'), errors='coerce')
+            if pd.isna(expected_return) or pd.isna(days_out) or days_out <= 0:
+                continue
+            start = (expected_return - pd.Timedelta(days=int(days_out))).strftime('%Y-%m-%d')
+            intervals.append((start, expected_return.strftime('%Y-%m-%d'), record))
+
+        breakpoints = sorted({date for start, end, _ in intervals for date in (start, end)})
+        team = team_injuries[0]['team']
+        unavailable = [[record for start, end, record in intervals if start <= date < end] for date in breakpoints]
+        return (breakpoints,
+                tuple(cls._impact_entry(team, records) for records in unavailable),
+                tuple(tuple(record['player'] for record in records) for records in unavailable))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("InjurySnapshot is immutable")
+
+    def __len__(self):
+        return len(self._records)
+
+    def to_frame(self):
+        return pd.DataFrame([dict(record) for record in self._records])
+
+    def team_injuries(self, team_name):
+        """Injury records of one team (case-insensitive)"""
+        return [dict(record) for record in self._by_team.get(str(team_name).lower(), ())]
+
+    def team_impact(self, team_name, as_of=None):
+        """Precomputed totals for one team: injuries, players out/doubtful and impact score.
+
+        With as_of (a date or 'YYYY-MM-DD' string) only players unavailable on that date
+        count, found by bisecting the team's breakpoints; without it, statuses as reported.
+        """
+        if as_of is None:
+            entry = self._team_impact.get(str(team_name).lower())
+        else:
+            entry = self._entry_on(team_name, as_of)
+        if entry is None:
+            return {'team': team_name, 'total_injuries': 0, 'players_out': 0, 'players_doubtful': 0,
+                    'impact_score': 0.0, 'key_players_out': []}
+        return {**entry, 'key_players_out': list(entry['key_players_out'])}
+
+    def _segment(self, team_name, as_of):
+        """(timeline, segment index) covering a date, or (None, -1) when nobody is out then"""
+        timeline = self._timeline.get(str(team_name).lower())
+        if timeline is None:
+            return None, -1
+        return timeline, bisect_right(timeline[0], str(as_of)[:10]) - 1
+
+    def _entry_on(self, team_name, as_of):
+        timeline, index = self._segment(team_name, as_of)
+        return timeline[1][index] if index >= 0 else None
+
+    def unavailable_players(self, team_name, as_of):
+        """Names of a team's players unavailable on a date, in O(log n)"""
+        timeline, index = self._segment(team_name, as_of)
+        return list(timeline[2][index]) if index >= 0 else []
+
+    def summary(self):
+        return copy.deepcopy(dict(self._summary))
+
+    def availability_impact(self):
+        """Teams by impact score, most affected first"""
+        return copy.deepcopy(list(self._availability_impact))
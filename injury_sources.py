@@ -0,0 +1,459 @@
+"""Live injury sources: concurrent fetching, HTML parsing, team-name normalization and merging.
+
+Pages are kept in an on-disk cache with a TTL and revalidated with conditional requests.
+Parsers only take HTML text, so they run unchanged against the stored pages under
+fixtures/injuries/ with no network (test_injury_sources.py checks them there):
+
+    python injury_sources.py              # parse the stored fixture pages
+    python injury_sources.py --refresh    # fetch the live pages into the cache
+"""
+import os
+import re
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+import pandas as pd
+
+INJURY_COLUMNS = ['team', 'player', 'position', 'injury', 'status', 'expected_return', 'days_out',
+                  'severity', 'impact_rating']
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'injuries')
+
+# A listed player with no return date is assumed out this long
+UNKNOWN_RETURN_DAYS = 30
+# Impact ratings run from MIN to MAX by market-value percentile among the listed players; a
+# player with no market value sits in the middle, like the median valued player
+MIN_IMPACT_RATING = 0.5
+MAX_IMPACT_RATING = 9.5
+DEFAULT_IMPACT_RATING = 5.0
+STATUS_RANK = {'Available': 0, 'Doubtful': 1, 'Out': 2}
+
+POSITION_ALIASES = {
+    'gk': 'Goalkeeper', 'goalkeeper': 'Goalkeeper',
+    'df': 'Defender', 'd': 'Defender', 'defender': 'Defender', 'centre-back': 'Defender',
+    'left-back': 'Defender', 'right-back': 'Defender',
+    'mf': 'Midfielder', 'm': 'Midfielder', 'midfielder': 'Midfielder', 'central midfield': 'Midfielder',
+    'defensive midfield': 'Midfielder', 'attacking midfield': 'Midfielder',
+    'left midfield': 'Midfielder', 'right midfield': 'Midfielder',
+    'fw': 'Forward', 'f': 'Forward', 'forward': 'Forward', 'centre-forward': 'Forward',
+    'second striker': 'Forward', 'left winger': 'Forward', 'right winger': 'Forward'
+}
+
+MONTH_NAMES = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+               'october', 'november', 'december']
+# Full names and the abbreviations the sources use; anything else is not a month
+MONTHS = {**{name: i for i, name in enumerate(MONTH_NAMES, start=1)},
+          **{name[:3]: i for i, name in enumerate(MONTH_NAMES, start=1)},
+          'sept': 9}
+MONTH_RETURN = re.compile(r'(?:(early|mid|late)[\s-]+)?(' + '|'.join(sorted(MONTHS, key=len, reverse=True))
+                          + r')\b\.?(?:\s+(\d{4}))?')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d.%m.%Y', '%b %d, %Y', '%B %d, %Y')
+
+
+class _ClassTextParser(HTMLParser):
+    """Base parser tracking the classes of every open element"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._open = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self._open.append((tag, set((attrs.get('class') or '').split())))
+        self.start(tag, attrs)
+        if tag in ('img', 'br', 'meta', 'link', 'input', 'hr'):
+            self._open.pop()
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed children: pop back to the matching open tag
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                self.end(tag, self._open[i][1])
+                del self._open[i:]
+                break
+
+    def inside(self, css_class):
+        return any(css_class in classes for _, classes in self._open)
+
+    def start(self, tag, attrs):
+        pass
+
+    def end(self, tag, classes):
+        pass
+
+
+class SportsgamblerParser(_ClassTextParser):
+    """Team blocks (h3.injuries-title) followed by div.inj-row rows with inj-* fields"""
+
+    FIELDS = {'inj-player': 'player', 'inj-position': 'position', 'inj-info': 'injury',
+              'inj-return': 'return', 'inj-status': 'status'}
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._team = None
+        self._title = None
+        self._row = None
+
+    def start(self, tag, attrs):
+        classes = set((attrs.get('class') or '').split())
+        if 'injuries-title' in classes:
+            self._title = []
+        elif 'inj-row' in classes:
+            self._row = {'team': self._team}
+
+    def end(self, tag, classes):
+        if 'injuries-title' in classes and self._title is not None:
+            self._team = ' '.join(''.join(self._title).split())
+            self._title = None
+        elif 'inj-row' in classes and self._row is not None:
+            if self._row.get('player'):
+                self.records.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._title is not None:
+            self._title.append(data)
+        elif self._row is not None:
+            for css_class, field in self.FIELDS.items():
+                if self.inside(css_class):
+                    self._row[field] = (self._row.get(field, '') + ' ' + data).strip()
+                    break
+
+
+class TransfermarktParser(_ClassTextParser):
+    """Rows of table.items: player and position in a nested inline table, club as image alt,
+    then injury, since, until and market value cells"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._depth = 0       # Depth of nested tables inside table.items (0 = not inside)
+        self._row = None
+        self._cell = None
+
+    def start(self, tag, attrs):
+        classes = set((attrs.get('class') or '').split())
+        if tag == 'table':
+            if self._depth > 0 or 'items' in classes:
+                self._depth += 1
+        elif self._depth == 1 and tag == 'tr':
+            self._row = []
+        elif self._depth == 1 and tag == 'td' and self._row is not None:
+            self._cell = {'text': [], 'alts': []}
+        elif tag == 'img' and self._cell is not None and attrs.get('alt'):
+            self._cell['alts'].append(attrs['alt'])
+
+    def end(self, tag, classes):
+        if tag == 'table' and self._depth > 0:
+            self._depth -= 1
+        elif self._depth == 1 and tag == 'td' and self._cell is not None:
+            self._row.append(self._cell)
+            self._cell = None
+        elif self._depth == 1 and tag == 'tr' and self._row is not None:
+            if self._row:
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None and data.strip():
+            self._cell['text'].append(' '.join(data.split()))
+
+    @property
+    def records(self):
+        records = []
+        for cells in self.rows:
+            if len(cells) < 6 or not cells[0]['text']:
+                continue
+            texts = [' '.join(cell['text']) for cell in cells]
+            records.append({
+                'player': cells[0]['text'][0],
+                'position': cells[0]['text'][1] if len(cells[0]['text']) > 1 else '',
+                'team': cells[1]['alts'][0] if cells[1]['alts'] else texts[1],
+                'injury': texts[3],
+                'since': texts[4],
+                'return': texts[5],
+                'market_value': texts[6] if len(texts) > 6 else '',
+                'status': 'Out'
+            })
+        return records
+
+
+PARSERS = {
+    'sportsgambler': SportsgamblerParser,
+    'transfermarkt': TransfermarktParser
+}
+
+
+def parse_page(source, html):
+    """Raw records (source field names) from one page"""
+    parser = PARSERS[source]()
+    parser.feed(html)
+    parser.close()
+    return parser.records
+
+
+def parse_date(text):
+    """A full date: ISO, dd/mm/yyyy, dd.mm.yyyy or 'Oct 5, 2025', else None"""
+    text = (text or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_return_date(text, today):
+    """Expected return as a date: a full date (see parse_date) or 'Early/Mid/Late October' / 'Oct',
+    taken as the next such month unless a year follows"""
+    date = parse_date(text)
+    if date is not None:
+        return date
+
+    match = MONTH_RETURN.fullmatch((text or '').strip().lower())
+    if match:
+        month = MONTHS[match.group(2)]
+        day = {'early': 5, 'mid': 15, 'late': 25}.get(match.group(1), 15)
+        year = int(match.group(3)) if match.group(3) else today.year + (1 if month < today.month else 0)
+        return datetime(year, month, day).date()
+    return None
+
+
+def parse_market_value(text):
+    """Millions of euros from '€18.00m' / '€900k' style values, or None"""
+    match = re.search(r'([\d.,]+)\s*(m|k|bn)', (text or '').lower())
+    if not match:
+        return None
+    value = float(match.group(1).replace(',', '.'))
+    return value * {'m': 1, 'k': 0.001, 'bn': 1000}[match.group(2)]
+
+
+def normalize_record(raw, team_mapping, today):
+    """One raw record in the InjuryDataScraper schema"""
+    team = ' '.join(str(raw.get('team') or '').split())
+    team = team_mapping.get(team, team)
+
+    position = POSITION_ALIASES.get(str(raw.get('position', '')).strip().lower(), raw.get('position') or 'Unknown')
+    status = str(raw.get('status') or 'Out').strip().title()
+    status = status if status in STATUS_RANK else 'Doubtful' if 'doubt' in status.lower() else 'Out'
+
+    expected_return = parse_return_date(raw.get('return'), today)
+    if expected_return is None:
+        expected_return = today + timedelta(days=UNKNOWN_RETURN_DAYS if status == 'Out' else 0)
+    # days_out spans the whole absence, so expected_return - days_out is when it started
+    since = parse_date(raw.get('since'))
+    start = since if since is not None and since <= min(today, expected_return) else today
+    days_out = max(0, (expected_return - start).days)
+
+    return {
+        'team': team,
+        'player': ' '.join(str(raw.get('player')).split()),
+        'position': position,
+        'injury': raw.get('injury') or 'Unknown',
+        'status': status,
+        'expected_return': expected_return.strftime('%Y-%m-%d'),
+        'days_out': days_out,
+        'severity': _severity(days_out),
+        # Market value is the only importance signal the sources give; rated once merged
+        'market_value': parse_market_value(raw.get('market_value')),
+        'impact_rating': None
+    }
+
+
+def _severity(days_out):
+    return 'Low' if days_out <= 7 else 'Medium' if days_out <= 30 else 'High'
+
+
+def _absence_start(record):
+    return datetime.strptime(record['expected_return'], '%Y-%m-%d').date() - timedelta(days=record['days_out'])
+
+
+def merge_records(records):
+    """One record per (team, player): the most severe status, the earliest start, the latest return
+    and the highest known market value win; text fields come from the first source that had them.
+    Impact ratings are then set from the market values (see rate_by_market_value)"""
+    merged = {}
+    for record in records:
+        key = (record['team'].lower(), record['player'].lower())
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(record)
+            continue
+        if STATUS_RANK[record['status']] > STATUS_RANK[current['status']]:
+            current['status'] = record['status']
+        start = min(_absence_start(current), _absence_start(record))
+        current['expected_return'] = max(current['expected_return'], record['expected_return'])
+        current['days_out'] = (datetime.strptime(current['expected_return'], '%Y-%m-%d').date() - start).days
+        current['severity'] = _severity(current['days_out'])
+        if record['market_value'] is not None:
+            current['market_value'] = max(current['market_value'] or 0, record['market_value'])
+        for field in ('position', 'injury'):
+            if current[field] in ('Unknown', '') and record[field] not in ('Unknown', ''):
+                current[field] = record[field]
+
+    return rate_by_market_value(list(merged.values()))
+
+
+def rate_by_market_value(records):
+    """Set impact_rating from each record's market value percentile among the records that have
+    one (ties share a rating); records without a value get DEFAULT_IMPACT_RATING"""
+    valued = [record for record in records if record['market_value'] is not None]
+    ranks = pd.Series([record['market_value'] for record in valued], dtype='float64').rank(method='average')
+    for record, rank in zip(valued, ranks):
+        share = (rank - 1) / (len(valued) - 1) if len(valued) > 1 else 0.5
+        record['impact_rating'] = round(MIN_IMPACT_RATING + share * (MAX_IMPACT_RATING - MIN_IMPACT_RATING), 1)
+    for record in records:
+        if record['market_value'] is None:
+            record['impact_rating'] = DEFAULT_IMPACT_RATING
+    return records
+
+
+class InjuryPageCache:
+    """Raw source pages on disk with fetch time and validators for conditional requests"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.environ.get(
+            'SERIE_A_INJURY_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'serie_a_cache', 'injuries')
+        )
+        # Scraped pages, so readable by this user only
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+    def get(self, source):
+        """(html, metadata) for a cached page, or None"""
+        try:
+            with open(os.path.join(self.cache_dir, f"{source}.json")) as f:
+                meta = json.load(f)
+            with open(os.path.join(self.cache_dir, f"{source}.html"), encoding='utf-8') as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None
+
+    def put(self, source, html, etag=None, last_modified=None):
+        meta = {'source': source, 'fetched_at': time.time(), 'etag': etag, 'last_modified': last_modified}
+        try:
+            self._write_atomic(f"{source}.html", html)
+            self._write_atomic(f"{source}.json", json.dumps(meta))
+        except Exception as e:
+            print(f"Injury cache write failed for {source}: {e}")
+        return meta
+
+    def touch(self, source):
+        """Mark a cached page as revalidated now (upstream answered 304)"""
+        cached = self.get(source)
+        if cached is not None:
+            meta = {**cached[1], 'fetched_at': time.time()}
+            try:
+                self._write_atomic(f"{source}.json", json.dumps(meta))
+            except Exception as e:
+                print(f"Injury cache touch failed for {source}: {e}")
+
+    def _write_atomic(self, name, text):
+        # Write to a temp file then rename, so concurrent readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, os.path.join(self.cache_dir, name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class InjurySourcePipeline:
+    """Fetch every injury source concurrently (or read them from cache) and merge the records"""
+
+    def __init__(self, http_client, base_urls, team_mapping, headers=None, cache=None, ttl=None):
+        self.http = http_client
+        self.base_urls = {source: url for source, url in base_urls.items() if source in PARSERS}
+        self.team_mapping = team_mapping
+        self.headers = headers or {}
+        self.cache = cache or InjuryPageCache()
+        self.ttl = ttl if ttl is not None else float(os.environ.get('SERIE_A_INJURY_TTL', 6 * 3600))
+
+    def collect(self, fetch=False, today=None):
+        """Merged injury records as a DataFrame (empty when no source has a page).
+
+        fetch=False only reads cached pages and never touches the network, which is what
+        request-time loads use; fetch=True refreshes stale pages first.
+        """
+        today = today or datetime.now().date()
+        sources = list(self.base_urls)
+        if fetch:
+            with ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="injury-fetch") as pool:
+                pages = dict(zip(sources, pool.map(self._fetch_source, sources)))
+        else:
+            pages = {source: self._cached_page(source) for source in sources}
+
+        records = []
+        for source in sources:
+            if pages[source] is None:
+                continue
+            try:
+                raw_records = parse_page(source, pages[source])
+            except Exception as e:
+                print(f"Could not parse {source} injuries: {e}")
+                continue
+            records.extend(normalize_record(raw, self.team_mapping, today) for raw in raw_records)
+
+        return pd.DataFrame(merge_records(records), columns=INJURY_COLUMNS)
+
+    def _cached_page(self, source):
+        cached = self.cache.get(source)
+        return cached[0] if cached is not None else None
+
+    def _fetch_source(self, source):
+        """Page HTML: fresh cache, else a conditional GET, else the stale cached copy"""
+        cached = self.cache.get(source)
+        if cached is not None and time.time() - cached[1].get('fetched_at', 0) < self.ttl:
+            return cached[0]
+
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached[1].get('etag'):
+                headers['If-None-Match'] = cached[1]['etag']
+            if cached[1].get('last_modified'):
+                headers['If-Modified-Since'] = cached[1]['last_modified']
+
+        try:
+            response = self.http.get(self.base_urls[source], headers=headers)
+            if response.status_code == 304 and cached is not None:
+                self.cache.touch(source)
+                return cached[0]
+            response.raise_for_status()
+            self.cache.put(source, response.text, etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+            print(f"Fetched {source} injuries ({len(response.text)} bytes)")
+            return response.text
+        except Exception as e:
+            print(f"Injury source {source} failed: {e}")
+            return cached[0] if cached is not None else None
+
+
+def parse_fixtures(team_mapping, today, fixtures_dir=FIXTURES_DIR):
+    """Merged records from the stored HTML pages (one <source>.html per parser), no network"""
+    records = []
+    for source in PARSERS:
+        path = os.path.join(fixtures_dir, f"{source}.html")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                records.extend(normalize_record(raw, team_mapping, today) for raw in parse_page(source, f.read()))
+    return pd.DataFrame(merge_records(records), columns=INJURY_COLUMNS)
+
+
+if __name__ == "__main__":
+    import sys
+    from injury_scraper import InjuryDataScraper
+
+    scraper = InjuryDataScraper()
+    if '--refresh' in sys.argv:
+        injuries = scraper.pipeline.collect(fetch=True)
+    else:
+        # Fixture pages were saved on 2025-09-24
+        injuries = parse_fixtures(scraper.team_mapping, today=datetime(2025, 9, 24).date())
+    print(injuries.to_string())
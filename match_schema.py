@@ -0,0 +1,172 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Canonical match schema shared by every data source
+CANONICAL_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG']
+
+# Optional per-match statistics kept when the source provides them (DataHub / football-data)
+STAT_COLUMNS = ['HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR']
+
+# Date formats seen across sources, tried in order on the rows still unparsed
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%a %b %d %Y', '%d.%m.%Y', '%Y/%m/%d']
+
+SCORE_PATTERN = r'^\s*(\d+)\s*[-:]\s*(\d+)'
+
+
+def _factorize(values):
+    """Row codes plus the distinct values (missing values included) as an object Series.
+
+    Dates and score strings repeat heavily (one date per matchday, a few dozen distinct scores),
+    so parsing only the distinct values is far cheaper than parsing every row.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes, pd.Series(uniques, dtype=object)
+
+
+def compute_results(home_goals, away_goals):
+    """H/D/A result per match, None where either score is missing (match not played)"""
+    home = np.asarray(home_goals, dtype='float64')
+    away = np.asarray(away_goals, dtype='float64')
+
+    results = np.full(len(home), None, dtype=object)
+    results[home > away] = 'H'
+    results[home < away] = 'A'
+    results[home == away] = 'D'
+    return results
+
+
+def parse_scores(scores):
+    """Split scores like '2-1' into (home, away) float Series, NaN when unparsable"""
+    codes, uniques = _factorize(scores)
+    parts = uniques.astype('string').str.extract(SCORE_PATTERN)
+    home = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype='float64')[codes]
+    away = pd.to_numeric(parts[1], errors='coerce').to_numpy(dtype='float64')[codes]
+    return pd.Series(home, index=scores.index), pd.Series(away, index=scores.index)
+
+
+def parse_dates(dates):
+    """Parse a column of mixed-format date strings into datetime64, NaT when unparsable.
+
+    Columns that are already datetime64 (e.g. a compact match table fed back in by the
+    backtest) pass through as naive datetime64[ns]; timezone-aware ones are converted to UTC.
+    """
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        return dates.dt.tz_convert('UTC').dt.tz_localize(None).astype('datetime64[ns]')
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.astype('datetime64[ns]')
+    codes, uniques = _factorize(dates)
+    parsed = _parse_unique_dates(uniques).to_numpy()[codes]
+    return pd.Series(parsed, index=dates.index)
+
+
+def format_dates(dates):
+    """Canonical ISO 'YYYY-MM-DD' dates, keeping the source text where parsing failed"""
+    codes, uniques = _factorize(dates)
+    parsed = _parse_unique_dates(uniques)
+    iso = parsed.dt.strftime('%Y-%m-%d').astype(object)
+    unparsed = parsed.isna()
+    iso[unparsed] = uniques[unparsed]
+    return pd.Series(iso.to_numpy()[codes], index=dates.index)
+
+
+def _parse_unique_dates(dates):
+    text = dates.astype('string').str.strip()
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+
+    # date/datetime/Timestamp objects in an object column need no format guessing
+    objects = dates.map(lambda value: isinstance(value, date)).astype(bool)
+    if objects.any():
+        parsed[objects] = pd.to_datetime(list(dates[objects]), utc=True).tz_localize(None)
+        text = text.mask(objects)
+
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna() & text.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=date_format, errors='coerce')
+
+    return parsed
+
+
+def normalize_matches(df):
+    """Convert any supported source format to the canonical match schema"""
+    if 'Team 1' in df.columns and 'Team 2' in df.columns:
+        return _from_footballcsv(df)
+    if 'team1' in df.columns and 'team2' in df.columns:
+        return _from_openfootball(df)
+    if all(col in df.columns for col in ['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']):
+        return _from_football_data(df)
+    return pd.DataFrame(columns=CANONICAL_COLUMNS)
+
+
+def normalize_openfootball(matches):
+    """Canonical frame from the 'matches' list of an OpenFootball JSON file"""
+    if not matches:
+        return pd.DataFrame(columns=CANONICAL_COLUMNS)
+    return _from_openfootball(pd.DataFrame.from_records(matches))
+
+
+def _build(dates, home_teams, away_teams, home_goals, away_goals, ht_home=None, ht_away=None):
+    standardized_df = pd.DataFrame({
+        'Date': format_dates(dates).to_numpy(),
+        'HomeTeam': home_teams.astype(object).str.strip().to_numpy(),
+        'AwayTeam': away_teams.astype(object).str.strip().to_numpy(),
+        'FTHG': np.asarray(home_goals, dtype='float64'),
+        'FTAG': np.asarray(away_goals, dtype='float64')
+    })
+    standardized_df['FTR'] = compute_results(standardized_df['FTHG'], standardized_df['FTAG'])
+
+    if ht_home is not None and ht_away is not None:
+        standardized_df['HTHG'] = np.asarray(ht_home, dtype='float64')
+        standardized_df['HTAG'] = np.asarray(ht_away, dtype='float64')
+
+    return standardized_df
+
+
+def _from_footballcsv(df):
+    # Football-CSV format: Date, Team 1, FT, HT, Team 2
+    if 'FT' in df.columns:
+        home_goals, away_goals = parse_scores(df['FT'])
+    else:
+        home_goals = away_goals = np.full(len(df), np.nan)
+
+    ht_home = ht_away = None
+    if 'HT' in df.columns:
+        ht_home, ht_away = parse_scores(df['HT'])
+
+    return _build(df['Date'], df['Team 1'], df['Team 2'], home_goals, away_goals, ht_home, ht_away)
+
+
+def _from_openfootball(df):
+    # OpenFootball JSON: date, team1, team2 and either score1/score2 or score.ft / score.ht lists
+    if 'score1' in df.columns and 'score2' in df.columns:
+        home_goals = pd.to_numeric(df['score1'], errors='coerce')
+        away_goals = pd.to_numeric(df['score2'], errors='coerce')
+    elif 'score' in df.columns:
+        full_time = df['score'].str.get('ft')
+        home_goals = pd.to_numeric(full_time.str.get(0), errors='coerce')
+        away_goals = pd.to_numeric(full_time.str.get(1), errors='coerce')
+    else:
+        home_goals = away_goals = np.full(len(df), np.nan)
+
+    dates = df['date'] if 'date' in df.columns else pd.Series('', index=df.index)
+    return _build(dates, df['team1'], df['team2'], home_goals, away_goals)
+
+
+def _from_football_data(df):
+    # DataHub / football-data.co.uk CSV: already uses the canonical column names
+    ht_home = df['HTHG'] if 'HTHG' in df.columns else None
+    ht_away = df['HTAG'] if 'HTAG' in df.columns else None
+    home_goals = pd.to_numeric(df['FTHG'], errors='coerce')
+    away_goals = pd.to_numeric(df['FTAG'], errors='coerce')
+    standardized_df = _build(df['Date'], df['HomeTeam'], df['AwayTeam'], home_goals, away_goals,
+                             pd.to_numeric(ht_home, errors='coerce') if ht_home is not None else None,
+                             pd.to_numeric(ht_away, errors='coerce') if ht_away is not None else None)
+
+    for col in STAT_COLUMNS:
+        if col in df.columns:
+            standardized_df[col] = pd.to_numeric(df[col], errors='coerce').to_numpy()
+
+    return standardized_df
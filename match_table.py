@@ -0,0 +1,230 @@
+import threading
+import numpy as np
+import pandas as pd
+from match_schema import STAT_COLUMNS, parse_dates
+
+RESULT_CATEGORIES = ['H', 'D', 'A']
+
+# Integer columns narrowed to int8: goals, half-time goals and per-match stats all fit in 0..127
+SMALL_INT_COLUMNS = ['FTHG', 'FTAG', 'HTHG', 'HTAG'] + STAT_COLUMNS
+
+
+def build_match_table(df):
+    """Compact, date-sorted match table used by the prediction engine.
+
+    Only completed matches are kept. Team names share one categorical dtype, so HomeTeam and
+    AwayTeam codes are comparable team ids; goals and stats are int8 (nullable Int8 where a
+    source left gaps) and Date is parsed once into datetime64.
+    """
+    if df.empty or not all(col in df.columns for col in ['HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']):
+        return pd.DataFrame(columns=['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR'])
+
+    # Unplayed fixtures carry no result and would only skew counts
+    played = df[df['FTHG'].notna() & df['FTAG'].notna()]
+
+    table = pd.DataFrame(index=played.index)
+    table['Date'] = parse_dates(played['Date']) if 'Date' in played.columns else pd.NaT
+
+    teams = pd.CategoricalDtype(sorted(set(played['HomeTeam'].astype(str)) | set(played['AwayTeam'].astype(str))))
+    table['HomeTeam'] = played['HomeTeam'].astype(str).astype(teams)
+    table['AwayTeam'] = played['AwayTeam'].astype(str).astype(teams)
+
+    for col in SMALL_INT_COLUMNS:
+        if col in played.columns:
+            values = pd.to_numeric(played[col], errors='coerce')
+            table[col] = values.astype('int8') if values.notna().all() else values.astype('Int8')
+
+    home_goals = table['FTHG'].to_numpy()
+    away_goals = table['FTAG'].to_numpy()
+    table['FTR'] = pd.Categorical(
+        np.where(home_goals > away_goals, 'H', np.where(home_goals < away_goals, 'A', 'D')),
+        categories=RESULT_CATEGORIES
+    )
+
+    if 'Season' in played.columns:
+        table['Season'] = played['Season'].astype('category')
+
+    # Sort once at load; stable so same-day matches keep their source order
+    table = table.sort_values('Date', kind='mergesort', na_position='first').reset_index(drop=True)
+
+    # Canonical column order: core columns first, then whatever optional stats the sources had
+    core = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR']
+    return table[core + [col for col in table.columns if col not in core]]
+
+
+def append_matches(table, new_rows):
+    """Append compact match rows to a compact match table, keeping dtypes compact.
+
+    Team, result and season categories are merged; optional stat columns missing on one side
+    become nullable Int8 so they can hold gaps.
+    """
+    if table.empty:
+        return new_rows.reset_index(drop=True)
+
+    table = table.copy()
+    new_rows = new_rows.copy()
+
+    for col in set(table.columns) | set(new_rows.columns):
+        if col not in table.columns:
+            table[col] = pd.array([pd.NA] * len(table), dtype='Int8')
+        if col not in new_rows.columns:
+            new_rows[col] = pd.array([pd.NA] * len(new_rows), dtype='Int8') if col != 'Season' else None
+
+        if isinstance(table[col].dtype, pd.CategoricalDtype) or isinstance(new_rows[col].dtype, pd.CategoricalDtype):
+            categories = sorted(set(table[col].dropna().astype(str)) | set(new_rows[col].dropna().astype(str)))
+            if col == 'FTR':
+                categories = RESULT_CATEGORIES
+            merged = pd.CategoricalDtype(categories)
+            table[col] = table[col].astype(object).astype(merged)
+            new_rows[col] = new_rows[col].astype(object).astype(merged)
+        elif table[col].dtype != new_rows[col].dtype and col in SMALL_INT_COLUMNS:
+            table[col] = table[col].astype('Int8')
+            new_rows[col] = new_rows[col].astype('Int8')
+
+    # HomeTeam and AwayTeam must keep sharing one dtype so codes stay comparable
+    teams = pd.CategoricalDtype(sorted(set(table['HomeTeam'].cat.categories) | set(table['AwayTeam'].cat.categories)))
+    for frame in (table, new_rows):
+        frame['HomeTeam'] = frame['HomeTeam'].astype(object).astype(teams)
+        frame['AwayTeam'] = frame['AwayTeam'].astype(object).astype(teams)
+
+    return pd.concat([table, new_rows[table.columns]], ignore_index=True)
+
+
+def _stack_chunks(chunks):
+    """One frame from several appended chunks; categorical columns become plain values so
+    append_matches can merge their categories in one pass"""
+    frames = [chunk.astype({col: object for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)})
+              for chunk in chunks]
+    return pd.concat(frames, ignore_index=True)
+
+
+class ChunkedMatchTable:
+    """Compact match table that grows by appending chunks of new results.
+
+    An append stores the new rows as they are, in O(new rows): nothing already stored is
+    copied or recoded. The chunks are merged into one frame only when a caller reads the
+    whole table (frame()), and the merged frame is kept until the next append. Rows are in
+    arrival order: a late result is appended after later-dated ones, so existing row
+    positions never move. The loaded part is date-sorted by build_match_table. Appends and
+    merges take a lock, so a reader merging the table never loses a chunk appended meanwhile.
+    """
+
+    def __init__(self, table):
+        self._frame = table.reset_index(drop=True)
+        self._chunks = []
+        self._size = len(self._frame)
+        self.appended = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    def append(self, new_rows):
+        """Add compact match rows; returns the position of the first one"""
+        new_rows = new_rows.reset_index(drop=True)
+        with self._lock:
+            first_position = self._size
+            self._chunks.append(new_rows)
+            self._size += len(new_rows)
+            self.appended += len(new_rows)
+        return first_position
+
+    def frame(self):
+        """The whole table as one compact frame"""
+        with self._lock:
+            if self._chunks:
+                chunks, self._chunks = self._chunks, []
+                self._frame = append_matches(self._frame, _stack_chunks(chunks))
+            return self._frame
+
+
+class TeamMatchIndex:
+    """Row positions of each team's matches, listed in date order.
+
+    Built from a date-sorted match table, where positions ascend with dates: the last N
+    entries are the team's N most recent matches. Rows appended later are placed by their
+    date, so a late result lands before a team's later-dated matches.
+    """
+
+    def __init__(self, match_table):
+        self._empty = np.array([], dtype=np.intp)
+        self._home = {}
+        self._away = {}
+        self._all = {}
+        self._pairs = {}
+
+        # Date of every row position, grown by doubling as rows are appended
+        self._dates = match_table['Date'].to_numpy().astype('datetime64[ns]') if not match_table.empty \
+            else np.empty(0, dtype='datetime64[ns]')
+        self._size = len(self._dates)
+
+        if match_table.empty:
+            return
+
+        self._home = {str(team): rows for team, rows in match_table.groupby('HomeTeam', observed=True).indices.items()}
+        self._away = {str(team): rows for team, rows in match_table.groupby('AwayTeam', observed=True).indices.items()}
+        for team in self._home.keys() | self._away.keys():
+            self._all[team] = np.union1d(self._home.get(team, self._empty), self._away.get(team, self._empty))
+
+        # Unordered pair key from the shared category codes: same key whichever side was at home
+        home_codes = match_table['HomeTeam'].cat.codes.to_numpy().astype(np.int64)
+        away_codes = match_table['AwayTeam'].cat.codes.to_numpy().astype(np.int64)
+        categories = match_table['HomeTeam'].cat.categories
+        n_teams = len(categories)
+        pair_keys = np.minimum(home_codes, away_codes) * n_teams + np.maximum(home_codes, away_codes)
+        for key, rows in pd.Series(pair_keys).groupby(pair_keys).indices.items():
+            # Categories are sorted, so the lower code is also the name pair_key puts first
+            self._pairs[(str(categories[key // n_teams]), str(categories[key % n_teams]))] = rows
+
+    def add_match(self, position, home_team, away_team, date=None):
+        """Register one appended row (positions are appended in order: 0, 1, 2, ...)"""
+        date = np.datetime64('NaT', 'ns') if date is None or pd.isna(date) else np.datetime64(date, 'ns')
+        if position >= len(self._dates):
+            grown = np.empty(max(8, 2 * len(self._dates), position + 1), dtype='datetime64[ns]')
+            grown[:self._size] = self._dates[:self._size]
+            self._dates = grown
+        self._dates[position] = date
+        self._size = max(self._size, position + 1)
+
+        self._insert(self._home, home_team, position, date)
+        self._insert(self._away, away_team, position, date)
+        self._insert(self._all, home_team, position, date)
+        self._insert(self._all, away_team, position, date)
+        self._insert(self._pairs, self.pair_key(home_team, away_team), position, date)
+
+    def _insert(self, store, key, position, date):
+        """Add a position to one list: appended when it is the latest, else placed by date"""
+        rows = store.get(key, self._empty)
+        if len(rows) == 0 or not date < self._dates[rows[-1]]:
+            store[key] = np.append(rows, position)
+        else:
+            store[key] = np.insert(rows, np.searchsorted(self._dates[rows], date, side='right'), position)
+
+    def teams(self):
+        """All teams with at least one match"""
+        return sorted(self._all)
+
+    def home_rows(self, team):
+        return self._home.get(team, self._empty)
+
+    def away_rows(self, team):
+        return self._away.get(team, self._empty)
+
+    def team_rows(self, team):
+        return self._all.get(team, self._empty)
+
+    def pairs(self):
+        """(pair_key, rows) for every pair of teams that have met"""
+        return self._pairs.items()
+
+    def pair_rows(self, team_a, team_b):
+        """Matches between two teams, either way round"""
+        return self._pairs.get(self.pair_key(team_a, team_b), self._empty)
+
+    @staticmethod
+    def pair_key(team_a, team_b):
+        return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
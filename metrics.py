@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NullTimer:
+    """Shared do-nothing context manager handed out while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.registry.increment(f"{self.name}.errors")
+        return False
+
+
+class Metrics:
+    """In-process latency histograms and counters keyed by name (e.g. 'engine.form').
+
+    Disabled registries hand out a shared no-op timer and return from observe/increment at
+    once, so hooks left in hot paths cost one attribute check.
+    """
+
+    def __init__(self, enabled=None, buckets=DEFAULT_BUCKETS):
+        if enabled is None:
+            enabled = os.environ.get('SERIE_A_METRICS', '1').lower() not in ('0', 'false', 'no')
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        """Context manager recording the duration of its block under name"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0,
+                                                      'max': 0.0}
+            histogram['counts'][index] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def increment(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """JSON-friendly copy: per-name count, sum, mean, max and cumulative bucket counts"""
+        with self._lock:
+            histograms = {name: {**histogram, 'counts': list(histogram['counts'])}
+                          for name, histogram in self._histograms.items()}
+            counters = dict(self._counters)
+
+        timings = {}
+        for name, histogram in sorted(histograms.items()):
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(list(self.buckets) + ['+Inf'], histogram['counts']):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            timings[name] = {
+                'count': histogram['count'],
+                'sum_seconds': histogram['sum'],
+                'mean_seconds': histogram['sum'] / histogram['count'] if histogram['count'] > 0 else 0,
+                'max_seconds': histogram['max'],
+                'buckets': buckets
+            }
+
+        return {'enabled': self.enabled, 'timings': timings, 'counters': dict(sorted(counters.items()))}
+
+    def prometheus_text(self, prefix='serie_a'):
+        """Prometheus text exposition format (version 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_duration_seconds Latency of engine stages, fetcher calls and API routes",
+            f"# TYPE {prefix}_duration_seconds histogram"
+        ]
+        for name, timing in snapshot['timings'].items():
+            label = _escape(name)
+            for bound, count in timing['buckets'].items():
+                lines.append(f'{prefix}_duration_seconds_bucket{{name="{label}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_duration_seconds_sum{{name="{label}"}} {timing["sum_seconds"]}')
+            lines.append(f'{prefix}_duration_seconds_count{{name="{label}"}} {timing["count"]}')
+
+        lines.append(f"# HELP {prefix}_events_total Event counters (cache hits, errors, responses by status)")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snapshot['counters'].items():
+            lines.append(f'{prefix}_events_total{{name="{_escape(name)}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_shared_metrics = Metrics()
+
+
+def get_metrics():
+    """Process-wide registry shared by the engine, fetchers and Flask routes"""
+    return _shared_metrics
+
+
+def timed(name):
+    """Decorator recording every call of a function under name in the shared registry"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _shared_metrics.enabled:
+                return func(*args, **kwargs)
+            with _Timer(_shared_metrics, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
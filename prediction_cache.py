@@ -0,0 +1,82 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Bounded LRU cache of full predictions with an optional TTL.
+
+    Every entry is stored with the data version it was computed from; a lookup with a
+    different version is a miss and drops the stale entry, so predictions are invalidated
+    exactly when one of their inputs changes.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key, version):
+        """Cached prediction for key computed at this version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            entry_version, stored_at, value = entry
+            if entry_version != version or (self.ttl is not None and time.time() - stored_at > self.ttl):
+                del self._entries[key]
+                self._invalidations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+        # Callers decorate predictions (e.g. fixture_info), so never hand out the stored object
+        return copy.deepcopy(value)
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, time.time(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate_teams(self, teams):
+        """Drop every entry whose key mentions one of the given teams"""
+        teams = set(teams)
+        with self._lock:
+            stale = [key for key in self._entries if teams.intersection(key)]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups > 0 else 0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
@@ -1,18 +1,71 @@
+import numpy as np
 import pandas as pd
 import json
+import os
 from datetime import datetime, timedelta
-from collections import defaultdict
 import math
+import threading
+from elo_ratings import EloRatings
+from form_table import FormTable
+from goal_model import GoalModel
+from head_to_head import HeadToHeadStore
+from match_table import ChunkedMatchTable, TeamMatchIndex, build_match_table
+from metrics import get_metrics
+from prediction_cache import PredictionCache
+from prediction_params import clamp_percentage, line_percentage, load_params
+from team_stats import add_match_to_stats, build_team_table, team_stats_dict
 
 class SerieAPredictionEngine:
-    def __init__(self, data_fetcher, injury_scraper, transfer_scraper):
+    def __init__(self, data_fetcher, injury_scraper, transfer_scraper, prediction_cache=None, elo_ratings=None,
+                 historical_data=None, params=None, goal_model_refit_matches=None):
         self.data_fetcher = data_fetcher
         self.injury_scraper = injury_scraper
         self.transfer_scraper = transfer_scraper
 
-        # Load and prepare historical data
-        self.historical_data = self._load_historical_data()
+        # Weights of the result/goals/advanced predictors (calibrated by calibrate.py)
+        self.params = params or load_params()
+
+        # Load and prepare historical data (or start from the matches given, e.g. for backtesting);
+        # later results are appended in chunks without copying what is already loaded
+        if historical_data is not None:
+            self._matches = ChunkedMatchTable(build_match_table(historical_data))
+        else:
+            self._matches = ChunkedMatchTable(self._load_historical_data())
+        self.match_index = TeamMatchIndex(self.historical_data)
         self.team_stats = self._calculate_team_statistics()
+        self.form_table = FormTable(self.historical_data)
+        self.h2h_store = HeadToHeadStore(self.historical_data, self.match_index)
+        self.goal_model = GoalModel().fit(self.historical_data)
+
+        # The score model is fitted jointly on every match, so it is refitted on a schedule rather
+        # than per ingest: on each refresh_current_season, or once this many new results are in
+        self.goal_model_refit_matches = goal_model_refit_matches if goal_model_refit_matches is not None else \
+            int(os.environ.get('SERIE_A_GOAL_MODEL_REFIT_MATCHES', 10))
+        self._goal_model_pending = 0
+
+        # Full predictions cached per fixture, keyed by the version of every input they used
+        self.prediction_cache = prediction_cache or PredictionCache(
+            max_entries=int(os.environ.get('SERIE_A_PREDICTION_CACHE_SIZE', 1024)),
+            ttl=float(os.environ['SERIE_A_PREDICTION_CACHE_TTL']) if 'SERIE_A_PREDICTION_CACHE_TTL' in os.environ else None
+        )
+        # Content hash of the loaded table; each ingest extends it with the appended row count,
+        # and the teams it touched record that count as their version
+        self._base_version = self._fingerprint(self.historical_data)
+        self._table_version = self._base_version
+        self._team_versions = {}
+
+        # Ratings are restored from disk when they were built from this same history
+        self.elo_ratings = (elo_ratings or EloRatings()).load(self.historical_data, self._table_version)
+
+        # Keys of every match already in the table, so re-fetched results are not counted twice
+        self._match_keys = self._keys_of(self.historical_data)
+        self._state_lock = threading.RLock()
+        self.metrics = get_metrics()
+
+    @property
+    def historical_data(self):
+        """Every completed match the engine has, as one compact frame (merged on first read after an ingest)"""
+        return self._matches.frame()
 
     def _load_historical_data(self):
         """Load multi-season historical data for training"""
@@ -22,253 +75,413 @@ class SerieAPredictionEngine:
         seasons = ["2023-24", "2024-25"]  # Use recent complete seasons
         combined_data = self.data_fetcher.get_multiple_seasons_data(seasons)
 
-        print(f"Loaded {len(combined_data)} historical matches")
-        return combined_data
+        # Compact typed table: team categories, int8 goals/stats, parsed dates sorted once
+        match_table = build_match_table(combined_data)
+        print(f"Loaded {len(match_table)} historical matches "
+              f"({match_table.memory_usage(deep=True).sum() / 1024:.0f} KiB in memory)")
+        return match_table
 
     def _calculate_team_statistics(self):
         """Calculate comprehensive team statistics for prediction"""
-        team_stats = {}
-
-        if self.historical_data.empty:
-            return team_stats
-
-        # Get unique teams
-        home_teams = set(self.historical_data['HomeTeam'].unique())
-        away_teams = set(self.historical_data['AwayTeam'].unique())
-        all_teams = home_teams.union(away_teams)
-
-        for team in all_teams:
-            # Home matches
-            home_matches = self.historical_data[self.historical_data['HomeTeam'] == team]
-            # Away matches
-            away_matches = self.historical_data[self.historical_data['AwayTeam'] == team]
-
-            # Basic stats
-            total_matches = len(home_matches) + len(away_matches)
-
-            if total_matches == 0:
-                continue
-
-            # Results
-            home_wins = len(home_matches[home_matches['FTR'] == 'H']) if 'FTR' in home_matches.columns else 0
-            away_wins = len(away_matches[away_matches['FTR'] == 'A']) if 'FTR' in away_matches.columns else 0
-            draws = (len(home_matches[home_matches['FTR'] == 'D']) +
-                    len(away_matches[away_matches['FTR'] == 'D'])) if 'FTR' in self.historical_data.columns else 0
-
-            # Goals
-            goals_for_home = home_matches['FTHG'].sum() if 'FTHG' in home_matches.columns else 0
-            goals_for_away = away_matches['FTAG'].sum() if 'FTAG' in away_matches.columns else 0
-            goals_against_home = home_matches['FTAG'].sum() if 'FTAG' in home_matches.columns else 0
-            goals_against_away = away_matches['FTHG'].sum() if 'FTHG' in away_matches.columns else 0
-
-            total_goals_for = goals_for_home + goals_for_away
-            total_goals_against = goals_against_home + goals_against_away
-
-            # Advanced stats (if available)
-            corners_for = 0
-            corners_against = 0
-            cards = 0
-
-            if 'HC' in home_matches.columns:
-                corners_for += home_matches['HC'].sum()
-                corners_for += away_matches['AC'].sum() if 'AC' in away_matches.columns else 0
-                corners_against += home_matches['AC'].sum() if 'AC' in home_matches.columns else 0
-                corners_against += away_matches['HC'].sum() if 'HC' in away_matches.columns else 0
-
-            if 'HY' in home_matches.columns:
-                cards += home_matches['HY'].sum() + home_matches['HR'].sum() if 'HR' in home_matches.columns else 0
-                cards += away_matches['AY'].sum() + away_matches['AR'].sum() if 'AR' in away_matches.columns else 0
-
-            team_stats[team] = {
-                'total_matches': total_matches,
-                'wins': home_wins + away_wins,
-                'draws': draws,
-                'losses': total_matches - (home_wins + away_wins + draws),
-                'goals_for': total_goals_for,
-                'goals_against': total_goals_against,
-                'goal_difference': total_goals_for - total_goals_against,
-                'goals_per_match': total_goals_for / total_matches if total_matches > 0 else 0,
-                'goals_conceded_per_match': total_goals_against / total_matches if total_matches > 0 else 0,
-                'win_rate': (home_wins + away_wins) / total_matches if total_matches > 0 else 0,
-                'home_win_rate': home_wins / len(home_matches) if len(home_matches) > 0 else 0,
-                'away_win_rate': away_wins / len(away_matches) if len(away_matches) > 0 else 0,
-                'corners_per_match': corners_for / total_matches if total_matches > 0 else 0,
-                'cards_per_match': cards / total_matches if total_matches > 0 else 0
-            }
-
-        return team_stats
-
-    def _get_recent_form(self, team, matches=5):
-        """Get recent form for a team (last N matches)"""
         if self.historical_data.empty:
-            return {'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0, 'goals_against': 0}
-
-        # Get team's recent matches
-        team_matches = self.historical_data[
-            (self.historical_data['HomeTeam'] == team) |
-            (self.historical_data['AwayTeam'] == team)
-        ].copy()
-
-        if team_matches.empty:
-            return {'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0, 'goals_against': 0}
-
-        # Sort by date (most recent first) - handle different date formats
+            return {}
+
+        # One grouped pass over all matches instead of re-filtering the table per team
+        return team_stats_dict(build_team_table(self.historical_data))
+
+    def _keys_of(self, match_table):
+        """(date, home, away) key of every row in a compact match table"""
+        if match_table.empty:
+            return set()
+        dates = match_table['Date'].dt.strftime('%Y-%m-%d').fillna('')
+        return set(zip(dates, match_table['HomeTeam'].astype(str), match_table['AwayTeam'].astype(str)))
+
+    def refresh_current_season(self):
+        """Fetch the current season and ingest any results the engine has not seen yet"""
+        season = self.data_fetcher.current_season
+        season_data = self.data_fetcher.fetch_season_data(season)
+
+        # Placeholder data must never become part of the model
+        if season_data.empty or season_data.attrs.get('source') == 'dummy':
+            print(f"No {season} results available to ingest")
+            return 0
+
+        season_data = season_data.copy()
+        season_data['Season'] = season
+        ingested = self.ingest_results(season_data)
+
+        # A refresh is the score model's regular refit point
+        if self._goal_model_pending > 0:
+            self.refit_goal_model()
+        return ingested
+
+    def refit_goal_model(self):
+        """Refit the score model on every match; drops all cached predictions, which carry its markets"""
+        with self._state_lock, self.metrics.timer('engine.goal_model_fit'):
+            self.goal_model.fit(self.historical_data)
+            self._goal_model_pending = 0
+            self.prediction_cache.clear()
+        print(f"Refitted goal model (version {self.goal_model.version})")
+
+    def ingest_results(self, matches):
+        """Add newly completed matches to the engine state incrementally.
+
+        Accepts matches in the fetcher's canonical schema; unplayed fixtures and matches the
+        engine already has are skipped. The rows are appended to the match table in O(new rows);
+        team statistics, form, head-to-head and the match index are updated only for the teams
+        involved (a late result is placed by date in those teams' sequences) and their cached
+        predictions are dropped. The goal model is only refitted once goal_model_refit_matches
+        new results have built up. Returns the number of matches added.
+        """
+        new_rows = build_match_table(matches)
+        if new_rows.empty:
+            return 0
+
+        row_keys = list(zip(new_rows['Date'].dt.strftime('%Y-%m-%d').fillna(''),
+                            new_rows['HomeTeam'].astype(str), new_rows['AwayTeam'].astype(str)))
+
+        with self._state_lock, self.metrics.timer('engine.ingest'):
+            batch_keys = set()
+            fresh = []
+            for position, key in enumerate(row_keys):
+                if key not in self._match_keys and key not in batch_keys:
+                    batch_keys.add(key)
+                    fresh.append(position)
+            if not fresh:
+                return 0
+            new_rows = new_rows.iloc[fresh].reset_index(drop=True)
+
+            first_position = self._matches.append(new_rows)
+            self._match_keys |= batch_keys
+            self._table_version = f"{self._base_version}+{self._matches.appended}"
+
+            affected = set(new_rows['HomeTeam'].astype(str)) | set(new_rows['AwayTeam'].astype(str))
+            self._apply_new_rows(new_rows, first_position)
+
+            # Strengths are fitted jointly, so a refit moves every team: batch it over several ingests
+            self._goal_model_pending += len(new_rows)
+            if 0 < self.goal_model_refit_matches <= self._goal_model_pending:
+                self.refit_goal_model()
+
+            for row in new_rows.itertuples(index=False):
+                self.elo_ratings.update(row.Date, str(row.HomeTeam), str(row.AwayTeam), int(row.FTHG), int(row.FTAG))
+            self.elo_ratings.save()
+
+            for team in affected:
+                self._team_versions[team] = self._table_version
+            self.prediction_cache.invalidate_teams(affected)
+
+        print(f"Ingested {len(new_rows)} new results ({len(affected)} teams affected)")
+        return len(new_rows)
+
+    def _apply_new_rows(self, new_rows, first_position):
+        """Fold appended rows into every derived structure, one match at a time"""
+        def value(row, col):
+            number = getattr(row, col, 0)
+            return 0 if pd.isna(number) else int(number)
+
+        for offset, row in enumerate(new_rows.itertuples(index=False)):
+            home_team, away_team = str(row.HomeTeam), str(row.AwayTeam)
+            home_goals, away_goals = int(row.FTHG), int(row.FTAG)
+
+            self.match_index.add_match(first_position + offset, home_team, away_team, row.Date)
+            add_match_to_stats(
+                self.team_stats, home_team, away_team, home_goals, away_goals,
+                home_corners=value(row, 'HC'), away_corners=value(row, 'AC'),
+                home_cards=value(row, 'HY') + value(row, 'HR'), away_cards=value(row, 'AY') + value(row, 'AR')
+            )
+            self.form_table.add_match(row.Date, home_team, away_team, home_goals, away_goals)
+            self.h2h_store.add_match(row.Date, home_team, away_team, home_goals, away_goals)
+
+    def _get_recent_form(self, team, matches=5, venue='all', as_of=None):
+        """Get recent form for a team (last N matches, optionally home/away only or before a date)"""
+        # Prefix sums over each team's date-sorted matches: no scan, no date parsing
+        return self.form_table.form(team, matches=matches, venue=venue, as_of=as_of)
+
+    def _get_head_to_head(self, home_team, away_team, matches=5, as_of=None):
+        """Get head-to-head record between two teams (last N meetings by date)"""
+        return self.h2h_store.summary(home_team, away_team, matches=matches, as_of=as_of)
+
+    def predict_match(self, home_team, away_team, match_date=None):
+        """Generate comprehensive prediction for a match (injuries as of match_date when given)"""
+        return self.predict_matches([{'home_team': home_team, 'away_team': away_team, 'date': match_date}],
+                                    raise_errors=True)[0]
+
+    def predict_matches(self, fixtures, raise_errors=False):
+        """Generate predictions for many fixtures in one vectorized pass.
+
+        Fixtures are dicts with 'home_team', 'away_team' and optionally 'date' (as returned by
+        SerieAFixturesFetcher) or (home, away[, date]) tuples. With a date, injuries count only
+        players still out on that day. Results are in fixture order and identical to predict_match.
+        A fixture that cannot be predicted gets {'match', 'error'} in its place and the others are
+        still returned; with raise_errors the exception propagates instead.
+        """
+        if not fixtures:
+            return []
+
+        predictions = [None] * len(fixtures)
+        teams = [None] * len(fixtures)
+        dates = [None] * len(fixtures)
+        for i, fixture in enumerate(fixtures):
+            try:
+                teams[i], dates[i] = self._parse_fixture(fixture)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                predictions[i] = self._error_entry(fixture, e)
+        valid = [i for i, prediction in enumerate(predictions) if prediction is None]
+
+        # Dated fixtures are cached per date, since injuries differ between matchdays
+        keys = {i: teams[i] if dates[i] is None else teams[i] + (dates[i],) for i in valid}
+
+        # Serve what we can from the cache, compute the rest in one batch
+        input_version = self._input_version()
+        goal_model_version = self.goal_model.version
+        versions = {i: self._fixture_version(teams[i][0], teams[i][1], input_version) for i in valid}
+        for i in valid:
+            predictions[i] = self.prediction_cache.get(keys[i], versions[i])
+        missing = [i for i in valid if predictions[i] is None]
+        self.metrics.increment('engine.cache_hits', len(valid) - len(missing))
+        self.metrics.increment('engine.cache_misses', len(missing))
+
+        if missing:
+            computed = self._compute_batch([teams[i] for i in missing], [dates[i] for i in missing], raise_errors)
+            # A refit while computing clears the cache; results from the old model must not refill it
+            refitted = self.goal_model.version != goal_model_version
+            for i, prediction in zip(missing, computed):
+                if 'error' not in prediction and not refitted:
+                    self.prediction_cache.put(keys[i], versions[i], prediction)
+                predictions[i] = prediction
+
+        # Stamped per response, so cached predictions never report when they were first computed
+        prediction_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for prediction in predictions:
+            if 'error' not in prediction:
+                prediction['prediction_date'] = prediction_date
+
+        return predictions
+
+    def _parse_fixture(self, fixture):
+        """((home, away), 'YYYY-MM-DD' or None) of a fixture dict or tuple"""
+        if isinstance(fixture, (tuple, list)):
+            teams, match_date = (fixture[0], fixture[1]), fixture[2] if len(fixture) > 2 else None
+        else:
+            teams, match_date = (fixture['home_team'], fixture['away_team']), fixture.get('date')
+        if not all(isinstance(team, str) and team for team in teams):
+            raise ValueError(f"Invalid team names {teams!r}")
+        return teams, self._match_date(match_date)
+
+    def _compute_batch(self, teams, dates, raise_errors=False):
+        """Compute a batch of predictions; if the batch fails, retry each fixture on its own so
+        one bad fixture only costs its own slot"""
         try:
-            team_matches['Date'] = pd.to_datetime(team_matches['Date'])
-            team_matches = team_matches.sort_values('Date', ascending=False)
-        except:
-            # If date parsing fails, just take the last N matches
-            pass
-
-        recent = team_matches.head(matches)
-
-        wins = draws = losses = goals_for = goals_against = 0
-
-        for _, match in recent.iterrows():
-            if match['HomeTeam'] == team:
-                # Team playing at home
-                goals_for += match.get('FTHG', 0)
-                goals_against += match.get('FTAG', 0)
-                if match.get('FTR') == 'H':
-                    wins += 1
-                elif match.get('FTR') == 'D':
-                    draws += 1
-                else:
-                    losses += 1
-            else:
-                # Team playing away
-                goals_for += match.get('FTAG', 0)
-                goals_against += match.get('FTHG', 0)
-                if match.get('FTR') == 'A':
-                    wins += 1
-                elif match.get('FTR') == 'D':
-                    draws += 1
-                else:
-                    losses += 1
-
-        return {
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'form_points': wins * 3 + draws,  # Form in points
-            'matches_analyzed': len(recent)
-        }
-
-    def _get_head_to_head(self, home_team, away_team, matches=5):
-        """Get head-to-head record between two teams"""
-        if self.historical_data.empty:
-            return {'home_wins': 0, 'away_wins': 0, 'draws': 0, 'total_goals': 0}
-
-        h2h_matches = self.historical_data[
-            ((self.historical_data['HomeTeam'] == home_team) & (self.historical_data['AwayTeam'] == away_team)) |
-            ((self.historical_data['HomeTeam'] == away_team) & (self.historical_data['AwayTeam'] == home_team))
-        ]
-
-        if h2h_matches.empty:
-            return {'home_wins': 0, 'away_wins': 0, 'draws': 0, 'total_goals': 0, 'matches': 0}
-
-        # Get recent H2H
-        recent_h2h = h2h_matches.tail(matches)
-
-        home_wins = away_wins = draws = total_goals = 0
-
-        for _, match in recent_h2h.iterrows():
-            total_goals += (match.get('FTHG', 0) + match.get('FTAG', 0))
-
-            if match['HomeTeam'] == home_team:
-                # Current home team was home in this historical match
-                if match.get('FTR') == 'H':
-                    home_wins += 1
-                elif match.get('FTR') == 'A':
-                    away_wins += 1
-                else:
-                    draws += 1
-            else:
-                # Current home team was away in this historical match
-                if match.get('FTR') == 'A':
-                    home_wins += 1
-                elif match.get('FTR') == 'H':
-                    away_wins += 1
-                else:
-                    draws += 1
+            with self._state_lock, self.metrics.timer('engine.compute'):
+                return self._compute_predictions(teams, dates)
+        except Exception as e:
+            if raise_errors:
+                raise
+            if len(teams) == 1:
+                return [self._error_entry(teams[0], e)]
+            print(f"Batch prediction failed, predicting fixtures one by one: {e}")
+
+        predictions = []
+        for fixture_teams, match_date in zip(teams, dates):
+            try:
+                with self._state_lock, self.metrics.timer('engine.compute'):
+                    predictions.extend(self._compute_predictions([fixture_teams], [match_date]))
+            except Exception as e:
+                predictions.append(self._error_entry(fixture_teams, e))
+        return predictions
+
+    def _error_entry(self, fixture, error):
+        """Placeholder returned in a failed fixture's slot"""
+        try:
+            home_team, away_team = (fixture[0], fixture[1]) if isinstance(fixture, (tuple, list)) \
+                else (fixture['home_team'], fixture['away_team'])
+            match = f"{home_team} vs {away_team}"
+        except Exception:
+            match = str(fixture)
+        print(f"Error predicting {match}: {error}")
+        self.metrics.increment('engine.prediction_errors')
+        return {'match': match, 'error': str(error)}
+
+    @staticmethod
+    def _match_date(value):
+        """'YYYY-MM-DD' of a fixture date (string, date or Timestamp), None when unknown;
+        raises ValueError for text that is not a date"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)) or value == '':
+            return None
+        date = pd.to_datetime(value, errors='coerce')
+        if pd.isna(date):
+            raise ValueError(f"Invalid match date {value!r}")
+        return date.strftime('%Y-%m-%d')
+
+    def _compute_predictions(self, teams, dates=None):
+        """Run every prediction stage for a list of (home, away) pairs"""
+        features = self._gather_features(teams, dates)
+
+        # Calculate predictions for all fixtures at once
+        with self.metrics.timer('engine.result'):
+            result_predictions = self._predict_result(features)
+        with self.metrics.timer('engine.goals'):
+            goals_predictions = self._predict_goals(features)
+        with self.metrics.timer('engine.advanced'):
+            advanced_predictions = self._predict_advanced_stats(features)
+        with self.metrics.timer('engine.confidence'):
+            confidences = self._calculate_confidence(features)
+        with self.metrics.timer('engine.score_model'):
+            score_models = self.goal_model.predict(features['teams'])
+
+        predictions = []
+        for i, (home_team, away_team) in enumerate(features['teams']):
+            predictions.append({
+                'match': f"{home_team} vs {away_team}",
+                'prediction_date': None,  # set by predict_matches on every response
+                'result_prediction': result_predictions[i],
+                'goals_prediction': goals_predictions[i],
+                'advanced_prediction': advanced_predictions[i],
+                'score_model': score_models[i],
+                'factors': {
+                    'home_form': features['home_form'][i],
+                    'away_form': features['away_form'][i],
+                    'head_to_head': features['h2h'][i],
+                    'injury_impact': features['injury_impact'][i],
+                    'transfer_impact': features['transfer_impact'][i],
+                    'elo': {
+                        'home_rating': round(float(features['home_elo'][i]), 1),
+                        'away_rating': round(float(features['away_elo'][i]), 1),
+                        'home_expected_score': round(float(features['elo_expected'][i]), 3)
+                    }
+                },
+                'confidence': confidences[i]
+            })
+
+        return predictions
+
+    def _gather_features(self, teams, dates=None):
+        """Look up every model input per fixture and lay the numeric ones out as arrays"""
+        # Get team statistics, recent form, head-to-head and injury/transfer factors
+        home_stats = [self.team_stats.get(home_team, {}) for home_team, _ in teams]
+        away_stats = [self.team_stats.get(away_team, {}) for _, away_team in teams]
+        with self.metrics.timer('engine.form'):
+            home_form = [self._get_recent_form(home_team) for home_team, _ in teams]
+            away_form = [self._get_recent_form(away_team) for _, away_team in teams]
+        with self.metrics.timer('engine.h2h'):
+            h2h = [self._get_head_to_head(home_team, away_team) for home_team, away_team in teams]
+        with self.metrics.timer('engine.injury'):
+            dates = dates or [None] * len(teams)
+            injury_impact = [self._get_injury_impact(home_team, away_team, match_date)
+                             for (home_team, away_team), match_date in zip(teams, dates)]
+        with self.metrics.timer('engine.transfer'):
+            transfer_impact = [self._get_transfer_impact(home_team, away_team) for home_team, away_team in teams]
+
+        def column(records, key, default=0):
+            return np.array([record.get(key, default) for record in records], dtype=np.float64)
 
         return {
-            'home_wins': home_wins,
-            'away_wins': away_wins,
-            'draws': draws,
-            'total_goals': total_goals,
-            'avg_goals': total_goals / len(recent_h2h) if len(recent_h2h) > 0 else 0,
-            'matches': len(recent_h2h)
+            'teams': teams,
+            'home_form': home_form,
+            'away_form': away_form,
+            'h2h': h2h,
+            'injury_impact': injury_impact,
+            'transfer_impact': transfer_impact,
+            'home_win_rate': column(home_stats, 'home_win_rate'),
+            'away_win_rate': column(away_stats, 'away_win_rate'),
+            'home_goals_per_match': column(home_stats, 'goals_per_match', 1.5),
+            'away_goals_per_match': column(away_stats, 'goals_per_match', 1.5),
+            'home_conceded_per_match': column(home_stats, 'goals_conceded_per_match', 1.5),
+            'away_conceded_per_match': column(away_stats, 'goals_conceded_per_match', 1.5),
+            'home_corners': column(home_stats, 'corners_per_match', 5.5),
+            'away_corners': column(away_stats, 'corners_per_match', 5.5),
+            'home_cards': column(home_stats, 'cards_per_match', 2.2),
+            'away_cards': column(away_stats, 'cards_per_match', 2.2),
+            'home_total_matches': column(home_stats, 'total_matches'),
+            'away_total_matches': column(away_stats, 'total_matches'),
+            'home_strength': column(home_stats, 'win_rate', 0.5),
+            'away_strength': column(away_stats, 'win_rate', 0.5),
+            'home_form_wins': column(home_form, 'wins'),
+            'home_form_losses': column(home_form, 'losses'),
+            'home_form_goals': column(home_form, 'goals_for'),
+            'home_form_matches': column(home_form, 'matches_analyzed'),
+            'away_form_wins': column(away_form, 'wins'),
+            'away_form_losses': column(away_form, 'losses'),
+            'away_form_goals': column(away_form, 'goals_for'),
+            'away_form_matches': column(away_form, 'matches_analyzed'),
+            'h2h_matches': column(h2h, 'matches'),
+            'h2h_home_wins': column(h2h, 'home_wins'),
+            'h2h_away_wins': column(h2h, 'away_wins'),
+            'h2h_avg_goals': column(h2h, 'avg_goals'),
+            'home_injury_impact': column(injury_impact, 'home_impact'),
+            'away_injury_impact': column(injury_impact, 'away_impact'),
+            'home_elo': np.array([self.elo_ratings.rating(home_team) for home_team, _ in teams], dtype=np.float64),
+            'away_elo': np.array([self.elo_ratings.rating(away_team) for _, away_team in teams], dtype=np.float64),
+            'elo_expected': np.array([self.elo_ratings.expected_score(home_team, away_team)
+                                      for home_team, away_team in teams], dtype=np.float64),
+            'home_transfer_impact': column(transfer_impact, 'home_impact'),
+            'away_transfer_impact': column(transfer_impact, 'away_impact')
         }
 
-    def predict_match(self, home_team, away_team):
-        """Generate comprehensive prediction for a match"""
-
-        # Get team statistics
-        home_stats = self.team_stats.get(home_team, {})
-        away_stats = self.team_stats.get(away_team, {})
-
-        # Get recent form
-        home_form = self._get_recent_form(home_team)
-        away_form = self._get_recent_form(away_team)
-
-        # Get head-to-head
-        h2h = self._get_head_to_head(home_team, away_team)
-
-        # Get injury/transfer factors
-        injury_impact = self._get_injury_impact(home_team, away_team)
-        transfer_impact = self._get_transfer_impact(home_team, away_team)
-
-        # Calculate predictions
-        result_prediction = self._predict_result(home_stats, away_stats, home_form, away_form, h2h, injury_impact, transfer_impact)
-        goals_prediction = self._predict_goals(home_stats, away_stats, home_form, away_form, h2h)
-        advanced_prediction = self._predict_advanced_stats(home_stats, away_stats)
-
-        prediction = {
-            'match': f"{home_team} vs {away_team}",
-            'prediction_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'result_prediction': result_prediction,
-            'goals_prediction': goals_prediction,
-            'advanced_prediction': advanced_prediction,
-            'factors': {
-                'home_form': home_form,
-                'away_form': away_form,
-                'head_to_head': h2h,
-                'injury_impact': injury_impact,
-                'transfer_impact': transfer_impact
-            },
-            'confidence': self._calculate_confidence(home_stats, away_stats, h2h)
-        }
+    def _fingerprint(self, df):
+        """Content hash of a frame, used as the version of the loaded match table"""
+        return str(pd.util.hash_pandas_object(df, index=False).sum()) if not df.empty else 'empty'
 
-        return prediction
+    def _input_version(self):
+        """Version of the inputs shared by every fixture: loaded match table, injuries, transfers, weights.
 
-    def _get_injury_impact(self, home_team, away_team):
-        """Get injury impact for both teams"""
+        Ingested results are not part of it: they move the versions of the teams involved only.
+        Neither is the goal model: its scheduled refits clear the cache instead.
+        """
         try:
-            home_injuries = self.injury_scraper.get_team_injuries(home_team)
-            away_injuries = self.injury_scraper.get_team_injuries(away_team)
+            injury_version = self.injury_scraper.get_data_version()
+        except Exception:
+            injury_version = None
+        try:
+            transfer_version = self.transfer_scraper.get_data_version()
+        except Exception:
+            transfer_version = None
+        return (self._base_version, injury_version, transfer_version, self.params['version'])
+
+    def _fixture_version(self, home_team, away_team, input_version):
+        """Data version a cached prediction for this fixture must match"""
+        # Lookups only: unknown team names from request URLs must not add entries
+        return (input_version, self._team_versions.get(home_team), self._team_versions.get(away_team))
+
+    def get_ratings(self):
+        """Current Elo table"""
+        return self.elo_ratings.table()
+
+    def get_cache_stats(self):
+        """Prediction cache hit/miss/eviction counters"""
+        return self.prediction_cache.get_stats()
+
+    def _get_injury_impact(self, home_team, away_team, match_date=None):
+        """Get injury impact for both teams (players still out on match_date when given)"""
+        try:
+            # Precomputed per-team counts from the scraper's snapshot
+            home_injuries = self.injury_scraper.get_team_impact(home_team, as_of=match_date)
+            away_injuries = self.injury_scraper.get_team_impact(away_team, as_of=match_date)
 
-            home_impact = sum(1 for inj in home_injuries if inj.get('status') == 'Out') * 0.1
-            away_impact = sum(1 for inj in away_injuries if inj.get('status') == 'Out') * 0.1
+            home_impact = home_injuries['players_out'] * 0.1
+            away_impact = away_injuries['players_out'] * 0.1
 
-            return {
+            impact = {
                 'home_impact': home_impact,
                 'away_impact': away_impact,
-                'home_injuries': len(home_injuries),
-                'away_injuries': len(away_injuries)
+                'home_injuries': home_injuries['total_injuries'],
+                'away_injuries': away_injuries['total_injuries']
             }
+            if match_date is not None:
+                impact['as_of'] = match_date
+            return impact
         except:
             return {'home_impact': 0, 'away_impact': 0, 'home_injuries': 0, 'away_injuries': 0}
 
     def _get_transfer_impact(self, home_team, away_team):
         """Get transfer impact for both teams"""
         try:
-            strength_changes = self.transfer_scraper.get_team_strength_changes()
-
-            home_impact = strength_changes.get(home_team, {}).get('net_impact', 0) * 0.01
-            away_impact = strength_changes.get(away_team, {}).get('net_impact', 0) * 0.01
+            # O(1) lookups in the scraper's precomputed strength table
+            home_impact = self.transfer_scraper.get_team_strength(home_team)['net_impact'] * 0.01
+            away_impact = self.transfer_scraper.get_team_strength(away_team)['net_impact'] * 0.01
 
             return {
                 'home_impact': home_impact,
@@ -277,167 +490,170 @@ class SerieAPredictionEngine:
         except:
             return {'home_impact': 0, 'away_impact': 0}
 
-    def _predict_result(self, home_stats, away_stats, home_form, away_form, h2h, injury_impact, transfer_impact):
-        """Predict match result (1X2)"""
+    def _predict_result(self, features):
+        """Predict match result (1X2) for every fixture"""
+        home_prob, draw_prob, away_prob = self.result_probabilities(features, self.params['result'])
+
+        # Determine most likely result
+        home_favourite = (home_prob > away_prob) & (home_prob > draw_prob)
+        away_favourite = ~home_favourite & (away_prob > home_prob) & (away_prob > draw_prob)
+        predictions = np.where(home_favourite, '1', np.where(away_favourite, '2', 'X'))
+        confidence = np.where(home_favourite, home_prob, np.where(away_favourite, away_prob, draw_prob))
+
+        return [{
+            'prediction': str(predictions[i]),
+            'probabilities': {
+                '1': round(float(home_prob[i]) * 100, 1),
+                'X': round(float(draw_prob[i]) * 100, 1),
+                '2': round(float(away_prob[i]) * 100, 1)
+            },
+            'confidence': round(float(confidence[i]) * 100, 1)
+        } for i in range(len(predictions))]
+
+    @staticmethod
+    def result_probabilities(features, params):
+        """Home/draw/away probability arrays from the feature arrays and result weights"""
+        n_fixtures = len(features['home_elo'])
 
         # Base probabilities
-        home_prob = 0.45  # Slight home advantage
-        draw_prob = 0.25
-        away_prob = 0.30
+        home_prob = np.full(n_fixtures, float(params['base_home']))  # Slight home advantage
+        draw_prob = np.full(n_fixtures, float(params['base_draw']))
+        away_prob = np.full(n_fixtures, float(params['base_away']))
 
         # Adjust based on historical win rates
-        if home_stats.get('home_win_rate', 0) > 0:
-            home_prob += (home_stats['home_win_rate'] - 0.5) * 0.3
-        if away_stats.get('away_win_rate', 0) > 0:
-            away_prob += (away_stats['away_win_rate'] - 0.3) * 0.3
+        home_win_rate = features['home_win_rate']
+        away_win_rate = features['away_win_rate']
+        home_prob += np.where(home_win_rate > 0, (home_win_rate - params['home_win_rate_center']) * params['win_rate_weight'], 0.0)
+        away_prob += np.where(away_win_rate > 0, (away_win_rate - params['away_win_rate_center']) * params['win_rate_weight'], 0.0)
 
         # Adjust based on recent form (last 5 matches)
-        home_form_factor = (home_form['wins'] - home_form['losses']) * 0.05
-        away_form_factor = (away_form['wins'] - away_form['losses']) * 0.05
-
-        home_prob += home_form_factor
-        away_prob += away_form_factor
+        home_prob += (features['home_form_wins'] - features['home_form_losses']) * params['form_factor']
+        away_prob += (features['away_form_wins'] - features['away_form_losses']) * params['form_factor']
 
         # Adjust based on head-to-head
-        if h2h['matches'] > 0:
-            h2h_factor = 0.1
-            if h2h['home_wins'] > h2h['away_wins']:
-                home_prob += h2h_factor
-            elif h2h['away_wins'] > h2h['home_wins']:
-                away_prob += h2h_factor
+        h2h_factor = params['h2h_factor']
+        has_h2h = features['h2h_matches'] > 0
+        home_prob += np.where(has_h2h & (features['h2h_home_wins'] > features['h2h_away_wins']), h2h_factor, 0.0)
+        away_prob += np.where(has_h2h & (features['h2h_away_wins'] > features['h2h_home_wins']), h2h_factor, 0.0)
+
+        # Adjust based on rating gap (home advantage is already in the base probabilities)
+        elo_factor = params['elo_factor']
+        elo_edge = 1 / (1 + 10 ** ((features['away_elo'] - features['home_elo']) / 400)) - 0.5
+        home_prob += elo_edge * elo_factor
+        away_prob -= elo_edge * elo_factor
 
         # Adjust for injuries and transfers
-        home_prob += transfer_impact['home_impact'] - injury_impact['home_impact']
-        away_prob += transfer_impact['away_impact'] - injury_impact['away_impact']
+        home_prob += features['home_transfer_impact'] - features['home_injury_impact']
+        away_prob += features['away_transfer_impact'] - features['away_injury_impact']
 
         # Normalize probabilities
         total = home_prob + draw_prob + away_prob
-        if total > 0:
-            home_prob /= total
-            away_prob /= total
-            draw_prob /= total
+        positive = total > 0
+        home_prob = np.where(positive, home_prob / np.where(positive, total, 1.0), home_prob)
+        away_prob = np.where(positive, away_prob / np.where(positive, total, 1.0), away_prob)
+        draw_prob = np.where(positive, draw_prob / np.where(positive, total, 1.0), draw_prob)
 
         # Ensure probabilities are within reasonable bounds
-        home_prob = max(0.1, min(0.8, home_prob))
-        away_prob = max(0.1, min(0.8, away_prob))
-        draw_prob = max(0.1, min(0.5, draw_prob))
+        home_prob = np.clip(home_prob, params['min_home'], params['max_home'])
+        away_prob = np.clip(away_prob, params['min_away'], params['max_away'])
+        draw_prob = np.clip(draw_prob, params['min_draw'], params['max_draw'])
 
         # Final normalization
         total = home_prob + draw_prob + away_prob
-        home_prob /= total
-        away_prob /= total
-        draw_prob /= total
-
-        # Determine most likely result
-        if home_prob > away_prob and home_prob > draw_prob:
-            prediction = "1"
-            confidence = home_prob
-        elif away_prob > home_prob and away_prob > draw_prob:
-            prediction = "2"
-            confidence = away_prob
-        else:
-            prediction = "X"
-            confidence = draw_prob
-
-        return {
-            'prediction': prediction,
-            'probabilities': {
-                '1': round(home_prob * 100, 1),
-                'X': round(draw_prob * 100, 1),
-                '2': round(away_prob * 100, 1)
-            },
-            'confidence': round(confidence * 100, 1)
-        }
-
-    def _predict_goals(self, home_stats, away_stats, home_form, away_form, h2h):
-        """Predict goals and over/under markets"""
-
-        # Base goals prediction
-        home_avg = home_stats.get('goals_per_match', 1.5)
-        away_avg = away_stats.get('goals_per_match', 1.5)
-        home_concede = home_stats.get('goals_conceded_per_match', 1.5)
-        away_concede = away_stats.get('goals_conceded_per_match', 1.5)
-
+        return home_prob / total, draw_prob / total, away_prob / total
+
+    def _predict_goals(self, features):
+        """Predict goals and over/under markets for every fixture"""
+        params = self.params['goals']
+        home_expected, away_expected, total_expected = self.expected_goals(features, params)
+
+        # Over/Under lines before clamping (clamped per fixture so bounds stay exact integers)
+        over_2_5_raw = line_percentage(total_expected, params['over_2_5'])
+        over_1_5_raw = line_percentage(total_expected, params['over_1_5'])
+        btts_raw = line_percentage(total_expected, params['btts'])
+
+        goals = []
+        for i in range(len(total_expected)):
+            over_2_5 = clamp_percentage(over_2_5_raw[i], params['over_2_5'])
+            over_1_5 = clamp_percentage(over_1_5_raw[i], params['over_1_5'])
+            goals.append({
+                'total_goals': round(float(total_expected[i]), 1),
+                'home_goals': round(float(home_expected[i]), 1),
+                'away_goals': round(float(away_expected[i]), 1),
+                'over_under': {
+                    'over_1_5': f"{over_1_5}%",
+                    'under_1_5': f"{100-over_1_5}%",
+                    'over_2_5': f"{over_2_5}%",
+                    'under_2_5': f"{100-over_2_5}%"
+                },
+                'both_teams_score': f"{clamp_percentage(btts_raw[i], params['btts'])}%"
+            })
+
+        return goals
+
+    @staticmethod
+    def expected_goals(features, params):
+        """Home, away and total expected goal arrays from the feature arrays and goals weights"""
         # Expected goals
-        home_expected = (home_avg + away_concede) / 2
-        away_expected = (away_avg + home_concede) / 2
-        total_expected = home_expected + away_expected
+        home_expected = (features['home_goals_per_match'] + features['away_conceded_per_match']) / 2
+        away_expected = (features['away_goals_per_match'] + features['home_conceded_per_match']) / 2
 
         # Adjust based on recent form
-        if home_form['matches_analyzed'] > 0:
-            home_form_goals = home_form['goals_for'] / home_form['matches_analyzed']
-            home_expected = (home_expected + home_form_goals) / 2
-
-        if away_form['matches_analyzed'] > 0:
-            away_form_goals = away_form['goals_for'] / away_form['matches_analyzed']
-            away_expected = (away_expected + away_form_goals) / 2
+        form_weight = params['form_weight']
+        home_played = features['home_form_matches']
+        away_played = features['away_form_matches']
+        home_form_goals = features['home_form_goals'] / np.where(home_played > 0, home_played, 1.0)
+        away_form_goals = features['away_form_goals'] / np.where(away_played > 0, away_played, 1.0)
+        home_expected = np.where(home_played > 0, (1 - form_weight) * home_expected + form_weight * home_form_goals, home_expected)
+        away_expected = np.where(away_played > 0, (1 - form_weight) * away_expected + form_weight * away_form_goals, away_expected)
 
         total_expected = home_expected + away_expected
 
         # Adjust based on H2H
-        if h2h['matches'] > 0 and h2h['avg_goals'] > 0:
-            total_expected = (total_expected + h2h['avg_goals']) / 2
+        h2h_weight = params['h2h_weight']
+        h2h_avg = features['h2h_avg_goals']
+        total_expected = np.where((features['h2h_matches'] > 0) & (h2h_avg > 0),
+                                  (1 - h2h_weight) * total_expected + h2h_weight * h2h_avg, total_expected)
 
-        # Over/Under predictions
-        over_2_5 = min(85, max(15, 50 + (total_expected - 2.5) * 20))
-        over_1_5 = min(90, max(30, 60 + (total_expected - 1.5) * 25))
+        return home_expected, away_expected, total_expected
 
-        return {
-            'total_goals': round(total_expected, 1),
-            'home_goals': round(home_expected, 1),
-            'away_goals': round(away_expected, 1),
-            'over_under': {
-                'over_1_5': f"{over_1_5}%",
-                'under_1_5': f"{100-over_1_5}%",
-                'over_2_5': f"{over_2_5}%",
-                'under_2_5': f"{100-over_2_5}%"
-            },
-            'both_teams_score': f"{min(75, max(25, 40 + (total_expected - 2) * 15))}%"
-        }
-
-    def _predict_advanced_stats(self, home_stats, away_stats):
-        """Predict corners, cards, and other advanced statistics"""
+    def _predict_advanced_stats(self, features):
+        """Predict corners, cards, and other advanced statistics for every fixture"""
+        params = self.params['advanced']
 
-        home_corners = home_stats.get('corners_per_match', 5.5)
-        away_corners = away_stats.get('corners_per_match', 5.5)
-        total_corners = home_corners + away_corners
+        total_corners = features['home_corners'] + features['away_corners']
+        total_cards = features['home_cards'] + features['away_cards']
 
-        home_cards = home_stats.get('cards_per_match', 2.2)
-        away_cards = away_stats.get('cards_per_match', 2.2)
-        total_cards = home_cards + away_cards
+        over_9_5_corners = line_percentage(total_corners, params['corners_over_9_5'])
+        over_10_5_corners = line_percentage(total_corners, params['corners_over_10_5'])
+        over_3_5_cards = line_percentage(total_cards, params['cards_over_3_5'])
+        over_4_5_cards = line_percentage(total_cards, params['cards_over_4_5'])
 
-        return {
+        return [{
             'corners': {
-                'total': round(total_corners, 1),
-                'home': round(home_corners, 1),
-                'away': round(away_corners, 1),
-                'over_9_5': f"{min(80, max(20, 50 + (total_corners - 9.5) * 10))}%",
-                'over_10_5': f"{min(75, max(15, 45 + (total_corners - 10.5) * 10))}%"
+                'total': round(float(total_corners[i]), 1),
+                'home': round(float(features['home_corners'][i]), 1),
+                'away': round(float(features['away_corners'][i]), 1),
+                'over_9_5': f"{clamp_percentage(over_9_5_corners[i], params['corners_over_9_5'])}%",
+                'over_10_5': f"{clamp_percentage(over_10_5_corners[i], params['corners_over_10_5'])}%"
             },
             'cards': {
-                'total': round(total_cards, 1),
-                'over_3_5': f"{min(70, max(30, 50 + (total_cards - 3.5) * 8))}%",
-                'over_4_5': f"{min(60, max(20, 40 + (total_cards - 4.5) * 8))}%"
+                'total': round(float(total_cards[i]), 1),
+                'over_3_5': f"{clamp_percentage(over_3_5_cards[i], params['cards_over_3_5'])}%",
+                'over_4_5': f"{clamp_percentage(over_4_5_cards[i], params['cards_over_4_5'])}%"
             }
-        }
+        } for i in range(len(total_corners))]
 
-    def _calculate_confidence(self, home_stats, away_stats, h2h):
+    def _calculate_confidence(self, features):
         """Calculate prediction confidence based on available data"""
-        confidence = 60  # Base confidence
+        confidence = np.full(len(features['teams']), 60)  # Base confidence
 
         # More data = higher confidence
-        if home_stats.get('total_matches', 0) > 15:
-            confidence += 10
-        if away_stats.get('total_matches', 0) > 15:
-            confidence += 10
-        if h2h['matches'] > 3:
-            confidence += 10
+        confidence += np.where(features['home_total_matches'] > 15, 10, 0)
+        confidence += np.where(features['away_total_matches'] > 15, 10, 0)
+        confidence += np.where(features['h2h_matches'] > 3, 10, 0)
 
         # Clear favorite increases confidence
-        home_strength = home_stats.get('win_rate', 0.5)
-        away_strength = away_stats.get('win_rate', 0.5)
-
-        if abs(home_strength - away_strength) > 0.2:
-            confidence += 10
+        confidence += np.where(np.abs(features['home_strength'] - features['away_strength']) > 0.2, 10, 0)
 
-        return min(95, confidence)
\ No newline at end of file
+        return [int(value) for value in np.minimum(95, confidence)]
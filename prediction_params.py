@@ -0,0 +1,104 @@
+import os
+import copy
+import json
+import threading
+
+PARAMS_FORMAT = 1
+DEFAULT_PARAMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prediction_params.json')
+
+# Hand-set weights of the heuristic result, goals and advanced-stats predictors
+DEFAULT_PARAMS = {
+    'format': PARAMS_FORMAT,
+    'version': 'default',
+    'result': {
+        'base_home': 0.45,
+        'base_draw': 0.25,
+        'base_away': 0.30,
+        'home_win_rate_center': 0.5,
+        'away_win_rate_center': 0.3,
+        'win_rate_weight': 0.3,
+        'form_factor': 0.05,
+        'h2h_factor': 0.1,
+        'elo_factor': 0.2,
+        'min_home': 0.1,
+        'max_home': 0.8,
+        'min_draw': 0.1,
+        'max_draw': 0.5,
+        'min_away': 0.1,
+        'max_away': 0.8
+    },
+    'goals': {
+        'form_weight': 0.5,
+        'h2h_weight': 0.5,
+        # Percentage lines: base + (total - line) * slope, clamped to [min, max]
+        'over_1_5': {'line': 1.5, 'base': 60, 'slope': 25, 'min': 30, 'max': 90},
+        'over_2_5': {'line': 2.5, 'base': 50, 'slope': 20, 'min': 15, 'max': 85},
+        'btts': {'line': 2, 'base': 40, 'slope': 15, 'min': 25, 'max': 75}
+    },
+    'advanced': {
+        'corners_over_9_5': {'line': 9.5, 'base': 50, 'slope': 10, 'min': 20, 'max': 80},
+        'corners_over_10_5': {'line': 10.5, 'base': 45, 'slope': 10, 'min': 15, 'max': 75},
+        'cards_over_3_5': {'line': 3.5, 'base': 50, 'slope': 8, 'min': 30, 'max': 70},
+        'cards_over_4_5': {'line': 4.5, 'base': 40, 'slope': 8, 'min': 20, 'max': 60}
+    }
+}
+
+GROUPS = ('result', 'goals', 'advanced')
+
+
+def load_params(path=None):
+    """Prediction weights from the versioned parameter file, falling back to the defaults.
+
+    Keys missing from the file keep their default value, so older files stay loadable.
+    """
+    path = path or os.environ.get('SERIE_A_PARAMS_PATH', DEFAULT_PARAMS_PATH)
+    params = copy.deepcopy(DEFAULT_PARAMS)
+
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return params
+    except (OSError, ValueError) as e:
+        print(f"Could not read prediction parameters from {path}: {e}")
+        return params
+
+    if stored.get('format') != PARAMS_FORMAT:
+        print(f"Ignoring prediction parameters in {path}: unsupported format {stored.get('format')}")
+        return params
+
+    for group in GROUPS:
+        for key, value in stored.get(group, {}).items():
+            if isinstance(params[group].get(key), dict) and isinstance(value, dict):
+                params[group][key].update(value)
+            else:
+                params[group][key] = value
+    params['version'] = stored.get('version', 'unversioned')
+    if 'calibration' in stored:
+        params['calibration'] = stored['calibration']
+
+    print(f"Loaded prediction parameters {params['version']} from {path}")
+    return params
+
+
+def save_params(params, path=None):
+    """Write a parameter set atomically"""
+    path = path or os.environ.get('SERIE_A_PARAMS_PATH', DEFAULT_PARAMS_PATH)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({**params, 'format': PARAMS_FORMAT}, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def line_percentage(total, spec):
+    """Raw (unclamped) percentage for an over/under-style line"""
+    return spec['base'] + (total - spec['line']) * spec['slope']
+
+
+def clamp_percentage(value, spec):
+    """Clamp one fixture's percentage; bounds keep their own type, e.g. exact integers"""
+    return min(spec['max'], max(spec['min'], float(value)))
@@ -0,0 +1,143 @@
+import os
+import json
+import tempfile
+import threading
+import time
+import pandas as pd
+
+
+class SeasonCache:
+    def __init__(self, cache_dir=None):
+        # Vercel only allows writes under /tmp, so default there unless overridden
+        self.cache_dir = cache_dir or os.environ.get(
+            'SERIE_A_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'serie_a_cache', 'seasons')
+        )
+        # Private to this user: the default sits under the shared, world-writable temp dir
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+        # In-process copy of each season, keyed by the data file mtime
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _data_path(self, season):
+        # Plain CSV, never pickle: loading a cache file must not be able to run code
+        return os.path.join(self.cache_dir, f"{season}.csv")
+
+    def _meta_path(self, season):
+        return os.path.join(self.cache_dir, f"{season}.json")
+
+    def get(self, season):
+        """Return (DataFrame, metadata) for a cached season, or None if not stored"""
+        data_path = self._data_path(season)
+        meta = self.get_metadata(season)
+        if meta is None or not os.path.exists(data_path):
+            return None
+
+        try:
+            mtime = os.path.getmtime(data_path)
+            with self._lock:
+                memo = self._memory.get(season)
+            if memo is None or memo[0] != mtime:
+                df = self._read_csv(data_path, meta.get('dtypes', {}))
+                with self._lock:
+                    self._memory[season] = (mtime, df)
+            else:
+                df = memo[1]
+        except Exception as e:
+            print(f"Season cache read failed for {season}: {e}")
+            return None
+
+        # Callers add columns (e.g. 'Season') to what they get back
+        return df.copy(), meta
+
+    def get_metadata(self, season):
+        """Return the stored metadata for a season, or None"""
+        try:
+            with open(self._meta_path(season)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, season, df, complete, source=None, etag=None, last_modified=None, degraded=False):
+        """Store a season's matches with metadata used for revalidation.
+
+        degraded marks data served by a fallback source; it is revalidated like a live season
+        even when the season is complete.
+        """
+        meta = {
+            'season': season,
+            'source': source,
+            'rows': len(df),
+            'complete': complete,
+            'degraded': degraded,
+            'dtypes': {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+            'fetched_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified
+        }
+
+        try:
+            self._write_atomic(self._data_path(season), lambda path: df.to_csv(path, index=False))
+            self._write_atomic(self._meta_path(season), lambda path: self._dump_json(meta, path))
+            with self._lock:
+                self._memory.pop(season, None)
+        except Exception as e:
+            print(f"Season cache write failed for {season}: {e}")
+
+        return meta
+
+    def touch(self, season):
+        """Mark a cached season as revalidated now (upstream answered 304)"""
+        meta = self.get_metadata(season)
+        if meta is None:
+            return None
+
+        meta['fetched_at'] = time.time()
+        try:
+            self._write_atomic(self._meta_path(season), lambda path: self._dump_json(meta, path))
+        except Exception as e:
+            print(f"Season cache touch failed for {season}: {e}")
+        return meta
+
+    def is_fresh(self, meta, ttl):
+        """Completed seasons never expire; live and degraded ones expire after ttl seconds"""
+        if meta.get('complete') and not meta.get('degraded'):
+            return True
+        return time.time() - meta.get('fetched_at', 0) < ttl
+
+    def invalidate(self, season):
+        """Drop a season from the cache"""
+        for path in (self._data_path(season), self._meta_path(season)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._memory.pop(season, None)
+
+    def _read_csv(self, path, dtypes):
+        # Restore the stored dtypes; only empty fields are missing values (a team called 'NA' stays)
+        numeric = {col: dtype for col, dtype in dtypes.items() if dtype.startswith(('float', 'int'))}
+        df = pd.read_csv(path, dtype={col: object for col in dtypes if col not in numeric},
+                         keep_default_na=False, na_values=[''])
+        for col, dtype in numeric.items():
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+        return df
+
+    def _dump_json(self, meta, path):
+        with open(path, 'w') as f:
+            json.dump(meta, f)
+
+    def _write_atomic(self, path, writer):
+        # Write to a temp file then rename, so concurrent readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
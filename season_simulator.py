@@ -0,0 +1,214 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from team_stats import build_team_table
+
+# Final-table zones of Serie A
+CHAMPIONS_LEAGUE_SPOTS = 4
+EUROPE_SPOTS = 6
+RELEGATION_SPOTS = 3
+
+# Upper bound on simulations per run, whatever the caller asks for
+MAX_SIMULATIONS = int(os.environ.get('SERIE_A_MAX_SIMULATIONS', 100000))
+
+
+def simulate_chunk(seed_sequence, n_simulations, base_points, base_goal_difference,
+                   home_index, away_index, probabilities):
+    """Simulate n_simulations completions of the season; returns (position counts, points sum).
+
+    position counts[t, p] is how often team t finished in position p (0 = first).
+    """
+    rng = np.random.default_rng(seed_sequence)
+    n_teams = len(base_points)
+    n_fixtures = len(home_index)
+
+    # Fixture-to-team incidence matrices turn per-fixture points into per-team totals with one matmul
+    home_incidence = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_incidence = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_incidence[np.arange(n_fixtures), home_index] = 1
+    away_incidence[np.arange(n_fixtures), away_index] = 1
+
+    home_threshold = probabilities[:, 0].astype(np.float32)
+    draw_threshold = (probabilities[:, 0] + probabilities[:, 1]).astype(np.float32)
+
+    draws = rng.random((n_simulations, n_fixtures), dtype=np.float32)
+    home_win = draws < home_threshold
+    draw = ~home_win & (draws < draw_threshold)
+    home_points = 3 * home_win + draw
+    away_points = 3 * (~home_win & ~draw) + draw
+    points = base_points + home_points.astype(np.float32) @ home_incidence + away_points.astype(np.float32) @ away_incidence
+
+    # Order by points, then current goal difference, then a random tie-break
+    tie_break = rng.random((n_simulations, n_teams))
+    order = np.lexsort((tie_break, np.broadcast_to(base_goal_difference, points.shape), points))[:, ::-1]
+    positions = np.empty_like(order)
+    positions[np.arange(n_simulations)[:, np.newaxis], order] = np.arange(n_teams)
+
+    counts = np.bincount((np.arange(n_teams) * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+    return counts.reshape(n_teams, n_teams), points.sum(axis=0, dtype=np.float64)
+
+
+class SeasonSimulator:
+    """Monte Carlo simulation of the rest of the current season.
+
+    Outcome probabilities come from the prediction engine; simulations run in fixed-size
+    chunks, each with its own child of one SeedSequence, so a given seed gives the same
+    result whether the chunks run inline or across a process pool. One pool is created on
+    first use and shared by every run, so requests queue on a fixed number of workers.
+    """
+
+    def __init__(self, prediction_engine, fixtures_fetcher, chunk_size=10000, workers=None, data_fetcher=None):
+        self.prediction_engine = prediction_engine
+        self.fixtures_fetcher = fixtures_fetcher
+        self.data_fetcher = data_fetcher
+        self.chunk_size = chunk_size
+        self.workers = workers or int(os.environ.get('SERIE_A_SIMULATION_WORKERS', os.cpu_count() or 1))
+        self._results = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _season_matches(self):
+        """Current season from the data fetcher's season cache when available (revalidated per its
+        live TTL), otherwise straight from the fixtures source"""
+        if self.data_fetcher is None:
+            return self.fixtures_fetcher.get_season_matches()
+
+        season_matches = self.data_fetcher.fetch_season_data(self.data_fetcher.current_season)
+        if season_matches.attrs.get('source') == 'dummy' or 'HomeTeam' not in season_matches.columns:
+            return season_matches.iloc[0:0]
+        return season_matches
+
+    def run(self, n_simulations=100000, seed=None):
+        """Simulate the remaining fixtures and summarize final positions per team"""
+        n_simulations = max(1, min(int(n_simulations), MAX_SIMULATIONS))
+        season_matches = self._season_matches()
+        if season_matches.empty:
+            return {'error': 'No current season data available'}
+        fixtures = self.fixtures_fetcher.get_remaining_fixtures(season_matches)
+
+        # Current table from the matches already played
+        table = build_team_table(season_matches)
+        teams = sorted(set(table.index) | {team for fixture in fixtures
+                                           for team in (fixture['home_team'], fixture['away_team'])})
+        if not teams:
+            return {'error': 'No current season data available'}
+
+        table = table.reindex(teams).fillna(0)
+        base_points = (3 * table['wins'] + table['draws']).to_numpy().astype(np.float32)
+        base_goal_difference = table['goal_difference'].to_numpy().astype(np.float32)
+
+        probabilities, fallback_fixtures = self._result_probabilities(fixtures)
+        probabilities /= np.where(probabilities.sum(axis=1, keepdims=True) > 0,
+                                  probabilities.sum(axis=1, keepdims=True), 1.0)
+
+        # Same seed and same inputs always give the same answer, so reuse the last run
+        key = (n_simulations, seed, tuple(teams), base_points.tobytes(), probabilities.tobytes())
+        with self._lock:
+            if seed is not None and key in self._results:
+                return self._results[key]
+
+        team_position = {team: i for i, team in enumerate(teams)}
+        home_index = np.array([team_position[fixture['home_team']] for fixture in fixtures], dtype=np.int64)
+        away_index = np.array([team_position[fixture['away_team']] for fixture in fixtures], dtype=np.int64)
+
+        counts, points_sum = self._simulate(n_simulations, seed, base_points, base_goal_difference,
+                                            home_index, away_index, probabilities)
+        result = self._summarize(teams, counts, points_sum, n_simulations, len(fixtures), seed)
+        result['fallback_fixtures'] = fallback_fixtures
+
+        if seed is not None:
+            with self._lock:
+                self._results = {key: result}
+        return result
+
+    def _result_probabilities(self, fixtures):
+        """(1, X, 2) weights per fixture, plus the fixtures whose prediction failed; those are
+        simulated with the engine's base result probabilities instead"""
+        base = self.prediction_engine.params['result']
+        base = [base['base_home'], base['base_draw'], base['base_away']]
+
+        rows, fallback_fixtures = [], []
+        for prediction in self.prediction_engine.predict_matches(fixtures):
+            if 'error' in prediction:
+                rows.append(base)
+                fallback_fixtures.append({'match': prediction['match'], 'error': prediction['error']})
+            else:
+                rows.append([prediction['result_prediction']['probabilities'][key] for key in ('1', 'X', '2')])
+        return np.array(rows, dtype=np.float64).reshape(-1, 3), fallback_fixtures
+
+    def _simulate(self, n_simulations, seed, *arrays):
+        """Run every chunk, across a process pool when there is more than one chunk and worker"""
+        sizes = [min(self.chunk_size, n_simulations - start) for start in range(0, n_simulations, self.chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        chunks = None
+        pool = self._get_pool() if len(sizes) > 1 else None
+        if pool is not None:
+            try:
+                chunks = list(pool.map(simulate_chunk, seeds, sizes, *[[array] * len(sizes) for array in arrays]))
+            except Exception as e:
+                print(f"Process pool failed, simulating inline: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_pool(pool)
+        if chunks is None:
+            chunks = [simulate_chunk(child, size, *arrays) for child, size in zip(seeds, sizes)]
+
+        return sum(chunk[0] for chunk in chunks), sum(chunk[1] for chunk in chunks)
+
+    def _get_pool(self):
+        """The shared worker pool, created on first use; None when running inline"""
+        if self.workers <= 1:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                except Exception as e:
+                    print(f"Process pool unavailable, simulating inline: {e}")
+                    self.workers = 1
+                    return None
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next run starts a fresh one"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the worker pool (it is also stopped at interpreter exit)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _summarize(self, teams, counts, points_sum, n_simulations, n_fixtures, seed):
+        """Position distribution and zone odds per team, best expected finish first"""
+        n_teams = len(teams)
+        distribution = counts / n_simulations
+        expected_position = distribution @ np.arange(1, n_teams + 1)
+
+        standings = []
+        for i in np.argsort(expected_position, kind='stable'):
+            standings.append({
+                'team': teams[i],
+                'expected_points': round(float(points_sum[i]) / n_simulations, 1),
+                'expected_position': round(float(expected_position[i]), 2),
+                'title': round(float(distribution[i, 0]) * 100, 2),
+                'champions_league': round(float(distribution[i, :CHAMPIONS_LEAGUE_SPOTS].sum()) * 100, 2),
+                'europe': round(float(distribution[i, :EUROPE_SPOTS].sum()) * 100, 2),
+                'relegation': round(float(distribution[i, max(0, n_teams - RELEGATION_SPOTS):].sum()) * 100, 2),
+                'positions': [round(float(probability) * 100, 2) for probability in distribution[i]]
+            })
+
+        return {
+            'simulations': n_simulations,
+            'remaining_fixtures': n_fixtures,
+            'seed': seed,
+            'standings': standings
+        }
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from match_schema import CANONICAL_COLUMNS, STAT_COLUMNS, compute_results
+
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+INJURIES = ['Hamstring Strain', 'Ankle Sprain', 'Knee Ligament', 'Muscle Fatigue', 'Thigh Strain',
+            'Calf Injury', 'Groin Strain', 'Concussion', 'Minor Knock', 'Load Management']
+TRANSFER_TYPES = ['Permanent', 'Loan', 'Loan with option', 'Free Transfer']
+
+
+class SyntheticLeague:
+    """Seeded generator of realistic league data in the schemas the fetchers and scrapers return.
+
+    Each team gets a persistent attack/defence strength that drifts between seasons; every
+    season is a double round robin with weekend matchdays, and goals, shots, corners and cards
+    are drawn around those strengths with a home advantage. The same seed always produces the
+    same data, so it can back offline benchmarks and load tests at any scale.
+    """
+
+    def __init__(self, n_teams=20, n_seasons=2, n_leagues=1, seed=0, first_season=2023):
+        if n_teams < 2:
+            raise ValueError("A league needs at least two teams")
+
+        self.n_teams = n_teams
+        self.n_seasons = n_seasons
+        self.n_leagues = n_leagues
+        self.seed = seed
+        self.first_season = first_season
+        self.seasons = [f"{year}-{(year + 1) % 100:02d}" for year in range(first_season, first_season + n_seasons)]
+
+        rng = np.random.default_rng(seed)
+        self.leagues = [f"L{league + 1}" for league in range(n_leagues)]
+        self.teams = {league: [f"{league} Team {i + 1:02d}" for i in range(n_teams)] for league in self.leagues}
+        self._attack = {league: rng.normal(0, 0.25, n_teams) for league in self.leagues}
+        self._defence = {league: rng.normal(0, 0.2, n_teams) for league in self.leagues}
+
+    def all_teams(self):
+        return [team for league in self.leagues for team in self.teams[league]]
+
+    def _schedule(self, rng):
+        """Double round robin (circle method): list of matchdays of (home, away) team indices"""
+        slots = list(range(self.n_teams)) + ([None] if self.n_teams % 2 else [])
+        order = list(rng.permutation(len(slots)))
+        slots = [slots[i] for i in order]
+
+        first_half = []
+        for round_index in range(len(slots) - 1):
+            pairs = []
+            for i in range(len(slots) // 2):
+                home, away = slots[i], slots[-1 - i]
+                if home is None or away is None:
+                    continue
+                pairs.append((home, away) if (round_index + i) % 2 == 0 else (away, home))
+            first_half.append(pairs)
+            slots = [slots[0]] + [slots[-1]] + slots[1:-1]
+
+        return first_half + [[(away, home) for home, away in matchday] for matchday in first_half]
+
+    def season_matches(self, season, league=None, played_until=None):
+        """One season in the fetcher's canonical schema; matches after played_until have no result"""
+        league = league or self.leagues[0]
+        season_index = self.seasons.index(season)
+        league_index = self.leagues.index(league)
+        rng = np.random.default_rng([self.seed, 1, league_index, season_index])
+
+        # Strengths drift a little every season
+        drift = np.random.default_rng([self.seed, 2, league_index])
+        attack = self._attack[league] + drift.normal(0, 0.08, (len(self.seasons), self.n_teams))[:season_index + 1].sum(axis=0)
+        defence = self._defence[league] + drift.normal(0, 0.06, (len(self.seasons), self.n_teams))[:season_index + 1].sum(axis=0)
+
+        schedule = self._schedule(rng)
+        start = datetime(self.first_season + season_index, 8, 20)
+        start += timedelta(days=(5 - start.weekday()) % 7)  # First Saturday
+
+        home_index, away_index, dates, matchdays = [], [], [], []
+        for matchday, pairs in enumerate(schedule):
+            weekend = start + timedelta(weeks=matchday)
+            for slot, (home, away) in enumerate(pairs):
+                home_index.append(home)
+                away_index.append(away)
+                dates.append(weekend + timedelta(days=min(slot * 3 // max(len(pairs), 1), 2)))
+                matchdays.append(matchday + 1)
+
+        home_index = np.array(home_index, dtype=np.int64)
+        away_index = np.array(away_index, dtype=np.int64)
+        n_matches = len(home_index)
+
+        home_rate = np.exp(0.35 + attack[home_index] - defence[away_index])
+        away_rate = np.exp(0.1 + attack[away_index] - defence[home_index])
+        home_goals = rng.poisson(home_rate)
+        away_goals = rng.poisson(away_rate)
+
+        stats = {
+            'HTHG': rng.binomial(home_goals, 0.45),
+            'HTAG': rng.binomial(away_goals, 0.45),
+            'HS': home_goals + rng.poisson(9 * home_rate),
+            'AS': away_goals + rng.poisson(9 * away_rate),
+            'HC': rng.poisson(3.5 + 1.5 * home_rate),
+            'AC': rng.poisson(3.0 + 1.5 * away_rate),
+            'HF': rng.poisson(12.5, n_matches),
+            'AF': rng.poisson(13.0, n_matches),
+            'HY': rng.poisson(1.9, n_matches),
+            'AY': rng.poisson(2.2, n_matches),
+            'HR': rng.poisson(0.07, n_matches),
+            'AR': rng.poisson(0.09, n_matches)
+        }
+        stats['HST'] = home_goals + rng.binomial(stats['HS'] - home_goals, 0.3)
+        stats['AST'] = away_goals + rng.binomial(stats['AS'] - away_goals, 0.3)
+
+        teams = np.array(self.teams[league], dtype=object)
+        df = pd.DataFrame({
+            'Date': [date.strftime('%Y-%m-%d') for date in dates],
+            'HomeTeam': teams[home_index],
+            'AwayTeam': teams[away_index],
+            'FTHG': home_goals.astype('float64'),
+            'FTAG': away_goals.astype('float64')
+        })
+        for col in ['HTHG', 'HTAG'] + STAT_COLUMNS:
+            df[col] = stats[col].astype('float64')
+
+        if played_until is not None:
+            unplayed = pd.to_datetime(df['Date']) > pd.Timestamp(played_until)
+            df.loc[unplayed, ['FTHG', 'FTAG', 'HTHG', 'HTAG'] + STAT_COLUMNS] = np.nan
+
+        df['FTR'] = compute_results(df['FTHG'], df['FTAG'])
+        df['Matchday'] = matchdays
+        df = df.sort_values('Date', kind='mergesort').reset_index(drop=True)
+        return df[CANONICAL_COLUMNS + STAT_COLUMNS + ['Matchday']]
+
+    def matches(self, leagues=None):
+        """Every season of the given leagues (default all) with a Season column, like get_multiple_seasons_data"""
+        frames = []
+        for league in leagues or self.leagues:
+            for season in self.seasons:
+                season_df = self.season_matches(season, league).drop(columns=['Matchday'])
+                season_df['Season'] = season
+                frames.append(season_df)
+        return pd.concat(frames, ignore_index=True)
+
+    def openfootball_fixtures(self, season=None, league=None, played_until=None):
+        """OpenFootball-style JSON (dict) for one season; matches after played_until have no score"""
+        season = season or self.seasons[-1]
+        league = league or self.leagues[0]
+        season_df = self.season_matches(season, league, played_until=played_until)
+
+        matches = []
+        for row in season_df.itertuples(index=False):
+            match = {
+                'round': f"Matchday {row.Matchday}",
+                'matchday': int(row.Matchday),
+                'date': row.Date,
+                'time': '20:45' if row.Matchday % 2 else '18:00',
+                'team1': row.HomeTeam,
+                'team2': row.AwayTeam
+            }
+            if not np.isnan(row.FTHG):
+                match['score1'] = int(row.FTHG)
+                match['score2'] = int(row.FTAG)
+            matches.append(match)
+
+        return {'name': f"{league} {season.replace('-', '/')}", 'matches': matches}
+
+    def injuries(self, n_records=None, as_of=None):
+        """Injury records in the InjuryDataScraper schema, about two per team by default"""
+        teams = self.all_teams()
+        n_records = n_records if n_records is not None else 2 * len(teams)
+        rng = np.random.default_rng([self.seed, 3])
+        as_of = pd.Timestamp(as_of or datetime.now().date())
+
+        days_out = rng.choice([0, 3, 7, 14, 21, 30, 60, 120], n_records, p=[0.15, 0.2, 0.2, 0.15, 0.1, 0.1, 0.06, 0.04])
+        status = np.where(days_out == 0, 'Available', np.where(days_out <= 7, 'Doubtful', 'Out'))
+        severity = np.where(days_out <= 7, 'Low', np.where(days_out <= 30, 'Medium', 'High'))
+        expected_return = as_of + pd.to_timedelta(rng.integers(0, days_out + 1), unit='D')
+
+        return pd.DataFrame({
+            'team': rng.choice(teams, n_records),
+            'player': [f"Player {i + 1:05d}" for i in range(n_records)],
+            'position': rng.choice(POSITIONS, n_records, p=[0.1, 0.35, 0.35, 0.2]),
+            'injury': np.where(days_out == 0, 'Load Management', rng.choice(INJURIES, n_records)),
+            'status': status,
+            'expected_return': expected_return.strftime('%Y-%m-%d'),
+            'days_out': days_out.astype(int),
+            'severity': severity,
+            'impact_rating': np.round(rng.uniform(0.5, 9.5, n_records), 1)
+        })
+
+    def transfers(self, n_records=None, window_end=None):
+        """Transfer records in the TransferDataScraper schema (fees as '€30M'-style strings)"""
+        teams = self.all_teams()
+        n_records = n_records if n_records is not None else 3 * len(teams)
+        rng = np.random.default_rng([self.seed, 4])
+        window_end = pd.Timestamp(window_end or datetime.now().date())
+
+        from_index = rng.integers(0, len(teams), n_records)
+        to_index = (from_index + rng.integers(1, len(teams), n_records)) % len(teams)
+        transfer_type = rng.choice(TRANSFER_TYPES, n_records, p=[0.55, 0.2, 0.1, 0.15])
+        fee = np.round(rng.lognormal(2.3, 0.8, n_records)).astype(int)
+        option = np.round(fee * rng.uniform(1.0, 2.5, n_records)).astype(int)
+        market_value = np.maximum(1, np.round(fee * rng.uniform(0.6, 1.4, n_records))).astype(int)
+        age = rng.integers(18, 35, n_records)
+
+        fees = np.where(transfer_type == 'Permanent', [f"€{value}M" for value in fee],
+               np.where(transfer_type == 'Loan', '€0 (Loan)',
+               np.where(transfer_type == 'Loan with option',
+                        [f"€{max(1, value // 4)}M loan + €{extra}M option" for value, extra in zip(fee, option)], '€0')))
+        contract = np.where(transfer_type == 'Loan', '1 year loan',
+                   np.where(transfer_type == 'Loan with option', '1+4 years',
+                            [f"{years} years" for years in rng.integers(2, 6, n_records)]))
+
+        return pd.DataFrame({
+            'player': [f"Signing {i + 1:05d}" for i in range(n_records)],
+            'from_team': np.array(teams, dtype=object)[from_index],
+            'to_team': np.array(teams, dtype=object)[to_index],
+            'transfer_type': transfer_type,
+            'fee': fees,
+            'date': (window_end - pd.to_timedelta(rng.integers(0, 90, n_records), unit='D')).strftime('%Y-%m-%d'),
+            'position': rng.choice(POSITIONS, n_records, p=[0.08, 0.32, 0.35, 0.25]),
+            'age': age.astype(int),
+            'contract_length': contract,
+            'market_value': [f"€{value}M" for value in market_value],
+            'impact_rating': np.round(np.clip(rng.normal(6.5, 1.2, n_records), 3.0, 9.8), 1)
+        })
+
+
+if __name__ == "__main__":
+    league = SyntheticLeague(n_teams=20, n_seasons=3, seed=42)
+    history = league.matches()
+    print(f"Generated {len(history)} matches for {len(league.all_teams())} teams over {league.seasons}")
+    print(history.head())
+    print(f"Home wins: {(history['FTR'] == 'H').mean():.1%}, draws: {(history['FTR'] == 'D').mean():.1%}, "
+          f"goals per match: {(history['FTHG'] + history['FTAG']).mean():.2f}")
+    print(league.injuries().head())
+    print(league.transfers().head())
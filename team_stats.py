@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+TEAM_TABLE_COLUMNS = [
+    'total_matches', 'wins', 'draws', 'losses',
+    'goals_for', 'goals_against', 'goal_difference',
+    'goals_per_match', 'goals_conceded_per_match',
+    'win_rate', 'home_win_rate', 'away_win_rate',
+    'corners_per_match', 'cards_per_match',
+    'home_matches', 'away_matches', 'home_wins', 'away_wins', 'home_draws', 'away_draws',
+    'home_goals_for', 'away_goals_for', 'home_goals_against', 'away_goals_against',
+    'corners_for', 'corners_against', 'cards'
+]
+
+SIDE_COLUMNS = ['matches', 'wins', 'draws', 'goals_for', 'goals_against', 'corners_for', 'corners_against', 'cards']
+
+
+def build_team_table(df):
+    """Per-team home, away and overall statistics in one vectorized pass over the matches.
+
+    Works on the engine's compact match table and on raw fetched seasons alike; matches
+    without a result (not played yet) are ignored.
+    """
+    if df.empty or 'HomeTeam' not in df.columns or 'AwayTeam' not in df.columns:
+        return pd.DataFrame(columns=TEAM_TABLE_COLUMNS)
+
+    if 'FTR' in df.columns:
+        df = df[df['FTR'].notna()]
+
+    home = _side_totals(df, 'HomeTeam', 'H', 'FTHG', 'FTAG', 'HC', 'AC', 'HY', 'HR')
+    away = _side_totals(df, 'AwayTeam', 'A', 'FTAG', 'FTHG', 'AC', 'HC', 'AY', 'AR')
+    totals = home.add_prefix('home_').join(away.add_prefix('away_'), how='outer').fillna(0)
+
+    table = pd.DataFrame(index=totals.index)
+    table.index.name = 'team'
+
+    for col in ['matches', 'wins', 'draws', 'goals_for', 'goals_against']:
+        table[f'home_{col}'] = totals[f'home_{col}'].astype('int64')
+        table[f'away_{col}'] = totals[f'away_{col}'].astype('int64')
+
+    table['total_matches'] = table['home_matches'] + table['away_matches']
+    table['wins'] = table['home_wins'] + table['away_wins']
+    table['draws'] = table['home_draws'] + table['away_draws']
+    table['losses'] = table['total_matches'] - table['wins'] - table['draws']
+    table['goals_for'] = table['home_goals_for'] + table['away_goals_for']
+    table['goals_against'] = table['home_goals_against'] + table['away_goals_against']
+    table['goal_difference'] = table['goals_for'] - table['goals_against']
+    table['corners_for'] = totals['home_corners_for'] + totals['away_corners_for']
+    table['corners_against'] = totals['home_corners_against'] + totals['away_corners_against']
+    table['cards'] = totals['home_cards'] + totals['away_cards']
+
+    # Rates; every team in the table has at least one match, but not always one per venue
+    matches = table['total_matches']
+    table['goals_per_match'] = table['goals_for'] / matches
+    table['goals_conceded_per_match'] = table['goals_against'] / matches
+    table['win_rate'] = table['wins'] / matches
+    table['home_win_rate'] = _safe_ratio(table['home_wins'], table['home_matches'])
+    table['away_win_rate'] = _safe_ratio(table['away_wins'], table['away_matches'])
+    table['corners_per_match'] = table['corners_for'] / matches
+    table['cards_per_match'] = table['cards'] / matches
+
+    return table[TEAM_TABLE_COLUMNS].sort_index()
+
+
+def _side_totals(df, team_col, win_code, goals_for_col, goals_against_col,
+                 corners_for_col, corners_against_col, yellow_col, red_col):
+    """Sum one venue's matches per team"""
+    n_matches = len(df)
+    results = df['FTR'].to_numpy() if 'FTR' in df.columns else np.full(n_matches, None)
+
+    side = pd.DataFrame({
+        'matches': np.ones(n_matches, dtype=np.int64),
+        'wins': (results == win_code).astype(np.int64),
+        'draws': (results == 'D').astype(np.int64),
+        'goals_for': _column(df, goals_for_col),
+        'goals_against': _column(df, goals_against_col),
+        # Each stat counts when its own column exists; a missing column adds zero
+        'corners_for': _column(df, corners_for_col),
+        'corners_against': _column(df, corners_against_col),
+        'cards': _column(df, yellow_col) + _column(df, red_col)
+    })
+    teams = df[team_col].astype(str).to_numpy()
+    return side.groupby(teams, sort=False).sum()
+
+
+def _column(df, col):
+    """Numeric column as float64 with missing values counted as zero"""
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors='coerce').astype('float64').fillna(0).to_numpy()
+
+
+def _safe_ratio(numerator, denominator):
+    return (numerator / denominator.where(denominator > 0)).fillna(0)
+
+
+def add_match_to_stats(team_stats, home_team, away_team, home_goals, away_goals,
+                       home_corners=0, away_corners=0, home_cards=0, away_cards=0):
+    """Update the two teams' entries of a team_stats_dict in place for one completed match"""
+    home_result = 'wins' if home_goals > away_goals else 'draws' if home_goals == away_goals else None
+    away_result = 'wins' if away_goals > home_goals else 'draws' if home_goals == away_goals else None
+
+    for team, venue, result, goals_for, goals_against, corners_for, corners_against, cards in [
+        (home_team, 'home', home_result, home_goals, away_goals, home_corners, away_corners, home_cards),
+        (away_team, 'away', away_result, away_goals, home_goals, away_corners, home_corners, away_cards)
+    ]:
+        stats = team_stats.setdefault(team, {col: 0 for col in TEAM_TABLE_COLUMNS})
+        stats[f'{venue}_matches'] += 1
+        stats[f'{venue}_goals_for'] += goals_for
+        stats[f'{venue}_goals_against'] += goals_against
+        if result is not None:
+            stats[f'{venue}_{result}'] += 1
+        stats['corners_for'] += corners_for
+        stats['corners_against'] += corners_against
+        stats['cards'] += cards
+        _refresh_totals(stats)
+
+
+def _refresh_totals(stats):
+    """Recompute overall totals and rates of one team entry from its per-venue counters"""
+    stats['total_matches'] = stats['home_matches'] + stats['away_matches']
+    stats['wins'] = stats['home_wins'] + stats['away_wins']
+    stats['draws'] = stats['home_draws'] + stats['away_draws']
+    stats['losses'] = stats['total_matches'] - stats['wins'] - stats['draws']
+    stats['goals_for'] = stats['home_goals_for'] + stats['away_goals_for']
+    stats['goals_against'] = stats['home_goals_against'] + stats['away_goals_against']
+    stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
+
+    matches = stats['total_matches']
+    stats['goals_per_match'] = stats['goals_for'] / matches
+    stats['goals_conceded_per_match'] = stats['goals_against'] / matches
+    stats['win_rate'] = stats['wins'] / matches
+    stats['home_win_rate'] = stats['home_wins'] / stats['home_matches'] if stats['home_matches'] > 0 else 0
+    stats['away_win_rate'] = stats['away_wins'] / stats['away_matches'] if stats['away_matches'] > 0 else 0
+    stats['corners_per_match'] = stats['corners_for'] / matches
+    stats['cards_per_match'] = stats['cards'] / matches
+
+
+def team_stats_dict(table):
+    """{team: {stat: value}} with plain Python numbers, as the prediction engine uses it"""
+    return table.to_dict('index')
@@ -0,0 +1,71 @@
+"""Injury source parsers against the stored pages in fixtures/injuries (no network)"""
+import os
+from datetime import date
+
+from injury_scraper import InjuryDataScraper
+from injury_snapshot import InjurySnapshot
+from injury_sources import FIXTURES_DIR, parse_fixtures, parse_page, parse_return_date
+
+# The fixture pages were saved on this day
+TODAY = date(2025, 9, 24)
+
+
+def read_fixture(source):
+    with open(os.path.join(FIXTURES_DIR, f"{source}.html"), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_sportsgambler_rows():
+    records = parse_page('sportsgambler', read_fixture('sportsgambler'))
+    assert [(r['team'], r['player']) for r in records] == [
+        ('SSC Napoli', 'Romelu Lukaku'), ('SSC Napoli', 'Amir Rrahmani'), ('AC Milan', 'Rafael Leão'),
+        ('Juventus FC', 'Arkadiusz Milik'), ('Juventus FC', 'Juan Cabal'), ('Atalanta BC', 'Gianluca Scamacca')]
+    assert records[1] == {'team': 'SSC Napoli', 'player': 'Amir Rrahmani', 'position': 'DF',
+                          'injury': 'Muscle fatigue', 'return': '26/09/2025', 'status': 'Doubtful'}
+
+
+def test_transfermarkt_rows():
+    records = parse_page('transfermarkt', read_fixture('transfermarkt'))
+    assert [r['player'] for r in records] == ['Romelu Lukaku', 'Rafael Leão', 'Nicolò Zaniolo', 'Dodô']
+    assert records[0] == {'player': 'Romelu Lukaku', 'position': 'Centre-Forward', 'team': 'SSC Napoli',
+                          'injury': 'Thigh problems', 'since': 'Sep 13, 2025', 'return': 'Oct 5, 2025',
+                          'market_value': '€18.00m', 'status': 'Out'}
+
+
+def test_return_dates():
+    assert parse_return_date('Oct 5, 2025', TODAY) == date(2025, 10, 5)
+    assert parse_return_date('26/09/2025', TODAY) == date(2025, 9, 26)
+    assert parse_return_date('Early October', TODAY) == date(2025, 10, 5)
+    assert parse_return_date('Mid-October', TODAY) == date(2025, 10, 15)
+    assert parse_return_date('Late Sept.', TODAY) == date(2025, 9, 25)
+    assert parse_return_date('January', TODAY) == date(2026, 1, 15)
+    assert parse_return_date('December 2026', TODAY) == date(2026, 12, 15)
+    for text in ('Decision pending', 'Unknown', '?', 'Marching orders', 'Octopus', ''):
+        assert parse_return_date(text, TODAY) is None
+
+
+def test_merged_fixtures():
+    injuries = parse_fixtures(InjuryDataScraper().team_mapping, TODAY).set_index('player')
+    assert len(injuries) == 8
+
+    # Both sources list Lukaku: Transfermarkt's injury date is the start, its return date the end
+    lukaku = injuries.loc['Romelu Lukaku']
+    assert (lukaku['team'], lukaku['status'], lukaku['expected_return'], lukaku['days_out']) == \
+        ('Napoli', 'Out', '2025-10-05', 22)
+    # Rated by market value percentile: €80m Leão highest, €900k Dodô lowest, €18m Lukaku between
+    assert lukaku['impact_rating'] == 6.5
+    assert injuries.loc['Rafael Leão', 'impact_rating'] == 9.5
+    assert injuries.loc['Dodô', 'impact_rating'] == 0.5
+
+    # Sportsgambler only, no return date or market value: out for the default spell from
+    # today, rated like the median valued player
+    milik = injuries.loc['Arkadiusz Milik']
+    assert (milik['expected_return'], milik['days_out'], milik['impact_rating']) == ('2025-10-24', 30, 5.0)
+
+
+def test_timeline_starts_at_injury_date():
+    injuries = parse_fixtures(InjuryDataScraper().team_mapping, TODAY)
+    snapshot = InjurySnapshot(injuries)
+    assert 'Romelu Lukaku' in snapshot.unavailable_players('Napoli', '2025-09-14')
+    assert 'Romelu Lukaku' not in snapshot.unavailable_players('Napoli', '2025-09-12')
+    assert 'Romelu Lukaku' not in snapshot.unavailable_players('Napoli', '2025-10-05')
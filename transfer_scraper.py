@@ -1,10 +1,16 @@
-import requests
 import pandas as pd
+import numpy as np
 import json
+import re
+import threading
 from datetime import datetime, timedelta
+from http_client import get_http_client
+from metrics import timed
 
 class TransferDataScraper:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_http_client()
+
         self.base_urls = {
             "transfermarkt": "https://www.transfermarkt.com/transfers/transfertageaktuell/statistik",
             "football_italia": "https://football-italia.net/category/transfers/",
@@ -23,6 +29,11 @@ class TransferDataScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
+        # Typed transfers and strength table built once per transfer-data load; swapped whole on refresh
+        self._loaded = None
+        self._load_lock = threading.Lock()
+
+    @timed('transfers.get_current_transfer_data')
     def get_current_transfer_data(self):
         """Generate current Serie A transfer data for 2025-26 season"""
         print("Creating current transfer data for Serie A 2025-26...")
@@ -137,101 +148,190 @@ class TransferDataScraper:
 
         return pd.DataFrame(current_transfers)
 
+    def get_loaded_data(self):
+        """Current load: typed transfers, strength table and data version, built on first use"""
+        data = self._loaded
+        if data is None:
+            with self._load_lock:
+                if self._loaded is None:
+                    self._loaded = self._load(self.get_current_transfer_data())
+                data = self._loaded
+        return data
+
+    def refresh(self):
+        """Reload the transfer data and swap in new typed columns and strength table"""
+        data = self._load(self.get_current_transfer_data())
+        with self._load_lock:
+            self._loaded = data
+        return data
+
+    def _load(self, transfers):
+        """Parse the raw records once: typed columns, per-team strength and the content-hash version"""
+        version = str(pd.util.hash_pandas_object(transfers, index=False).sum()) if not transfers.empty else 'empty'
+        typed = parse_transfer_columns(transfers)
+        return {
+            'version': version,
+            'loaded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'transfers': typed,
+            'strength': self._build_strength_table(typed)
+        }
+
+    def get_strength_table(self):
+        """Current {'version', 'built_at', 'teams'} strength table"""
+        data = self.get_loaded_data()
+        return {'version': data['version'], 'built_at': data['loaded_at'], 'teams': data['strength']}
+
+    def _build_strength_table(self, transfers):
+        """Net transfer impact per Serie A team, sorted by net impact"""
+        # Row positions per team in one pass instead of two boolean filters per team
+        incoming, outgoing = {}, {}
+        for position, (to_team, from_team) in enumerate(zip(transfers['to_team'], transfers['from_team'])):
+            incoming.setdefault(to_team, []).append(position)
+            outgoing.setdefault(from_team, []).append(position)
+        ratings = transfers['impact_rating'].to_numpy() if not transfers.empty else np.array([])
+
+        team_changes = {}
+        for team in self.serie_a_teams:
+            rows_in = incoming.get(team, [])
+            rows_out = outgoing.get(team, [])
+            impact_in = ratings[rows_in].sum() if rows_in else 0
+            impact_out = ratings[rows_out].sum() if rows_out else 0
+            net_impact = impact_in - impact_out
+
+            team_changes[team] = {
+                'transfers_in': len(rows_in),
+                'transfers_out': len(rows_out),
+                'impact_in': impact_in,
+                'impact_out': impact_out,
+                'net_impact': net_impact,
+                'strength_change': 'Improved' if net_impact > 2 else 'Weakened' if net_impact < -2 else 'Stable'
+            }
+
+        return dict(sorted(team_changes.items(), key=lambda x: x[1]['net_impact'], reverse=True))
+
+    def get_data_version(self):
+        """Content hash of the current data; changes whenever any record changes"""
+        return self.get_loaded_data()['version']
+
+    def get_team_strength(self, team_name):
+        """Transfer strength change of one team (zero impact if it made no moves)"""
+        entry = self.get_loaded_data()['strength'].get(team_name)
+        if entry is None:
+            return {'transfers_in': 0, 'transfers_out': 0, 'impact_in': 0, 'impact_out': 0,
+                    'net_impact': 0, 'strength_change': 'Stable'}
+        return dict(entry)
+
+    def _records(self, transfers):
+        """API records: the source columns only, never the parsed helper columns"""
+        return transfers[[col for col in transfers.columns if col not in PARSED_COLUMNS]].to_dict('records')
+
     def get_recent_transfers(self, days_back=30):
         """Get recent transfers within specified days"""
-        all_transfers = self.get_current_transfer_data()
+        all_transfers = self.get_loaded_data()['transfers']
 
-        # Filter by date
+        # Filter on the date parsed at load
         cutoff_date = datetime.now() - timedelta(days=days_back)
-        all_transfers['date'] = pd.to_datetime(all_transfers['date'])
-
-        recent_transfers = all_transfers[all_transfers['date'] >= cutoff_date]
-        recent_transfers = recent_transfers.sort_values('date', ascending=False)
+        recent_transfers = all_transfers[all_transfers['transfer_date'] >= cutoff_date]
+        recent_transfers = recent_transfers.sort_values('transfer_date', ascending=False)
+        recent_transfers = recent_transfers.assign(date=recent_transfers['transfer_date'])
 
-        return recent_transfers.to_dict('records')
+        return self._records(recent_transfers)
 
     def get_team_transfers(self, team_name, transfer_type="all"):
         """Get transfers for specific team (in/out/all)"""
-        all_transfers = self.get_current_transfer_data()
+        all_transfers = self.get_loaded_data()['transfers']
+        team_key = team_name.lower()
 
         if transfer_type == "in":
-            team_transfers = all_transfers[all_transfers['to_team'].str.lower() == team_name.lower()]
+            team_transfers = all_transfers[all_transfers['to_team_key'] == team_key]
         elif transfer_type == "out":
-            team_transfers = all_transfers[all_transfers['from_team'].str.lower() == team_name.lower()]
+            team_transfers = all_transfers[all_transfers['from_team_key'] == team_key]
         else:  # all
             team_transfers = all_transfers[
-                (all_transfers['to_team'].str.lower() == team_name.lower()) |
-                (all_transfers['from_team'].str.lower() == team_name.lower())
+                (all_transfers['to_team_key'] == team_key) | (all_transfers['from_team_key'] == team_key)
             ]
 
-        return team_transfers.to_dict('records')
+        return self._records(team_transfers)
 
     def get_transfer_summary(self):
         """Get summary of transfer window activity"""
-        all_transfers = self.get_current_transfer_data()
-
-        # Extract fee values (simplified)
-        total_spent = 0
-        permanent_transfers = 0
-        loans = 0
-
-        for _, transfer in all_transfers.iterrows():
-            if 'M' in transfer['fee']:
-                try:
-                    fee_value = float(transfer['fee'].split('€')[1].split('M')[0])
-                    total_spent += fee_value
-                except:
-                    pass
-
-            if transfer['transfer_type'] == 'Permanent':
-                permanent_transfers += 1
-            elif 'Loan' in transfer['transfer_type']:
-                loans += 1
+        data = self.get_loaded_data()
+        all_transfers = data['transfers']
+
+        # Fees were parsed at load; anything unparseable is counted, not silently dropped
+        transfer_type = all_transfers['transfer_type'].astype(str)
+        total_spent = all_transfers['fee_m'].sum()
 
         summary = {
             'total_transfers': len(all_transfers),
-            'permanent_transfers': permanent_transfers,
-            'loan_transfers': loans,
+            'permanent_transfers': int((transfer_type == 'Permanent').sum()),
+            'loan_transfers': int(transfer_type.str.contains('Loan', regex=False).sum()),
             'estimated_total_spent': f"€{total_spent:.1f}M",
+            'unparsed_fees': int(all_transfers['fee_m'].isna().sum()),
             'most_active_teams': {
                 'buying': all_transfers['to_team'].value_counts().head(5).to_dict(),
                 'selling': all_transfers['from_team'].value_counts().head(5).to_dict()
             },
             'by_position': all_transfers['position'].value_counts().to_dict(),
-            'highest_fees': all_transfers.nlargest(3, 'impact_rating')[['player', 'from_team', 'to_team', 'fee']].to_dict('records'),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'highest_fees': all_transfers.nlargest(3, 'fee_m')[['player', 'from_team', 'to_team', 'fee']].to_dict('records'),
+            'last_updated': data['loaded_at']
         }
 
         return summary
 
     def get_team_strength_changes(self):
         """Analyze how transfers affect team strength"""
-        all_transfers = self.get_current_transfer_data()
+        return {team: dict(entry) for team, entry in self.get_loaded_data()['strength'].items()}
 
-        team_changes = {}
 
-        for team in self.serie_a_teams:
-            transfers_in = all_transfers[all_transfers['to_team'] == team]
-            transfers_out = all_transfers[all_transfers['from_team'] == team]
+# Columns of a transfer record, and the helper columns added at load by parse_transfer_columns
+SOURCE_COLUMNS = ['player', 'from_team', 'to_team', 'fee', 'transfer_type', 'date', 'position', 'age',
+                  'market_value', 'impact_rating']
+PARSED_COLUMNS = ['fee_m', 'option_m', 'is_loan', 'market_value_m', 'transfer_date', 'to_team_key', 'from_team_key']
 
-            impact_in = transfers_in['impact_rating'].sum() if not transfers_in.empty else 0
-            impact_out = transfers_out['impact_rating'].sum() if not transfers_out.empty else 0
+_AMOUNT_UNITS = {'bn': 1000.0, 'b': 1000.0, 'm': 1.0, 'k': 0.001, '': 1.0}
 
-            net_impact = impact_in - impact_out
 
-            team_changes[team] = {
-                'transfers_in': len(transfers_in),
-                'transfers_out': len(transfers_out),
-                'impact_in': impact_in,
-                'impact_out': impact_out,
-                'net_impact': net_impact,
-                'strength_change': 'Improved' if net_impact > 2 else 'Weakened' if net_impact < -2 else 'Stable'
-            }
+def parse_amounts(values):
+    """First € amount in millions and any '+ €X option' amount, for a column of fee strings.
+
+    '€30M' -> 30, '€500K' -> 0.5, '€0 (Loan)' -> 0, '€8M loan + €17M option' -> (8, 17);
+    a comma before one or two digits is a decimal point ('€2,5M' -> 2.5), any other comma between
+    digits separates thousands ('€1,500K' -> 1.5); text with no amount (e.g. 'Undisclosed') gives NaN.
+    """
+    text = (pd.Series(values, dtype=object).fillna('').astype(str)
+            .str.replace(r'(?<=\d),(?=\d{1,2}(?!\d))', '.', regex=True)
+            .str.replace(r'(?<=\d),(?=\d)', '', regex=True))
+    amount = text.str.extract(r'€\s*(\d+(?:\.\d+)?)\s*(bn|b|m|k)?', flags=re.IGNORECASE)
+    option = text.str.extract(r'€\s*(\d+(?:\.\d+)?)\s*(bn|b|m|k)?\s*option', flags=re.IGNORECASE)
+
+    def millions(parts):
+        units = parts[1].fillna('').str.lower().map(_AMOUNT_UNITS)
+        return pd.to_numeric(parts[0], errors='coerce') * units
+
+    return millions(amount).to_numpy(dtype=np.float64), millions(option).to_numpy(dtype=np.float64)
+
+
+def parse_transfer_columns(transfers):
+    """Copy of the raw transfers with typed columns: fee, option and market value in millions
+    of euros, a loan flag, the parsed date and lowercase team keys"""
+    transfers = transfers.reset_index(drop=True).copy()
+    for col in SOURCE_COLUMNS:
+        if col not in transfers.columns:
+            transfers[col] = pd.Series(np.nan if col == 'impact_rating' else None, index=transfers.index,
+                                       dtype='float64' if col == 'impact_rating' else object)
 
-        # Sort by net impact
-        sorted_changes = dict(sorted(team_changes.items(), key=lambda x: x[1]['net_impact'], reverse=True))
+    fee, option = parse_amounts(transfers['fee'])
+    transfers['fee_m'] = fee
+    transfers['option_m'] = option
+    transfers['is_loan'] = (transfers['transfer_type'].astype(str).str.contains('Loan', regex=False) |
+                            transfers['fee'].astype(str).str.contains('loan', case=False, regex=False))
+    transfers['market_value_m'] = parse_amounts(transfers['market_value'])[0]
+    transfers['transfer_date'] = pd.to_datetime(transfers['date'], errors='coerce')
+    transfers['to_team_key'] = transfers['to_team'].astype(str).str.lower()
+    transfers['from_team_key'] = transfers['from_team'].astype(str).str.lower()
+    return transfers
 
-        return sorted_changes
 
 if __name__ == "__main__":
     scraper = TransferDataScraper()